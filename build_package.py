@@ -1,4 +1,5 @@
 import os
+import sys
 import zipfile
 import xml.etree.ElementTree as ET
 
@@ -9,6 +10,18 @@ def get_addon_info():
     root = tree.getroot()
     return root.get('id'), root.get('version')
 
+def compile_pinyin_table():
+    # resources/char_map.bin is what the pinyin modules map at runtime
+    json_path = os.path.join('resources', 'char_map.json')
+    table_path = os.path.join('resources', 'char_map.bin')
+    if not os.path.exists(json_path):
+        return
+    if os.path.exists(table_path) and os.path.getmtime(table_path) >= os.path.getmtime(json_path):
+        return
+    sys.path.insert(0, 'tools')
+    from generate_pinyin_table import generate_table
+    generate_table(json_path, table_path)
+
 def zip_addon(addon_id, version):
     # Current directory is the root of the addon
     cwd = os.getcwd()
@@ -53,6 +66,7 @@ def zip_addon(addon_id, version):
 if __name__ == "__main__":
     try:
         addon_id, version = get_addon_info()
+        compile_pinyin_table()
         zip_addon(addon_id, version)
     except Exception as e:
         print(f"Error: {e}")
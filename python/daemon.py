@@ -11,7 +11,7 @@ import xbmcgui
 import requests
 import select
 import concurrent.futures
-import itertools
+import sys
 import time
 
 
@@ -27,71 +27,13 @@ DEFAULT_PORT = 56789
 HOST = '127.0.0.1'
 
 ADDON = xbmcaddon.Addon(id='metadata.tmdb.cn.optimization')
-CHAR_MAP = {}
 
-def load_char_map():
-    global CHAR_MAP
-    try:
-        addon_path = ADDON.getAddonInfo('path')
-        # Handle potential encoding issues with path on Windows
-        if isinstance(addon_path, bytes):
-            addon_path = addon_path.decode('utf-8')
-            
-        map_path = os.path.join(addon_path, 'resources', 'char_map.json')
-        if os.path.exists(map_path):
-            with open(map_path, 'r', encoding='utf-8') as f:
-                CHAR_MAP = json.load(f)
-            xbmc.log(f'[TMDB Daemon] Loaded char_map.json with {len(CHAR_MAP)} entries', xbmc.LOGINFO)
-        else:
-            xbmc.log(f'[TMDB Daemon] char_map.json not found at {map_path}', xbmc.LOGWARNING)
-    except Exception as e:
-        xbmc.log(f'[TMDB Daemon] Failed to load char_map.json: {e}', xbmc.LOGERROR)
-
-def get_pinyin_permutations(text):
-    if not text:
-        return ""
-    
-    # Convert each char to a list of possible initials
-    char_initials = []
-    for char in text:
-        if char in CHAR_MAP:
-            # Get all pinyin variations for this char
-            pinyins = CHAR_MAP[char]
-            # Extract initials and deduplicate preserving order
-            initials = []
-            seen = set()
-            for p in pinyins:
-                if p:
-                    init = p[0].upper()
-                    if init not in seen:
-                        seen.add(init)
-                        initials.append(init)
-            
-            if initials:
-                char_initials.append(initials)
-            else:
-                if char.isalnum():
-                    char_initials.append([char.upper()])
-        else:
-            if char.isalnum():
-                char_initials.append([char.upper()])
+# Share the pinyin implementation with the direct scraper
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.append(script_dir)
 
-    # Generate Cartesian product
-    try:
-        permutations = list(itertools.product(*char_initials))
-        # Join them back into strings
-        results = ["".join(p) for p in permutations]
-        # Deduplicate preserving order
-        seen_res = set()
-        unique_results = []
-        for r in results:
-            if r not in seen_res:
-                seen_res.add(r)
-                unique_results.append(r)
-        return "|".join(unique_results)
-    except Exception as e:
-        xbmc.log(f'[TMDB Daemon] Pinyin generation error: {e}', xbmc.LOGERROR)
-        return text
+from lib.tmdbscraper_direct import pinyin
 
 def parse_hosts_file(path):
     mapping = {}
@@ -285,6 +227,15 @@ def execute_request(request):
             result['json'] = resp.json()
         except:
             pass
+
+        # Piggyback pinyin of a response field so the client skips a separate 'pinyin' exchange
+        pinyin_field = request.get('pinyin_field')
+        if pinyin_field and isinstance(result['json'], dict) and result['json'].get(pinyin_field):
+            text = result['json'][pinyin_field]
+            try:
+                result['pinyin'] = {'text': text, 'initials': pinyin.get_pinyin_permutations(text)}
+            except Exception as e:
+                xbmc.log(f'[TMDB Daemon] Pinyin error for "{text}": {e}', xbmc.LOGERROR)
         return result
     except Exception as e:
         return {'error': str(e)}
@@ -341,7 +292,7 @@ def handle_client(conn, addr):
                 pinyin_results = []
                 for text in text_list:
                     try:
-                        pinyin_results.append(get_pinyin_permutations(text))
+                        pinyin_results.append(pinyin.get_pinyin_permutations(text))
                     except Exception as e:
                         xbmc.log(f'[TMDB Daemon] Pinyin error for "{text}": {e}', xbmc.LOGERROR)
                         pinyin_results.append(text) # Fallback to original
@@ -432,6 +383,6 @@ def start_server():
         xbmc.log('[TMDB Daemon] Daemon stopped', xbmc.LOGINFO)
 
 if __name__ == '__main__':
-    load_char_map() # Load pinyin map
+    pinyin.load_char_map() # Map compiled pinyin table (no-op if mapped on import)
     load_hosts() # Load system and profile hosts
     start_server()
@@ -9,13 +9,25 @@ import xbmcgui
 import xbmcaddon
 import sys
 import sqlite3
+import threading
 import traceback
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
 from xbmcvfs import translatePath
 
 ADDON_SETTINGS = xbmcaddon.Addon()
 
+# Filenames sent to DeepSeek in one request when a directory is prefetched
+DEEPSEEK_BATCH_SIZE = 20
+# Speculative DeepSeek extractions running next to the traditional search
+DEEPSEEK_SPECULATIVE_WORKERS = 4
+# Workers of the scan stages next to the details stage (thread_count workers):
+# filename parsing and NFO reading, and the local artwork overlay
+PREPARE_WORKERS = 2
+ENRICH_WORKERS = 1
+# Seconds between the debug logs of the pipeline's queue depths
+PIPELINE_REPORT_INTERVAL = 10
+
 # Ensure we can import from the same directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 if script_dir not in sys.path:
@@ -23,7 +35,22 @@ if script_dir not in sys.path:
 
 
 from scraper_direct import ScraperRunner
+from lib.tmdbscraper_direct.tmdb import get_speculative_page_stats
 from lib.tmdbscraper_direct import dns_override
+from lib.tmdbscraper_direct import title_index
+from lib.tmdbscraper_direct import candidate_scorer
+from lib import filename_cleaner
+from lib import release_parser
+from lib.directory_listing import DirectoryListing
+from lib.directory_walker import DirectoryWalker, SourceLimiter
+from lib.scan_pipeline import Pipeline, Stage
+from lib.db_writer import DatabaseWriter
+from lib.kodi_database import KodiDatabase
+from lib import filename_cache
+from lib import listing_cache
+from lib import search_cache
+from lib import path_hash
+from lib import scan_journal
 
 def log(message, level=xbmc.LOGDEBUG):
     xbmc.log(f"[TMDB Thread] {message}", level)
@@ -59,533 +86,41 @@ class SettingsProxy:
     def setSetting(self, key, value):
         return self.base_settings.setSetting(key, value)
 
-class KodiDatabase:
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self.conn = None
-        
-    def connect(self):
-        try:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-        except Exception as e:
-            log(f"DB Connect Error: {e}", xbmc.LOGERROR)
-
-    def close(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-
-    def _prepare_string_array(self, items, separator=" / "):
-        if isinstance(items, list):
-            return separator.join(items)
-        return str(items) if items else ""
-
-    def get_or_create_path(self, path):
-        # Ensure path ends with /
-        start_path = path.replace("\\", "/")
-        if not start_path.endswith("/"):
-            start_path += "/"
-            
-        cur = self.conn.cursor()
-        cur.execute("SELECT idPath FROM path WHERE strPath=?", (start_path,))
-        row = cur.fetchone()
-        if row: return row[0]
-        
-        # 2. 构建完整的父子目录关系 / Recursive parent creation
-        # Use string manipulation instead of os.path to safely handle URLs
-        path_no_slash = start_path.rstrip("/")
-        last_slash = path_no_slash.rfind("/")
-        
-        if last_slash > 0:
-            parent_path = path_no_slash[:last_slash] + "/"
-            # Avoid infinite recursion (e.g. smb:// -> smb:/ -> smb://)
-            if parent_path != start_path and "://" in start_path: 
-                # For URLs ensure we don't break protocol
-                if not parent_path.endswith(":///") and parent_path.count("/") >= 2:
-                     self.get_or_create_path(parent_path)
-            elif parent_path != start_path:
-                 # Local paths
-                 self.get_or_create_path(parent_path)
-            
-        # 1. path不需要写类型和刮削器 (Empty strings)
-        # 3. strhash，strSettings需要写入空字符串
-        cur.execute("INSERT INTO path (strPath, strContent, strScraper, strHash, strSettings, scanRecursive) VALUES (?, ?, ?, ?, ?, ?)", 
-                   (start_path, "", "", "", "", 0))
-        return cur.lastrowid
-
-    def get_or_create_file(self, file_path, id_path):
-        filename = os.path.basename(file_path)
-        cur = self.conn.cursor()
-        cur.execute("SELECT idFile FROM files WHERE idPath=? AND strFilename=?", (id_path, filename))
-        row = cur.fetchone()
-        if row: return row[0]
-        
-        cur.execute("INSERT INTO files (idPath, strFilename, dateAdded) VALUES (?, ?, ?)", 
-                   (id_path, filename, time.strftime("%Y-%m-%d %H:%M:%S")))
-        return cur.lastrowid
-        
-    def get_or_create_set(self, set_name, set_overview=""):
-        if not set_name: return None
-        cur = self.conn.cursor()
-        cur.execute("SELECT idSet FROM sets WHERE strSet=?", (set_name,))
-        row = cur.fetchone()
-        if row: return row[0]
-        
-        cur.execute("INSERT INTO sets (strSet, strOverview) VALUES (?, ?)", (set_name, set_overview))
-        return cur.lastrowid
-
-    def get_all_paths(self):
-        """
-        Retrieves all path configurations from the database.
-        Returns a dictionary: { normalized_path_str: { 'settings': xml, 'scraper': str, 'content': str, 'noUpdate': bool, 'exclude': bool } }
-        """
-        paths_map = {}
-        if not self.conn:
-            return paths_map
-            
-        try:
-            cur = self.conn.cursor()
-            # Select necessary columns. Note: columns might vary by Kodi version, but these are standard enough.
-            # Use dictionary cursor or access by index
-            cur.execute("SELECT strPath, strSettings, strScraper, strContent, noUpdate, exclude FROM path")
-            rows = cur.fetchall()
-            
-            for row in rows:
-                p_str = row['strPath']
-                # Normalize path ending with slash
-                p_str = p_str.replace("\\", "/")
-                if not p_str.endswith("/"):
-                    p_str += "/"
-                    
-                paths_map[p_str] = {
-                    'settings': row['strSettings'],
-                    'scraper': row['strScraper'],
-                    'content': row['strContent'],
-                    'noUpdate': bool(row['noUpdate']),
-                    'exclude': bool(row['exclude'])
-                }
-        except Exception as e:
-            log(f"Error fetching all paths: {e}", xbmc.LOGERROR)
-            
-        return paths_map
-
-    def add_link(self, table, name, media_id, media_type):
-        if not name: return
-        cur = self.conn.cursor()
-        id_col = table + "_id"
-        cur.execute(f"SELECT {id_col} FROM {table} WHERE name=?", (name,))
-        row = cur.fetchone()
-        if row: item_id = row[0]
-        else:
-            cur.execute(f"INSERT INTO {table} (name) VALUES (?)", (name,))
-            item_id = cur.lastrowid
-        
-        try: cur.execute(f"INSERT INTO {table}_link ({id_col}, media_id, media_type) VALUES (?, ?, ?)", 
-                   (item_id, media_id, media_type))
-        except: pass 
-
-    def _handle_movie_version_merge(self, id_movie, id_file, file_path):
-        """
-        Logic for 'Merge same movie as versions'
-        1. Check existing versions of id_movie.
-        2. If any version has default/empty name (or 'Default'), update it to its filename.
-        3. Determine name for the NEW file (file_path).
-        4. Insert new version link.
-        """
-        try:
-            cur = self.conn.cursor()
-
-            # Helper to get decoded buffer filename
-            def get_decoded_name(path):
-                f_name = os.path.basename(path)
-                return urllib.parse.unquote(f_name)
-            
-            # 1. Get all existing versions for this movie
-            # List of {idFile, name, idType}
-            # Note: We use idType to know if it is a system default
-            # Join with videoversiontype on id (PK of type table) = idType (FK in version table)
-            cur.execute("SELECT vv.idFile, vvt.name, vv.idType FROM videoversion vv LEFT JOIN videoversiontype vvt ON vv.idType = vvt.id WHERE vv.idMedia=? AND vv.media_type='movie'", (id_movie,))
-            rows = cur.fetchall()
-            existing_versions = []
-            used_names = set()
-            
-            for r in rows:
-                existing_versions.append({'idFile': r[0], 'name': r[1], 'idType': r[2]})
-                if r[1]: used_names.add(r[1])
-
-            # 2. Fix existing versions if they have generic names
-            for ver in existing_versions:
-                 v_id_file = ver['idFile']
-                 v_name = ver['name']
-                 v_id_type = ver['idType']
-                 
-                 # Logic: If name is 'Default' or empty or it is a system type (< 40800), rename it to its filename
-                 if not v_name or v_id_type < 40800:
-                     cur.execute("SELECT strFilename FROM files WHERE idFile=?", (v_id_file,))
-                     f_row = cur.fetchone()
-                     if f_row and f_row[0]:
-                         v_filename = f_row[0]
-                         try: v_decoded_name = urllib.parse.unquote(v_filename)
-                         except: v_decoded_name = v_filename
-
-                         if v_decoded_name:
-                             new_type_id = self.get_video_version_type_id(v_decoded_name)
-                             # Update DB
-                             # videoversion PK is idFile!
-                             cur.execute("UPDATE videoversion SET idType=? WHERE idFile=? AND idMedia=?", (new_type_id, v_id_file, id_movie))
-                             used_names.add(v_decoded_name)
-            
-            # 3. Add link for NEW file
-            # Check if this file is already linked?
-            cur.execute("SELECT idType FROM videoversion WHERE idFile=? AND idMedia=? AND media_type='movie'", (id_file, id_movie))
-            if cur.fetchone():
-                 log(f"Version link already exists for {file_path}", xbmc.LOGINFO)
-                 return
-            
-            # Determine unique name for new file
-            new_name = get_decoded_name(file_path)
-            base_name = new_name
-            counter = 2
-            final_name = base_name
-            
-            # Simple collision resolution
-            while final_name in used_names:
-                final_name = f"{base_name} (v{counter})"
-                counter += 1
-            
-            log(f"Merging merged Version: {final_name} -> ID {id_movie}", xbmc.LOGINFO)
-            type_id = self.get_video_version_type_id(final_name)
-            
-            # Insert
-            # itemType=0 (Version)
-            # idType is the FK to videoversiontype
-            cur.execute("INSERT INTO videoversion (idFile, idMedia, media_type, itemType, idType) VALUES (?, ?, 'movie', 0, ?)", 
-                       (id_file, id_movie, type_id))
-            self.conn.commit()
-
-        except Exception as e:
-            log(f"Error _handle_movie_version_merge: {e}", xbmc.LOGERROR)
-
-    def get_video_version_type_id(self, version_name):
-        if not version_name: 
-            return 40400 # Default
-        
-        try:
-            cur = self.conn.cursor()
-            # Check if type exists
-            cur.execute("SELECT id FROM videoversiontype WHERE name=?", (version_name,))
-            row = cur.fetchone()
-            if row: return row[0]
-            
-            # Create new type (owner=2 usually means user created/addon)
-            cur.execute("INSERT INTO videoversiontype (name, owner, itemType) VALUES (?, 2, 0)", (version_name,))
-            return cur.lastrowid
-        except Exception as e:
-            # Fallback for older Kodi versions without this table
-            log(f"Error get_video_version_type_id: {e}", xbmc.LOGERROR)
-            return 40400
-
-
-    def save_movie(self, id_file, details, file_path="", merge_versions=False):
-        if not self.conn: return None
-        cur = self.conn.cursor()
-        info = details.get('info', {})
-        available_art = details.get('available_art', {})
-        
-        # --- MERGE VERSION LOGIC ---
-        if merge_versions:
-            tmdb_id = None
-            if 'tmdb' in details.get('uniqueids', {}):
-                tmdb_id = details['uniqueids']['tmdb']
-            elif 'id' in details: # sometimes in root
-                tmdb_id = details['id']
-            
-            if tmdb_id:
-                # Check for EXISTING movie with this TMDB ID
-                cur.execute("SELECT media_id FROM uniqueid WHERE media_type='movie' AND type='tmdb' AND value=?", (str(tmdb_id),))
-                u_row = cur.fetchone()
-                if u_row:
-                    existing_id_movie = u_row[0]
-                    # Ensure it exists in movie table
-                    cur.execute("SELECT idMovie FROM movie WHERE idMovie=?", (existing_id_movie,))
-                    if cur.fetchone():
-                         # Perform merge
-                         self._handle_movie_version_merge(existing_id_movie, id_file, file_path)
-                         return existing_id_movie
-        # ---------------------------
-
-        cur.execute("SELECT idMovie FROM movie WHERE idFile=?", (id_file,))
-        row = cur.fetchone()
-        
-        if row: id_movie = row[0]
-        else:
-            cur.execute("INSERT INTO movie (idFile) VALUES (?)", (id_file,))
-            id_movie = cur.lastrowid
-            
-            # Kodi 19+ Video Versions (Asset management)
-            # VideoAssetType::VERSION = 0
-            # VIDEO_VERSION_ID_DEFAULT = 40400
-            try:
-                cur.execute("INSERT INTO videoversion (idFile, idMedia, media_type, itemType, idType) VALUES (?, ?, ?, ?, ?)",
-                            (id_file, id_movie, 'movie', 0, 40400))
-            except: 
-                # Older Kodi versions might not have this table
-                pass
-
-        c00 = info.get('title', '')
-        c01 = info.get('plot', '')
-        c02 = info.get('plotoutline', '')
-        c03 = info.get('tagline', '')
-        c06 = self._prepare_string_array(info.get('credits', []))
-        
-        premiered = info.get('premiered', '')
-
-        # c08: Thumb (XML Collection)
-        c08 = self._build_image_xml(available_art)
-        
-        # Fallback: If c08 empty, try info['thumb']
-        if not c08 and info.get('thumb'):
-             val = info.get('thumb')
-             c08 = f'<thumb spoof="" cache="" aspect="poster" preview="">{self._xml_escape(val)}</thumb>'
-
-        c10 = info.get('sorttitle', '')
-        c11 = info.get('duration', 0)
-        c12 = info.get('mpaa', '')
-        c13 = info.get('top250', 0)
-        c14 = self._prepare_string_array(info.get('genre', []))
-        c15 = self._prepare_string_array(info.get('director', []))
-        c16 = info.get('originaltitle', '')
-        c18 = self._prepare_string_array(info.get('studio', []))
-        c19 = info.get('trailer', '')
-        
-        # c20: Fanart (XML Collection)
-        c20 = self._build_fanart_xml(available_art)
-        
-        # Fallback: If c20 empty, try info['fanart']
-        if not c20 and info.get('fanart'):
-             val = info.get('fanart')
-             c20 = f'<fanart><thumb colors="" preview="">{self._xml_escape(val)}</thumb></fanart>'
-
-        c21 = self._prepare_string_array(info.get('country', []))
-        
-        # c22: File Path (Absolute)
-        c22 = file_path
-        
-        c23 = None
-        if id_file:
-             cur.execute("SELECT idPath FROM files WHERE idFile=?", (id_file,))
-             r = cur.fetchone()
-             if r: c23 = r[0]
-
-        id_set = None
-        if info.get('set'):
-             id_set = self.get_or_create_set(info.get('set'), info.get('setoverview', ''))
-
-        # Kodi Source: Check if we missed any columns.
-        # c04 is 'votes' string in older versions, but now typically unused or just string representation.
-        # c05 is idRating.
-        # c09 is idUniqueId.
-        # c07 is Year.
-        
-        sql = """UPDATE movie SET 
-            c00=?, c01=?, c02=?, c03=?, c06=?, c08=?, c10=?, c11=?, c12=?, c13=?, c14=?, c15=?, c16=?, c18=?, c19=?, c20=?, c21=?, c22=?, c23=?, premiered=?, idSet=?
-            WHERE idMovie=?"""
-        
-        try:
-            cur.execute(sql, (
-                c00, c01, c02, c03, c06, c08, c10, c11, c12, c13, c14, c15, c16, c18, c19, c20, c21, c22, c23, premiered, id_set,
-                id_movie
-            ))
-        except Exception as e:
-            log(f"DB Error updating movie: {e}", xbmc.LOGERROR)
-        
-        cur.execute("DELETE FROM genre_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for g in info.get('genre', []): self.add_link('genre', g, id_movie, 'movie')
-            
-        cur.execute("DELETE FROM studio_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for s in info.get('studio', []): self.add_link('studio', s, id_movie, 'movie')
-            
-        cur.execute("DELETE FROM country_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for c in info.get('country', []): self.add_link('country', c, id_movie, 'movie')
-
-        cur.execute("DELETE FROM tag_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for t in info.get('tag', []): self.add_link('tag', t, id_movie, 'movie')
-            
-        cur.execute("DELETE FROM director_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for d in info.get('director', []): self._add_person_link(d, 'director', id_movie, 'movie')
-
-        cur.execute("DELETE FROM writer_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for w in info.get('credits', []): self._add_person_link(w, 'writer', id_movie, 'movie')
-
-        cur.execute("DELETE FROM actor_link WHERE media_id=? AND media_type='movie'", (id_movie,))
-        for actor in details.get('cast', []): self._add_actor(actor, id_movie, 'movie')
-
-        cur.execute("DELETE FROM rating WHERE media_id=? AND media_type='movie'", (id_movie,))
-        default_rating_id = None
-        for r_type, r_val in details.get('ratings', {}).items():
-            cur.execute("INSERT INTO rating (media_id, media_type, rating_type, rating, votes) VALUES (?, ?, ?, ?, ?)",
-                       (id_movie, 'movie', r_type, r_val.get('rating', 0), r_val.get('votes', 0)))
-            rid = cur.lastrowid
-            if r_val.get('default', False) or default_rating_id is None:
-                default_rating_id = rid
-        if default_rating_id:
-            cur.execute("UPDATE movie SET c05=? WHERE idMovie=?", (default_rating_id, id_movie))
-
-        cur.execute("DELETE FROM uniqueid WHERE media_id=? AND media_type='movie'", (id_movie,))
-        default_unique_id = None
-        for u_type, u_val in details.get('uniqueids', {}).items():
-             cur.execute("INSERT INTO uniqueid (media_id, media_type, value, type) VALUES (?, ?, ?, ?)",
-                        (id_movie, 'movie', u_val, u_type))
-             uid = cur.lastrowid
-             if u_type == 'tmdb': default_unique_id = uid
-        if default_unique_id:
-             try: cur.execute("UPDATE movie SET c09=? WHERE idMovie=?", (default_unique_id, id_movie))
-             except: pass
-
-        cur.execute("DELETE FROM art WHERE media_id=? AND media_type='movie'", (id_movie,))
-        
-        for art_type, art_list in details.get('available_art', {}).items():
-            if not art_list: continue
-            
-            # Kodi Logic: Only one active art per type is stored in 'art' table.
-            # Usually the first one from the valid list.
-            img = art_list[0]
-            url = img if isinstance(img, str) else img.get('url', '')
-            if not url: continue
-
-            if art_type.startswith('set.') and id_set:
-                # Handle Set Art (stored with media_type='set')
-                real_type = art_type[4:] # remove 'set.'
-                # Ensure we update set art. Delete specific type to avoid duplicates.
-                cur.execute("DELETE FROM art WHERE media_id=? AND media_type='set' AND type=?", (id_set, real_type))
-                cur.execute("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)",
-                           (id_set, 'set', real_type, url))
-            elif not art_type.startswith('set.'):
-                # Handle Movie Art
-                cur.execute("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)",
-                           (id_movie, 'movie', art_type, url))
-        
-        self.conn.commit()
-        return id_movie
-
-    def _xml_escape(self, s):
-        if not s: return ""
-        return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
-
-    def _build_image_xml(self, available_art):
-        """
-        Builds Kodi-compatible XML string for c08 (thumbnails/posters/logos etc).
-        Format: <thumb aspect="..." preview="...">url</thumb>
-        Exclude 'fanart' (singular) as it belongs in c20.
-        """
-        if not available_art:
-            return ""
-            
-        xml_parts = []
-        for aspect, items in available_art.items():
-            # 'fanart' key usually mapped to c20. 
-            # Note: 'set.fanart' MUST be included in c08 as per user requirement.
-            if aspect == 'fanart':
-                continue
-                
-            if not isinstance(items, list):
-                items = [items]
-            
-            for item in items:
-                url = item.get('url','') if isinstance(item, dict) else item
-                preview = item.get('preview','') if isinstance(item, dict) else ''
-                
-                if url:
-                    xml_parts.append(f'<thumb spoof="" cache="" aspect="{aspect}" preview="{self._xml_escape(preview)}">{self._xml_escape(url)}</thumb>')
-        
-        return "".join(xml_parts)
-
-    def _build_fanart_xml(self, available_art):
-        """
-        Builds Kodi-compatible XML string for c20 (fanart).
-        Format: <fanart><thumb colors="" preview="...">url</thumb>...</fanart>
-        """
-        fanart_items = available_art.get('fanart', [])
-        if not fanart_items:
-            return ""
-            
-        if not isinstance(fanart_items, list):
-            fanart_items = [fanart_items]
-            
-        xml_parts = ["<fanart>"]
-        for item in fanart_items:
-            url = item.get('url', '') if isinstance(item, dict) else item
-            preview = item.get('preview', '') if isinstance(item, dict) else ''
-            
-            if url:
-                xml_parts.append(f'<thumb colors="" preview="{self._xml_escape(preview)}">{self._xml_escape(url)}</thumb>')
-        
-        xml_parts.append("</fanart>")
-        return "".join(xml_parts)
-
-    def _add_person_link(self, name, role, media_id, media_type):
-        if not name: return
-        cur = self.conn.cursor()
-        cur.execute("SELECT actor_id FROM actor WHERE name=?", (name,))
-        row = cur.fetchone()
-        if row: actor_id = row[0]
-        else:
-            cur.execute("INSERT INTO actor (name) VALUES (?)", (name,))
-            actor_id = cur.lastrowid
-        try: cur.execute(f"INSERT INTO {role}_link (actor_id, media_id, media_type) VALUES (?, ?, ?)", 
-                   (actor_id, media_id, media_type))
-        except: pass
-
-    def _add_actor(self, actor, media_id, media_type):
-        name = actor.get('name')
-        if not name: return
-        cur = self.conn.cursor()
-        cur.execute("SELECT actor_id FROM actor WHERE name=?", (name,))
-        row = cur.fetchone()
-        
-        thumb = actor.get('thumbnail', '')
-        
-        if row: actor_id = row[0]
-        else:
-            cur.execute("INSERT INTO actor (name, art_urls) VALUES (?, ?)", (name, thumb))
-            actor_id = cur.lastrowid
-            
-        # Update Art Table for Actor (One 'thumb' per actor)
-        if thumb:
-             cur.execute("DELETE FROM art WHERE media_id=? AND media_type='actor' AND type='thumb'", (actor_id,))
-             cur.execute("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)", 
-                        (actor_id, 'actor', 'thumb', thumb))
-
-        try: cur.execute("INSERT INTO actor_link (actor_id, media_id, media_type, role, cast_order) VALUES (?, ?, ?, ?, ?)", 
-                   (actor_id, media_id, media_type, actor.get('role', ''), actor.get('order', 0)))
-        except: pass
 
 class KodiScraperSimulation:
     def __init__(self):
-        # Default Advanced Settings from Kodi source
-        # Fixed regex logic: Kodi C++ R-string delimiter "()" confused Python regex. Actual regex has NO outer parens.
-        # NOTE: Using re.ASCII to mimic Kodi C++ regex behavior (which doesn't match Unicode in \w by default).
-        # This prevents misdetection of Chinese/Unicode strings in brackets like [宾虚_Ben-Hur_1959] as IDs.
-        self.video_filename_identifier_regexp = re.compile(r'[\{\[](\w+?)(?:id)?[-=](\w+)[\}\]]', re.IGNORECASE | re.ASCII)
-        self.video_clean_datetime_regexp = re.compile(r'(.*[^ _\,\.\(\)\[\]\-])[ _\.\(\)\[\]\-]+(19[0-9][0-9]|20[0-9][0-9])([ _\,\.\(\)\[\]\-]|[^0-9]$)?', re.IGNORECASE)
-        
-        self.video_clean_string_regexps = [
-            re.compile(r'[ _\,\.\(\)\[\]\-](10bit|480p|480i|576p|576i|720p|720i|1080p|1080i|2160p|3d|aac|ac3|aka|atmos|avi|bd5|bdrip|bdremux|bluray|brrip|cam|cd[1-9]|custom|dc|ddp|divx|divx5|dolbydigital|dolbyvision|dsr|dsrip|dts|dts-hdma|dts-hra|dts-x|dv|dvd|dvd5|dvd9|dvdivx|dvdrip|dvdscr|dvdscreener|extended|fragment|fs|h264|h265|hdr|hdr10|hevc|hddvd|hdrip|hdtv|hdtvrip|hrhd|hrhdtv|internal|limited|multisubs|nfofix|ntsc|ogg|ogm|pal|pdtv|proper|r3|r5|read.nfo|remastered|remux|repack|rerip|retail|screener|se|svcd|tc|telecine|telesync|truehd|ts|uhd|unrated|ws|x264|x265|xvid|xvidvd|xxx|web-dl|webrip|www.www|\[.*\])([ _\,\.\(\)\[\]\-]|$)', re.IGNORECASE),
-            re.compile(r'(\[.*\])', re.IGNORECASE)
-        ]
-        
+        # Default Advanced Settings from Kodi source, see lib/filename_cleaner.py
+        self.video_filename_identifier_regexp = filename_cleaner.IDENTIFIER_REGEXP
+        self.video_clean_datetime_regexp = filename_cleaner.DATETIME_REGEXP
+        self.video_clean_string_regexps = filename_cleaner.CLEAN_STRING_REGEXPS
+
         self.video_extensions = ['.m4v', '.3g2', '.3gp', '.nsv', '.tp', '.ts', '.ty', '.strm', '.pls', '.rm', '.rmvb', '.mpd', '.m3u', '.m3u8', '.ifo', '.mov', '.qt', '.divx', '.xvid', '.bivx', '.vob', '.nrg', '.img', '.iso', '.udf', '.pva', '.wmv', '.asf', '.asx', '.ogm', '.m2v', '.avi', '.bin', '.dat', '.mpg', '.mpeg', '.mp4', '.mkv', '.mk3d', '.avc', '.vp3', '.svq3', '.nuv', '.viv', '.dv', '.fli', '.flv', '.001', '.wpl', '.xspf', '.zip', '.vdr', '.dvr-ms', '.xsp', '.mts', '.m2t', '.m2ts', '.evo', '.ogv', '.sdp', '.avs', '.rec', '.url', '.pxml', '.vc1', '.h264', '.rcv', '.rss', '.mpls', '.mpl', '.webm', '.bdmv', '.bdm', '.wtv', '.trp', '.f4v']
         
         self.image_extensions = ['.png', '.jpg', '.jpeg', '.tbn', '.webp']
         self.art_types = ['poster', 'fanart', 'banner', 'landscape', 'clearlogo', 'clearart', 'discart', 'disc', 'keyart', 'logo', 'thumb']
 
-        # Cache for scraped files (loaded via JSONRPC)
+        # Kodi's video database, opened by scan_and_process
+        self.db = None
+        # Cache for scraped files (loaded from the database or via JSONRPC)
         self.scraped_files = set()
         self.loaded_scraped_status = False
         
         # Whole Path Cache: { normalized_path: { ...attributes... } }
         self.path_cache = {} 
+
+        # DeepSeek batches asked per directory, taken by the file's worker: { raw_name: Future }
+        self.deepseek_prefetched = {}
+        # DeepSeek extractions started before the traditional search failed
+        self.deepseek_executor = None
+        self.speculative_deepseek_stats = {'used': 0, 'ignored': 0}
+        self.speculative_deepseek_lock = threading.Lock()
+
+        # Directory listings of network sources, reused while unchanged
+        self.refresh_listings = False
+        self.listing_stats = {'cached': 0, 'listed': 0}
+        self.listing_stats_lock = threading.Lock()
+        # Caps listings per host while scan_path walks a source
+        self.source_limiter = None
         
         self.pDialog = None
         self.deal_process = 0
@@ -595,13 +130,26 @@ class KodiScraperSimulation:
             if self.MAX_WORKERS < 1: self.MAX_WORKERS = 8
         except:
             self.MAX_WORKERS = 8
-        self.executor = None
+        # prepare -> details -> enrich stages, results collected by the main thread
+        self.pipeline = None
+        # saves the results on its own thread and connection
+        self.db_writer = None
+        self.deepseek_module = None
+        self.progress_lock = threading.Lock()
+        # Directory fast hashes waiting for their videos: { path: [hash, pending, failed] }
+        self.path_hashes = {}
+        self.path_hashes_ready = []
+        self.path_hashes_lock = threading.Lock()
+        # Journal of the run, to resume a cancelled scan
+        self.journal = None
+        # Files for the journal whose movies wait for the DB batch commit, on the writer thread: [(path, saved, history)]
+        self.journal_pending = []
         
         self.stats_processed = 0
         self.stats_success = 0
         self.stats_failed = 0
-        self.running_futures = set()
-        self.future_map = {}
+        # scraped but not saved, counted by the DB writer
+        self.stats_save_errors = 0
         self.failed_items = []
 
         
@@ -627,13 +175,25 @@ class KodiScraperSimulation:
         json_str = xbmc.executeJSONRPC(json.dumps(req))
         return json.loads(json_str)
 
-    def load_scraped_files(self):
+    def load_scraped_files(self, roots=None):
         """
         Loads all scraped movie file paths into memory for fast lookup.
+        Read from the video database when it is open (only below `roots` if
+        given), JSON-RPC serializes the whole library into one response.
         """
         log("Loading scraped movies from library...", xbmc.LOGINFO)
+        if self.db and self.db.conn:
+            try:
+                self.scraped_files = {self.normalize_path(f) for f in self.db.iter_movie_files(roots)}
+                log(f"Loaded {len(self.scraped_files)} scraped movies from database.", xbmc.LOGINFO)
+                self.loaded_scraped_status = True
+                return
+            except sqlite3.Error as e:
+                log(f"Loading scraped movies from database failed, using JSON-RPC: {e}", xbmc.LOGWARNING)
+                self.scraped_files = set()
+
         result = self.execute_jsonrpc("VideoLibrary.GetMovies", {"properties": ["file"]})
-        
+
         if "result" in result and "movies" in result["result"]:
             for movie in result["result"]["movies"]:
                 f = movie.get("file", "")
@@ -744,74 +304,13 @@ class KodiScraperSimulation:
         Parses filename for valid unique IDs (e.g. {tmdb=123})
         Returns (success, type, id, match_string)
         """
-        match = self.video_filename_identifier_regexp.search(filename)
-        if match:
-            # match.group(0) is the full match string e.g. [tmdb=123]
-            # match.group(1) is the type e.g. tmdb
-            # match.group(2) is the id e.g. 123
-            return True, match.group(1).lower(), match.group(2), match.group(0)
-        return False, "", "", ""
+        return filename_cleaner.get_filename_identifier(filename)
 
     def clean_string(self, filename):
         """
         Simulates CUtil::CleanString
         """
-        str_title_and_year = filename
-        str_year = ""
-        
-        if str_title_and_year == "..":
-            return "", "", ""
-
-        # 1. Check for identifier
-        has_id, id_type, id_val, id_match = self.get_filename_identifier(str_title_and_year)
-        if has_id:
-            str_title_and_year = str_title_and_year.replace(id_match, "")
-
-        # 2. Check for year (and extract title part)
-        # C++: if (reYear.RegFind(strTitleAndYear.c_str()) >= 0)
-        # Matches: 1 -> Title, 2 -> Year
-        year_match = self.video_clean_datetime_regexp.search(str_title_and_year)
-        if year_match:
-            str_title_and_year = year_match.group(1)
-            str_year = year_match.group(2)
-
-        # 3. Remove extension
-        # If year was found, str_title_and_year is just the title part (captured before year).
-        # If year NOT found, we might still have the extension.
-        if not year_match:
-             # Python splitext handles removing extension
-             root, ext_found = os.path.splitext(str_title_and_year)
-             if ext_found: 
-                 str_title_and_year = root
-
-        # 4. Apply CleanString regexps (clutter removal)
-        for regex in self.video_clean_string_regexps:
-            match = regex.search(str_title_and_year)
-            if match:
-                # RegFind returns start index. We resize string to that index.
-                # In Python, we slice.
-                str_title_and_year = str_title_and_year[:match.start()]
-        
-        # 5. Clean Chars
-        # Replace _ with space.
-        # If no spaces, replace . with space (skip initial dots)
-        cleaned = list(str_title_and_year)
-        initial_dots = True
-        already_contains_space = ' ' in str_title_and_year
-        
-        for i, c in enumerate(cleaned):
-            if c != '.':
-                initial_dots = False
-            
-            if c == '_':
-                cleaned[i] = ' '
-            elif (not already_contains_space) and (not initial_dots) and (c == '.'):
-                cleaned[i] = ' '
-        
-        str_title_and_year = "".join(cleaned).strip()
-        str_title = str_title_and_year
-        
-        return str_title, str_year, (id_type, id_val) if has_id else None
+        return filename_cleaner.clean_string(filename)
 
     def get_latest_db_path(self):
         """
@@ -858,6 +357,9 @@ class KodiScraperSimulation:
             except:
                 return
 
+        if not files_map:
+            return
+
         available_art = details.setdefault('available_art', {})
         
         # Helper: add art if exists
@@ -1115,6 +617,59 @@ class KodiScraperSimulation:
             
         return None, None
 
+    def get_directory_mtime(self, path):
+        try:
+            stat = xbmcvfs.Stat(path)
+            # like Kodi, the ctime if the VFS has no mtime
+            return stat.st_mtime() or stat.st_ctime() or None
+        except Exception:
+            return None
+
+    def list_directory(self, path, settings=None, mtime=None):
+        """
+        DirectoryListing of `path` (with a trailing slash), None if it cannot be listed.
+        `mtime` of the directory if the caller already has it.
+        """
+        cache = None
+        if settings and settings.getSettingBool('enable_listing_cache') and listing_cache.is_remote(path):
+            cache = listing_cache.get_listing_cache()
+
+        mtime = [mtime] if mtime else []
+        def get_mtime():
+            if not mtime:
+                mtime.append(self.get_directory_mtime(path))
+            return mtime[0]
+
+        limiter = self.source_limiter
+        if limiter: limiter.acquire(path)
+        try:
+            if cache and not self.refresh_listings:
+                trust_seconds = settings.getSettingInt('listing_cache_hours') * 3600
+                cached = cache.get(path, trust_seconds, get_mtime)
+                if cached:
+                    with self.listing_stats_lock:
+                        self.listing_stats['cached'] += 1
+                    return DirectoryListing(path, cached[0], cached[1], self.video_extensions, self.image_extensions)
+
+            # stat first, a change during the listing then shows next time
+            if cache: get_mtime()
+            dirs, files = xbmcvfs.listdir(path)
+        except Exception:
+            log(f"Error listing dir: {path}", xbmc.LOGERROR)
+            return None
+        finally:
+            if limiter: limiter.release(path)
+        with self.listing_stats_lock:
+            self.listing_stats['listed'] += 1
+        if cache:
+            cache.put(path, dirs, files, get_mtime())
+        return DirectoryListing(path, dirs, files, self.video_extensions, self.image_extensions)
+
+    def get_raw_name(self, file_path):
+        """Decoded filename of `file_path`, what the title is parsed from"""
+        normalized_path = file_path.replace("\\", "/")
+        return urllib.parse.unquote(normalized_path.split("/")[-1])
+
     def deepseek_pre_clean_name(self, raw_name):
         # Pre-clean filename for DeepSeek: Remove known Kodi ID patterns
         # Matches variations: [tmdb=123], [tmdbid=123], [tmdb-id=123], [tmdb_id=123] etc.
@@ -1122,19 +677,13 @@ class KodiScraperSimulation:
         ds_filename = re.sub(r'\s+', ' ', ds_filename).strip()
         return ds_filename
 
-    def extract_info_via_deepseek(self, raw_name, deepseek_extractor):
-        if not deepseek_extractor:
-            return None, None, None
-
+    def parse_deepseek_data(self, raw_name, ds_data):
+        """(title, year, english_title) from the dict DeepSeek returned for `raw_name`"""
         title = None
         year = None
         english_title = None
 
         try:
-            ds_filename = self.deepseek_pre_clean_name(raw_name)
-
-            # Use cleaned filename for context
-            ds_data = deepseek_extractor.extract(ds_filename)
             if ds_data:
                 # Support multiple key variations for robustness
                 t_cn = ds_data.get('cn') or ds_data.get('chinese') or ds_data.get('zh')
@@ -1164,22 +713,132 @@ class KodiScraperSimulation:
                 log(f"DeepSeek Extracted: '{raw_name}' -> zh: '{title}', year: '{year}', en: '{english_title}' ", xbmc.LOGINFO)
         except Exception as e:
             log(f"DeepSeek Process Error: {e}", xbmc.LOGERROR)
-            
+
         return title, year, english_title
 
-    def process_file(self, file_path, settings, video_files_in_dir=1, deepseek_extractor=None):
-        search_history = []
-        try:
-            # Prepare directory listing once for all local checks (Optimization)
-            dir_path = os.path.dirname(file_path)
-            files_map = {}
+    def extract_info_via_deepseek(self, raw_name, deepseek_extractor, parse_cache=None):
+        if not deepseek_extractor:
+            return None, None, None
+
+        # the directory's batch is asked already, wait for it instead of asking again
+        prefetch = self.deepseek_prefetched.pop(raw_name, None)
+        if prefetch:
             try:
-                _, files = xbmcvfs.listdir(dir_path)
-                files_map = {f.lower(): f for f in files}
-            except: pass
+                prefetched = prefetch.result().get(raw_name)
+            except Exception:
+                prefetched = None
+            if prefetched:
+                return prefetched
+
+        ds_filename = self.deepseek_pre_clean_name(raw_name)
+        if parse_cache:
+            cached = parse_cache.get_deepseek(ds_filename, deepseek_extractor.model, deepseek_extractor.prompt_template)
+            if cached is not None:
+                log(f"DeepSeek Cached: '{raw_name}' -> zh: '{cached[0]}', year: '{cached[1]}', en: '{cached[2]}' ", xbmc.LOGINFO)
+                return cached
+
+        ds_data = None
+        try:
+            # Use cleaned filename for context
+            ds_data = deepseek_extractor.extract(ds_filename)
+        except Exception as e:
+            log(f"DeepSeek Process Error: {e}", xbmc.LOGERROR)
+        title, year, english_title = self.parse_deepseek_data(raw_name, ds_data)
 
-            normalized_path = file_path.replace("\\", "/")
-            raw_name = urllib.parse.unquote(normalized_path.split("/")[-1])
+        # no data is a failed request, not an answer worth keeping
+        if parse_cache and ds_data is not None:
+            parse_cache.put_deepseek(ds_filename, deepseek_extractor.model, deepseek_extractor.prompt_template,
+                title, year, english_title)
+        return title, year, english_title
+
+    def prefetch_deepseek(self, raw_names, deepseek_extractor, parse_cache=None):
+        """
+        Extract the titles of several files with batched DeepSeek requests, runs
+        on the DeepSeek executor. Returns { raw_name: (title, year, english_title) },
+        files DeepSeek gives no valid answer for are left to the per-file request.
+        """
+        prefetched = {}
+        model, prompt_template = deepseek_extractor.model, deepseek_extractor.prompt_template
+        if parse_cache:
+            raw_names = [raw_name for raw_name in raw_names
+                if parse_cache.get_deepseek(self.deepseek_pre_clean_name(raw_name), model, prompt_template) is None]
+        for start in range(0, len(raw_names), DEEPSEEK_BATCH_SIZE):
+            if self.check_should_stop():
+                break
+            batch = raw_names[start:start + DEEPSEEK_BATCH_SIZE]
+            ds_filenames = [self.deepseek_pre_clean_name(raw_name) for raw_name in batch]
+            try:
+                batch_data = deepseek_extractor.extract_batch(ds_filenames)
+            except Exception as e:
+                log(f"DeepSeek Batch Error: {e}", xbmc.LOGERROR)
+                continue
+            for raw_name, ds_filename, ds_data in zip(batch, ds_filenames, batch_data):
+                if ds_data is None:
+                    continue
+                title, year, english_title = self.parse_deepseek_data(raw_name, ds_data)
+                if parse_cache:
+                    parse_cache.put_deepseek(ds_filename, model, prompt_template, title, year, english_title)
+                if title:
+                    prefetched[raw_name] = (title, year, english_title)
+            log(f"DeepSeek batch: extracted {len(prefetched)}/{start + len(batch)} filenames", xbmc.LOGINFO)
+        return prefetched
+
+    def deepseek_prefetch_names(self, path, files, listing, settings):
+        """
+        Raw names of the directory's `files` that end up asking DeepSeek: no
+        ID in the name, no NFO, no title index match, no confident release name.
+        """
+        nfo_map = {} if settings.getSettingBool('ignore_local_nfo_art') else listing.nfo_map
+        use_title_index = settings.getSettingBool('enable_title_index')
+        use_release_parser = settings.getSettingBool('enable_release_parser')
+        pending = []
+        for file in files:
+            base_name, _ = os.path.splitext(file)
+            if f"{base_name}.nfo".lower() in nfo_map or (listing.video_files_in_dir == 1 and "movie.nfo" in nfo_map):
+                continue
+            raw_name = self.get_raw_name(path + file)
+            title, year, unique_id = self.clean_string(raw_name)
+            if unique_id:
+                continue
+            if use_title_index and title_index.resolve(title, year or None):
+                continue
+            if use_release_parser and release_parser.is_confident(release_parser.parse(raw_name)):
+                continue
+            pending.append(raw_name)
+        return pending
+
+    def _record_speculative_deepseek(self, outcome):
+        with self.speculative_deepseek_lock:
+            self.speculative_deepseek_stats[outcome] += 1
+
+    def new_task(self, file_path, settings, video_files_in_dir=1, deepseek_extractor=None, listing=None):
+        """State of one file passed from stage to stage, 'result' is set once it is finished"""
+        return {'path': file_path, 'settings': settings, 'video_files_in_dir': video_files_in_dir,
+            'deepseek_extractor': deepseek_extractor, 'listing': listing, 'history': [], 'result': None}
+
+    def process_file(self, file_path, settings, video_files_in_dir=1, deepseek_extractor=None, listing=None):
+        """All stages for one file: its details, or {'is_failed': True, 'history': [...]}"""
+        task = self.new_task(file_path, settings, video_files_in_dir, deepseek_extractor, listing)
+        self.prepare_file(task)
+        self.fetch_details(task)
+        self.enrich_details(task)
+        return task['result']
+
+    def prepare_file(self, task):
+        """
+        Stage 1: parse the filename and read a local NFO, no TMDB requests.
+        """
+        file_path, settings = task['path'], task['settings']
+        search_history = task['history']
+        try:
+            # Local checks use the directory listing scan_path already made
+            if task['listing'] is None:
+                task['listing'] = self.list_directory(os.path.dirname(file_path) + "/")
+            listing = task['listing']
+
+            raw_name = self.get_raw_name(file_path)
+            # DeepSeek answers are cached, cleaning is cheaper than a lookup
+            parse_cache = filename_cache.get_filename_cache() if settings.getSettingBool('enable_filename_cache') else None
             title, year, unique_id = self.clean_string(raw_name)
             if not year:
                 year = None
@@ -1189,26 +848,44 @@ class KodiScraperSimulation:
                 search_history.append(f"唯一ID: {id_type}={id_val}")
             
             log(f"Processing: {file_path} | Title: {title} | Year: {year} | ID: {unique_id}", xbmc.LOGINFO)
+            task.update(raw_name=raw_name, parse_cache=parse_cache, title=title, year=year, unique_id=unique_id)
+
+            # 1. NFO Check
+            task['nfo'] = (None, None)
+            if not settings.getSettingBool('ignore_local_nfo_art'):
+                task['nfo'] = self.scan_local_nfo(file_path, task['video_files_in_dir'], listing.nfo_map if listing else {})
+        except Exception:
+            log(f"Fatal Error in prepare_file for {file_path}: {traceback.format_exc()}", xbmc.LOGERROR)
+            task['result'] = {'is_failed': True, 'history': search_history}
+        return task
+
+    def fetch_details(self, task):
+        """
+        Stage 2: details by the NFO or filename IDs, the title index or the searches.
+        """
+        if task['result'] is not None: return task
+        file_path, settings = task['path'], task['settings']
+        deepseek_extractor = task['deepseek_extractor']
+        raw_name, parse_cache = task['raw_name'], task['parse_cache']
+        title, year, unique_id = task['title'], task['year'], task['unique_id']
+        search_history = task['history']
+        try:
             runner = ScraperRunner(settings)
             details = None
             ds_title, ds_year, ds_english = None, None, None
             english_title_from_deepseek = None # For compatibility in failure logging
 
-            ignore_local = settings.getSettingBool('ignore_local_nfo_art')
-
-            # 1. NFO Check
-            if not ignore_local:
-                nfo_details, nfo_ids = self.scan_local_nfo(file_path, video_files_in_dir, files_map)
-                if nfo_details:
-                    log(f"Found Full NFO for {file_path}", xbmc.LOGINFO)
-                    details = nfo_details
-                elif nfo_ids:
-                    log(f"Found NFO IDs: {nfo_ids}", xbmc.LOGINFO)
-                    search_history.append(f"NFO IDs: {nfo_ids}")
-                    try:
-                        details = runner.get_details(nfo_ids)
-                    except Exception as e:
-                        log(f"GetDetails(NFO) Error: {e}", xbmc.LOGERROR)
+            nfo_details, nfo_ids = task['nfo']
+            if nfo_details:
+                log(f"Found Full NFO for {file_path}", xbmc.LOGINFO)
+                details = nfo_details
+            elif nfo_ids:
+                log(f"Found NFO IDs: {nfo_ids}", xbmc.LOGINFO)
+                search_history.append(f"NFO IDs: {nfo_ids}")
+                try:
+                    details = runner.get_details(nfo_ids)
+                except Exception as e:
+                    log(f"GetDetails(NFO) Error: {e}", xbmc.LOGERROR)
 
             # unique_id = None
             # 2. Filename ID
@@ -1220,14 +897,43 @@ class KodiScraperSimulation:
                 except Exception as e:
                     log(f"GetDetails(Direct) Error: {e}", xbmc.LOGERROR)
 
+            # 2.1 Offline Title Index (no search request needed)
+            if not details and settings.getSettingBool('enable_title_index'):
+                match = title_index.resolve(title, year)
+                if match:
+                    log(f"Match found (Title Index): {match.get('title')} (ID: {match.get('id')})", xbmc.LOGINFO)
+                    search_history.append(f"标题索引: {title} ({year}) -> {match.get('id')}")
+                    try:
+                        details = runner.get_details({'tmdb': str(match.get('id'))})
+                    except Exception as e:
+                        log(f"GetDetails(Title Index) Error: {e}", xbmc.LOGERROR)
+                    if details and 'error' in details:
+                        details = None
+
             # 3. Search
             if not details:
                 try:
                     results = []
+                    fallback_match = None
                     ds_title, ds_year, ds_english = None, None, None
                     
                     only_on_failure = settings.getSettingBool('deepseek_only_on_failure')
 
+                    release = None
+                    if settings.getSettingBool('enable_release_parser'):
+                        release = release_parser.parse(raw_name)
+                        if not release_parser.is_confident(release):
+                            release = None
+
+                    # Titles the traditional search will likely miss get their DeepSeek
+                    # extraction started right away, so a miss costs max(search, LLM)
+                    speculative = None
+                    if (deepseek_extractor and only_on_failure and self.deepseek_executor and not release
+                            and settings.getSettingBool('deepseek_speculative')
+                            and filename_cleaner.is_low_confidence(title, year)):
+                        speculative = self.deepseek_executor.submit(
+                            self.extract_info_via_deepseek, raw_name, deepseek_extractor, parse_cache)
+
                     # 3.1 Direct Search (Traditional)
                     if not deepseek_extractor or only_on_failure:
                         # If deepseek is off, OR it's enabled but we only use it on failure
@@ -1235,11 +941,45 @@ class KodiScraperSimulation:
                         results = runner.search(title, year)
                         
                         if results:
-                            # Traditional search success
-                            match = results[0]
-                            log(f"Match found (Traditional): {match.get('title')} (ID: {match.get('id')})", xbmc.LOGINFO)
-                            unique_ids = {'tmdb': str(match.get('id'))}
-                            details = runner.get_details(unique_ids)
+                            scored = candidate_scorer.score_candidates(results, title, year)
+                            fallback_match = scored[0][1]
+                            # Ambiguous results are left to DeepSeek when it is available and
+                            # a better title could tell them apart
+                            if (candidate_scorer.is_confident(scored) or not deepseek_extractor
+                                    or not candidate_scorer.needs_better_title(scored)):
+                                # Traditional search success
+                                match = fallback_match
+                                log(f"Match found (Traditional): {match.get('title')} (ID: {match.get('id')}, score: {scored[0][0]:.2f})", xbmc.LOGINFO)
+                                unique_ids = {'tmdb': str(match.get('id'))}
+                                details = runner.get_details(unique_ids)
+                            else:
+                                log(f"Ambiguous results (Traditional) for {title}: best {fallback_match.get('title')} (score: {scored[0][0]:.2f})", xbmc.LOGINFO)
+                                search_history.append(f"结果不明确: {fallback_match.get('title')} ({scored[0][0]:.2f})")
+
+                    # 3.15 Release Parser (confidently parsed Chinese release names need no LLM)
+                    traditional_searched = not deepseek_extractor or only_on_failure
+                    if (not details and release
+                            and not (traditional_searched and (release['title'], release['year']) == (title, year))):
+                        rp_title, rp_year, rp_english = release['title'], release['year'], release['english_title']
+                        search_history.append(f"搜索(规则解析): {rp_title} ({rp_year})")
+                        results = runner.search(rp_title, rp_year)
+                        if not results and rp_english and rp_english != rp_title:
+                            search_history.append(f"搜索(规则解析英文): {rp_english} ({rp_year})")
+                            results = runner.search(rp_english, rp_year)
+
+                        if results:
+                            alt_titles = (rp_english,) if rp_english else ()
+                            scored = candidate_scorer.score_candidates(results, rp_title, rp_year, alt_titles)
+                            if (candidate_scorer.is_confident(scored) or not deepseek_extractor
+                                    or not candidate_scorer.needs_better_title(scored)):
+                                match = scored[0][1]
+                                log(f"Match found (Release Parser): {match.get('title')} (ID: {match.get('id')}, score: {scored[0][0]:.2f})", xbmc.LOGINFO)
+                                details = runner.get_details({'tmdb': str(match.get('id'))})
+                            else:
+                                log(f"Ambiguous results (Release Parser) for {rp_title}: best {scored[0][1].get('title')} (score: {scored[0][0]:.2f})", xbmc.LOGINFO)
+                                search_history.append(f"结果不明确: {scored[0][1].get('title')} ({scored[0][0]:.2f})")
+                                if not fallback_match:
+                                    fallback_match = scored[0][1]
 
                     # 3.2 DeepSeek Search (If needed)
                     # Condition: DeepSeek is enabled AND (it's not 'only_on_failure' OR previous search failed)
@@ -1249,7 +989,13 @@ class KodiScraperSimulation:
                         if only_on_failure:
                             log("Traditional search failed. Trying DeepSeek...", xbmc.LOGINFO)
                             
-                        ds_title, ds_year, ds_english = self.extract_info_via_deepseek(raw_name, deepseek_extractor)
+                        if speculative:
+                            ds_title, ds_year, ds_english = speculative.result()
+                            self._record_speculative_deepseek('used')
+                            speculative = None
+                        else:
+                            ds_title, ds_year, ds_english = self.extract_info_via_deepseek(raw_name, deepseek_extractor, parse_cache)
+                        results = []
                         
                         # Use DeepSeek info if available
                         search_title = ds_title
@@ -1265,28 +1011,53 @@ class KodiScraperSimulation:
                             results = runner.search(ds_english, search_year)
                             
                         if results:
-                            match = results[0]
-                            log(f"Match found (DeepSeek): {match.get('title')} (ID: {match.get('id')})", xbmc.LOGINFO)
+                            alt_titles = (ds_english,) if ds_english else ()
+                            scored = candidate_scorer.score_candidates(results, search_title or ds_english, search_year, alt_titles)
+                            match = scored[0][1]
+                            log(f"Match found (DeepSeek): {match.get('title')} (ID: {match.get('id')}, score: {scored[0][0]:.2f})", xbmc.LOGINFO)
                             unique_ids = {'tmdb': str(match.get('id'))}
                             details = runner.get_details(unique_ids)
+                        elif fallback_match:
+                            log(f"No results found via DeepSeek for {search_title}, using ambiguous match {fallback_match.get('title')}", xbmc.LOGINFO)
+                            details = runner.get_details({'tmdb': str(fallback_match.get('id'))})
                         else:
                             log(f"No results found via DeepSeek for {search_title}", xbmc.LOGWARNING)
 
+                    if speculative:
+                        # Traditional search succeeded, drop the extraction if it has not started;
+                        # a finished one is still in the filename cache for the next scan
+                        speculative.cancel()
+                        self._record_speculative_deepseek('ignored')
+
                 except Exception as e:
                     log(f"Search Error: {e}", xbmc.LOGERROR)
 
             if not details or "error" in details:
                 # log(f"Failed to get details for {title} {year} {unique_id} {english_title_from_deepseek} {file_path}", xbmc.LOGERROR)
-                return {'is_failed': True, 'history': search_history}
-            
-            # 4. Local Artwork Overlay
-            if not ignore_local:
-                self.scan_local_art(file_path, details, video_files_in_dir, files_map)
+                task['result'] = {'is_failed': True, 'history': search_history}
+            else:
+                task['details'] = details
+        except Exception:
+            log(f"Fatal Error in fetch_details for {file_path}: {traceback.format_exc()}", xbmc.LOGERROR)
+            task['result'] = {'is_failed': True, 'history': search_history}
+        return task
 
-            return details
+    def enrich_details(self, task):
+        """
+        Stage 3: overlay local artwork, sets the task's result.
+        """
+        if task['result'] is not None: return task
+        details = task['details']
+        try:
+            # 4. Local Artwork Overlay
+            if not task['settings'].getSettingBool('ignore_local_nfo_art'):
+                listing = task['listing']
+                self.scan_local_art(task['path'], details, task['video_files_in_dir'], listing.image_map if listing else {})
+            task['result'] = details
         except Exception:
-            log(f"Fatal Error in process_file for {file_path}: {traceback.format_exc()}", xbmc.LOGERROR)
-            return {'is_failed': True, 'history': search_history}
+            log(f"Fatal Error in enrich_details for {task['path']}: {traceback.format_exc()}", xbmc.LOGERROR)
+            task['result'] = {'is_failed': True, 'history': task['history']}
+        return task
 
     def check_should_stop(self):
         if self.stop_scan: return True
@@ -1296,126 +1067,275 @@ class KodiScraperSimulation:
         return False
 
 
-    def handle_finished_futures(self, done_futures):
-        for f in done_futures:
-            if f not in self.future_map: continue
-                
-            f_path, _, weight, merge_vers = self.future_map.pop(f)
-            self.running_futures.remove(f)
-            
-            # process_file returns 'details' or {'is_failed': True, 'history': []} or None
-            details = None
-            try: details = f.result()
-            except: details = None
-            
-            self.stats_processed += 1
-            if weight:
-                self.deal_process += weight
-            scraped_title = None
-            
-            # Check for failure marker
-            is_failed = False
-            failure_history = []
-            if details and isinstance(details, dict) and details.get('is_failed'):
-                is_failed = True
-                failure_history = details.get('history', [])
-                details = None # Clear details to trigger failure block below
-
-            if details and not is_failed:
-                self.stats_success += 1
-                if self.db:
-                    try:
-                        # Ensure thread safety for DB writes (Main Thread)
-                        f_dir = os.path.dirname(f_path)
-                        id_path = self.db.get_or_create_path(f_dir)
-                        id_file = self.db.get_or_create_file(f_path, id_path)
-                        self.db.save_movie(id_file, details, f_path, merge_versions=merge_vers)
-                        info_obj = details.get('info', {})
-                        year = info_obj.get('year', '')
-                        if not year and info_obj.get('premiered'):
-                            try: year = str(info_obj.get('premiered'))[:4]
-                            except: pass
-                        scraped_title = f"{info_obj.get('title', 'Unknown')}({year})"
-                        log(f"Saved to DB: {scraped_title}", xbmc.LOGINFO)
-                    except Exception as e:
-                        log(f"DB Save Error for {f_path}: {e}", xbmc.LOGERROR)
-            else:
-                self.stats_failed += 1
-                log(f"Task Failed or Returned None for {f_path}", xbmc.LOGWARNING)
-                # Store object with failure info
-                self.failed_items.append({
-                    'path': f_path,
-                    'history': failure_history
-                })
-            f_dir = urllib.parse.unquote(os.path.dirname(f_path))
-            f_name = urllib.parse.unquote(os.path.basename(f_path).split(".")[0])
-            message = f"目录: {f_dir}\n {f_name}-> {scraped_title}\n 总计(成功: {self.stats_success}, 失败: {self.stats_failed})"
-            if self.pDialog:
-                self.pDialog.update(int(self.deal_process*100), message)
+    def fail_task(self, task, error):
+        """Result of a task whose stage raised `error`"""
+        task['result'] = {'is_failed': True, 'history': task['history']}
+        return task
 
-    def scan_path(self, path, path_total_process, deepseek_extractor=None):
+    def add_progress(self, weight):
+        with self.progress_lock:
+            self.deal_process += weight
+
+    def register_path_hash(self, path, dir_hash, pending):
+        with self.path_hashes_lock:
+            if pending:
+                self.path_hashes[path] = [dir_hash, pending, False]
+            else:
+                self.path_hashes_ready.append((path, dir_hash))
+
+    def finish_path_hash(self, path, success):
+        """Counts a saved or failed video of `path`, the hash becomes ready after the last one saved"""
+        with self.path_hashes_lock:
+            entry = self.path_hashes.get(path)
+            if not entry: return
+            entry[1] -= 1
+            entry[2] = entry[2] or not success
+            if entry[1] == 0:
+                del self.path_hashes[path]
+                if not entry[2]:
+                    self.path_hashes_ready.append((path, entry[0]))
+
+    def save_path_hashes(self, db):
+        """Stores the hashes of the directories done so far, on the writer thread"""
+        with self.path_hashes_lock:
+            ready, self.path_hashes_ready = self.path_hashes_ready, []
+        if not db: return
+        for path, dir_hash in ready:
+            try:
+                db.set_path_hash(path, dir_hash)
+            except Exception as e:
+                log(f"Path Hash Save Error for {path}: {e}", xbmc.LOGERROR)
+
+    def open_writer_db(self):
+        """The writer thread's own connection to the video database, None in simulation mode"""
+        if not self.db: return None
+        db = KodiDatabase(self.db.db_path)
+        db.connect()
+        return db if db.conn else None
+
+    def commit_results(self, db, force=False):
         """
-        Scans a path using xbmcvfs (supports dav://, smb://, etc.)
+        Flush of the DB writer: commits the batch when it is due (now if
+        `force`); the journal only records files once their movies are committed.
         """
-        if self.check_should_stop(): return
+        self.save_path_hashes(db)
+        if db:
+            db.commit(force)
+            if db.conn and db.conn.in_transaction:
+                return
+        if self.journal:
+            self.journal.files_done(self.journal_pending)
+        self.journal_pending = []
+
+    def write_result(self, db, result):
+        """Saves a finished file, on the writer thread"""
+        f_path, details, merge_vers, failure_history = result
+        saved = False
+        if details and self.db and not db:
+            # the writer's connection failed to open
+            self.stats_save_errors += 1
+        elif details and db:
+            try:
+                f_dir = os.path.dirname(f_path)
+                with db.savepoint():
+                    id_path = db.get_or_create_path(f_dir)
+                    id_file = db.get_or_create_file(f_path, id_path)
+                    db.save_movie(id_file, details, f_path, merge_versions=merge_vers)
+                saved = True
+                log(f"Saved to DB: {self.get_scraped_title(details)}", xbmc.LOGINFO)
+            except Exception as e:
+                self.stats_save_errors += 1
+                log(f"DB Save Error for {f_path}: {e}", xbmc.LOGERROR)
+        self.finish_path_hash(os.path.dirname(f_path) + "/", saved)
+        if self.journal:
+            # without a database (simulation only) scraping is all there is to do
+            self.journal_pending.append((f_path, saved or (details is not None and not self.db), failure_history))
+
+    def get_scraped_title(self, details):
+        info_obj = details.get('info', {})
+        year = info_obj.get('year', '')
+        if not year and info_obj.get('premiered'):
+            try: year = str(info_obj.get('premiered'))[:4]
+            except: pass
+        return f"{info_obj.get('title', 'Unknown')}({year})"
 
-        # Ensure trailing slash
-        if not path.endswith("/") and not path.endswith("\\"):
-            path += "/"
-            
+    def handle_result(self, task):
+        """
+        On the main thread: counts a finished file, updates the progress and
+        hands the file to the DB writer.
+        """
+        f_path, weight, merge_vers = task['path'], task['weight'], task['merge_vers']
+        # the task's result is its details or {'is_failed': True, 'history': []}
+        details = task['result']
+
+        self.stats_processed += 1
+        if weight:
+            self.add_progress(weight)
+        scraped_title = None
+        
+        # Check for failure marker
+        is_failed = False
+        failure_history = []
+        if details and isinstance(details, dict) and details.get('is_failed'):
+            is_failed = True
+            failure_history = details.get('history', [])
+            details = None # Clear details to trigger failure block below
+
+        if details and not is_failed:
+            self.stats_success += 1
+            scraped_title = self.get_scraped_title(details)
+        else:
+            self.stats_failed += 1
+            log(f"Task Failed or Returned None for {f_path}", xbmc.LOGWARNING)
+            # Store object with failure info
+            self.failed_items.append({
+                'path': f_path,
+                'history': failure_history
+            })
+        # blocks while the writer's queue is full
+        self.db_writer.put((f_path, details, merge_vers, failure_history))
+        f_dir = urllib.parse.unquote(os.path.dirname(f_path))
+        f_name = urllib.parse.unquote(os.path.basename(f_path).split(".")[0])
+        message = f"目录: {f_dir}\n {f_name}-> {scraped_title}\n 总计(成功: {self.stats_success}, 失败: {self.stats_failed})"
         if self.pDialog:
-            display_name = urllib.parse.unquote(os.path.basename(path.rstrip("/\\")))
-            message = f"扫描目录: {display_name}\n总计(成功: {self.stats_success}, 失败: {self.stats_failed})"
-            self.pDialog.update(int(self.deal_process * 100), message)
-                
+            self.pDialog.update(int(self.deal_process*100), message)
+
+    def scan_directory(self, path, path_total_process):
+        """
+        Resolves and lists one directory on a walker thread.
+        Returns ((settings, listing, item_weight_process, path_hash), subdirectories as (path, weight));
+        settings is None for a skipped directory, item_weight_process is then the progress to add.
+        path_hash is the Kodi fast hash to store once all its videos are saved, None if it has none.
+        """
+        if self.stop_scan: return (None, None, 0, None), []
+
         # 1. Resolve effective scraper settings/flags for this directory ONCE
         overrides, is_excluded, is_no_update = self.resolve_path_attributes(path)
         settings = SettingsProxy(ADDON_SETTINGS, overrides)
         
         if is_excluded:
             log(f"SKIPPING Directory {path}: Path Excluded", xbmc.LOGINFO)
-            return
+            return (None, None, 0, None), []
         if is_no_update:
             log(f"SKIPPING Directory {path}: Path noUpdate", xbmc.LOGINFO)
-            return
-
-        try:
-            dirs, files = xbmcvfs.listdir(path)
-        except Exception:
-            log(f"Error listing dir: {path}", xbmc.LOGERROR)
-            return
+            return (None, None, 0, None), []
+
+        # Kodi Logic: skip directories whose fast hash matches the one stored by the last scan
+        current_hash = None
+        mtime = None
+        if settings.getSettingBool('enable_path_hash'):
+            mtime = self.get_directory_mtime(path)
+            current_hash = path_hash.fast_hash(mtime)
+            stored = self.path_cache.get(self.normalize_path(path) + "/", {}).get('hash')
+            if not self.refresh_listings and path_hash.is_unchanged(stored, current_hash):
+                log(f"SKIPPING Directory {path}: unchanged (path hash)", xbmc.LOGDEBUG)
+                return (None, None, path_total_process, None), []
+
+        listing = self.list_directory(path, settings, mtime)
+        if listing is None:
+            return (None, None, 0, None), []
+        dirs, files = listing.dirs, listing.files
 
-        # NEW: Check merge setting
-        merge_vers = settings.getSettingBool('merge_same_movie_version')
-            
         # Kodi Logic: Check for .nomedia file
         # If present, recursively skip this folder and all subfolders (Kodi behavior)
         if ".nomedia" in files:
             log(f"SKIPPING Directory {path}: .nomedia found", xbmc.LOGINFO)
-            self.deal_process += path_total_process
-            return
+            return (None, None, path_total_process, None), []
 
         # New Logic: Skip BDMV folder if setting enabled
         if settings.getSettingBool('skip_bdmv_folder'):
             # Case-insensitive check for BDMV folder
             if any(d.upper() == 'BDMV' for d in dirs):
                 log(f"SKIPPING Directory {path}: BDMV folder found", xbmc.LOGINFO)
-                self.deal_process += path_total_process
-                return
+                return (None, None, path_total_process, None), []
 
         l = len(files) + len(dirs)
         if l == 0:
-            self.deal_process += path_total_process
-            return
+            return (None, None, path_total_process, None), []
         item_weight_process = (path_total_process / l) if l > 0 else 0
+        # only directories without subdirectories have a fast hash
+        if dirs or not listing.video_files:
+            current_hash = None
+        subdirs = [(path + d + "/", item_weight_process) for d in dirs]
+        if self.journal:
+            # a resumed run walks the directories it knows from its frontier
+            subdirs = [(sub, weight) for sub, weight in subdirs if not self.journal.is_known_dir(sub)]
+        return (settings, listing, item_weight_process, current_hash), subdirs
+
+    def scan_path(self, path, path_total_process, deepseek_extractor=None):
+        """
+        Scans a path using xbmcvfs (supports dav://, smb://, etc.)
+        Directories are listed concurrently, their files submitted as they are listed.
+        """
+        if self.check_should_stop(): return
+
+        # Ensure trailing slash
+        if not path.endswith("/") and not path.endswith("\\"):
+            path += "/"
+
+        overrides, _, _ = self.resolve_path_attributes(path)
+        root_settings = SettingsProxy(ADDON_SETTINGS, overrides)
+        self.source_limiter = SourceLimiter(root_settings.getSettingInt('listing_per_source'),
+            root_settings.getSettingInt('listing_interval_ms') / 1000.0)
+        roots = [(path, path_total_process)]
+        if self.journal:
+            if self.journal.is_known_dir(path):
+                roots = self.journal.frontier(path)
+            else:
+                self.journal.add_dirs(roots)
+        walker = DirectoryWalker(self.scan_directory, root_settings.getSettingInt('listing_threads'))
+        try:
+            for dir_path, (settings, listing, item_weight_process, dir_hash) in walker.walk(roots):
+                if self.check_should_stop(): break
+                if settings is None:
+                    if self.journal: self.journal.directory_done(dir_path)
+                    self.add_progress(item_weight_process)
+                    continue
+                self.process_directory(dir_path, settings, listing, item_weight_process, deepseek_extractor, dir_hash)
+        finally:
+            walker.close()
+            self.source_limiter = None
+
+    def process_directory(self, path, settings, listing, item_weight_process, deepseek_extractor=None, dir_hash=None):
+        """
+        Submits the videos of a listed directory.
+        """
+        if self.pDialog:
+            display_name = urllib.parse.unquote(os.path.basename(path.rstrip("/\\")))
+            message = f"扫描目录: {display_name}\n总计(成功: {self.stats_success}, 失败: {self.stats_failed})"
+            self.pDialog.update(int(self.deal_process * 100), message)
+
+        files = listing.files
+
+        # NEW: Check merge setting
+        merge_vers = settings.getSettingBool('merge_same_movie_version')
         
         # Count actual video files for ambiguity checks
-        video_files_in_dir = 0
-        for f in files:
-            _, ext = os.path.splitext(f)
-            if ext.lower() in self.video_extensions:
-                video_files_in_dir += 1
-        
+        video_files_in_dir = listing.video_files_in_dir
+
+        unscraped = [file for file in listing.video_files if not self.is_video_scraped(path + file)
+            and not (self.journal and self.journal.is_finished_file(path + file))]
+        if self.journal:
+            self.journal.directory_done(path, [(path + d + "/", item_weight_process) for d in listing.dirs],
+                [path + file for file in unscraped])
+
+        # The hash is stored once every video still to scrape is saved, not
+        # at all if one failed earlier in a resumed run
+        if dir_hash and not (self.journal and any(self.journal.is_failed_file(path + file) for file in listing.video_files)):
+            self.register_path_hash(path, dir_hash, len(unscraped))
+        
+        # Extract titles for the directory's pending files with batched DeepSeek
+        # requests when every file would be sent to DeepSeek anyway, in the
+        # background: the files' workers wait for it when they get there
+        if (deepseek_extractor and self.deepseek_executor
+                and not settings.getSettingBool('deepseek_only_on_failure')):
+            pending = self.deepseek_prefetch_names(path, unscraped, listing, settings)
+            if len(pending) > 1:
+                parse_cache = filename_cache.get_filename_cache() if settings.getSettingBool('enable_filename_cache') else None
+                prefetch = self.deepseek_executor.submit(self.prefetch_deepseek, pending, deepseek_extractor, parse_cache)
+                for raw_name in pending:
+                    self.deepseek_prefetched[raw_name] = prefetch
+
         # Process Files using the directory's runner settings
         for file in files:
             if self.check_should_stop(): break
@@ -1424,31 +1344,19 @@ class KodiScraperSimulation:
             if ext.lower() in self.video_extensions:
                 full_path = path + file
                 
-                # Check scraped
-                if self.is_video_scraped(full_path):
-                    self.deal_process += item_weight_process
+                # Check scraped, or finished earlier in a resumed run
+                if self.is_video_scraped(full_path) or (self.journal and self.journal.is_finished_file(full_path)):
+                    self.add_progress(item_weight_process)
                     if self.pDialog:
                         self.pDialog.update(int(self.deal_process * 100))
                     continue
 
-                # Check for cancellation or pool fullness
-                while len(self.running_futures) >= self.MAX_WORKERS:
-                    if self.check_should_stop(): break
-                    
-                    # BLOCKING WAIT: Wait for at least one future to complete
-                    done, _ = wait(self.running_futures, return_when=FIRST_COMPLETED)
-                    self.handle_finished_futures(done)
-
                 if self.check_should_stop(): break
 
-                # Submit new task
-                future = self.executor.submit(self.process_file, full_path, settings, video_files_in_dir, deepseek_extractor=deepseek_extractor)
-                self.running_futures.add(future)
-                self.future_map[future] = (full_path, settings, item_weight_process, merge_vers)
-        
-        # Process Directories
-        for d in dirs:
-            self.scan_path(path + d + "/", item_weight_process, deepseek_extractor)
+                # Blocks while the pipeline is full
+                task = self.new_task(full_path, settings, video_files_in_dir, deepseek_extractor, listing)
+                task.update(weight=item_weight_process, merge_vers=merge_vers)
+                if not self.pipeline.put(task): break
 
 
 
@@ -1530,22 +1438,99 @@ class KodiScraperSimulation:
         
         dns_override.set_custom_hosts(custom_ips)
 
+    def discover_roots(self, paths, icon_path):
+        """
+        Discover stage: walks the roots on its own thread and puts their videos into the pipeline.
+        """
+        try:
+            path_total_process = 1/len(paths)
+            for path in paths:
+                if self.check_should_stop(): break
+                
+                log(f"Processing Root Path: {path}", xbmc.LOGINFO)
+            
+                # Apply DNS overrides based on root path settings
+                overrides, _, _ = self.resolve_path_attributes(path)
+                path_settings = SettingsProxy(ADDON_SETTINGS, overrides)
+                self._apply_dns_settings(path_settings)
+            
+                # Initialize DeepSeek Extractor for this path
+                deepseek_extractor = None
+                if path_settings.getSettingBool('enable_deepseek'):
+                    try:
+                        from lib import deepseek_extractor as deepseek_module
+                        self.deepseek_module = deepseek_module
+                        from lib.deepseek_extractor import DeepSeekExtractor
+                        key_file = path_settings.getSettingString('deepseek_key_file')
+                        if key_file and xbmcvfs.exists(key_file):
+                            with xbmcvfs.File(key_file) as f:
+                                ds_key = f.read().strip()
+                            if ds_key:
+                                prompt_template = 'Parse filename to JSON: {"cn":"中文名","en":"英文名","year":"年份"}'
+                                deepseek_extractor = DeepSeekExtractor(
+                                    ds_key,
+                                    'https://api.deepseek.com',
+                                    path_settings.getSettingString('deepseek_model'),
+                                    prompt_template
+                                )
+                                log(f"DeepSeek initialized for path: {path}", xbmc.LOGINFO)
+                        else:
+                            log(f"DeepSeek key file not found or empty: {key_file}", xbmc.LOGWARNING)
+                            xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 密钥文件未找到或为空: {key_file}", icon_path, 3000)
+                    except Exception as e:
+                        log(f"DeepSeek Init Error: {e}", xbmc.LOGERROR)
+                        xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 初始化失败: {e}", icon_path, 3000)
+                        break
+
+                self.scan_path(path, path_total_process, deepseek_extractor)
+        except Exception:
+            log(f"Discover Error: {traceback.format_exc()}", xbmc.LOGERROR)
+
+    def collect_results(self, discover):
+        """
+        Takes the finished files off the pipeline until every discovered one is saved.
+        """
+        last_report = time.time()
+        while True:
+            if self.check_should_stop(): raise KeyboardInterrupt()
+            task = self.pipeline.get()
+            self.pipeline.sample()
+            if task:
+                self.handle_result(task)
+            if not task and not discover.is_alive() and self.pipeline.in_flight == 0:
+                break
+            if time.time() - last_report > PIPELINE_REPORT_INTERVAL:
+                last_report = time.time()
+                depths = " | ".join(f"{stage.name}: {stage.queue.qsize()}" for stage in self.pipeline.stages)
+                log(f"Pipeline queues | {depths} | results: {self.pipeline.output.qsize()} | db writer: {self.db_writer.queue.qsize()}", xbmc.LOGDEBUG)
+
+    def purge_caches(self):
+        """Removes the expired entries of the enabled persistent caches, once per scan"""
+        caches = (('enable_search_cache', search_cache.get_search_cache),
+                  ('enable_filename_cache', filename_cache.get_filename_cache),
+                  ('enable_listing_cache', listing_cache.get_listing_cache))
+        for setting_id, get_cache in caches:
+            cache = get_cache() if ADDON_SETTINGS.getSettingBool(setting_id) else None
+            if cache:
+                purged = cache.store.purge_expired()
+                if purged:
+                    log(f"Purged {purged} expired entries of {setting_id}", xbmc.LOGDEBUG)
+
     def scan_and_process(self):
         """
         Main entry point.
         """
         log("Starting Scan...", xbmc.LOGINFO)
         icon_path = ADDON_SETTINGS.getAddonInfo('icon')
-        
+
         self.pDialog = xbmcgui.DialogProgress()
         heading = "TMDB CN Optimization - 多线程扫描中..."
         self.pDialog.create(heading, "初始化中...")
         
         try:
-            # Initialize Thread Pool
-            self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
-            log(f"Initialized ThreadPoolExecutor with {self.MAX_WORKERS} workers.", xbmc.LOGINFO)
-            self.load_scraped_files()
+            # Separate pool, fetch_details workers wait on these
+            self.deepseek_executor = ThreadPoolExecutor(max_workers=DEEPSEEK_SPECULATIVE_WORKERS)
+            log(f"Scanning with {self.MAX_WORKERS} details workers.", xbmc.LOGINFO)
 
             # Initialize DB
             db_path = self.get_latest_db_path()
@@ -1558,6 +1543,8 @@ class KodiScraperSimulation:
                 self.db = None
                 log("No Kodi Database found. Simulation only.", xbmc.LOGWARNING)
             
+            self.purge_caches()
+
             # Get start points
             paths = self.get_scraper_roots()
             if not paths:
@@ -1566,49 +1553,29 @@ class KodiScraperSimulation:
                     self.pDialog.update(100, "没有源绑定到 metadata.tmdb.cn.optimization.")
                     time.sleep(1)
             else:
-                path_total_process = 1/len(paths)
-                for path in paths:
-                    if self.check_should_stop(): raise KeyboardInterrupt()
-                        
-                    log(f"Processing Root Path: {path}", xbmc.LOGINFO)
-                    
-                    # Apply DNS overrides based on root path settings
-                    overrides, _, _ = self.resolve_path_attributes(path)
-                    path_settings = SettingsProxy(ADDON_SETTINGS, overrides)
-                    self._apply_dns_settings(path_settings)
-                    
-                    # Initialize DeepSeek Extractor for this path
-                    deepseek_extractor = None
-                    if path_settings.getSettingBool('enable_deepseek'):
-                        try:
-                            from lib.deepseek_extractor import DeepSeekExtractor
-                            key_file = path_settings.getSettingString('deepseek_key_file')
-                            if key_file and xbmcvfs.exists(key_file):
-                                with xbmcvfs.File(key_file) as f:
-                                    ds_key = f.read().strip()
-                                if ds_key:
-                                    prompt_template = 'Parse filename to JSON: {"cn":"中文名","en":"英文名","year":"年份"}'
-                                    deepseek_extractor = DeepSeekExtractor(
-                                        ds_key,
-                                        'https://api.deepseek.com',
-                                        path_settings.getSettingString('deepseek_model'),
-                                        prompt_template
-                                    )
-                                    log(f"DeepSeek initialized for path: {path}", xbmc.LOGINFO)
-                            else:
-                                log(f"DeepSeek key file not found or empty: {key_file}", xbmc.LOGWARNING)
-                                xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 密钥文件未找到或为空: {key_file}", icon_path, 3000)
-                        except Exception as e:
-                            log(f"DeepSeek Init Error: {e}", xbmc.LOGERROR)
-                            xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 初始化失败: {e}", icon_path, 3000)
-                            break
-
-                    self.scan_path(path, path_total_process, deepseek_extractor)
-
-                # Flush final remaining futures
-                while self.running_futures and not self.check_should_stop():
-                     done, _ = wait(self.running_futures, return_when=FIRST_COMPLETED)
-                     self.handle_finished_futures(done)
+                # only files below the roots are ever looked up
+                self.load_scraped_files(paths)
+                if ADDON_SETTINGS.getSettingBool('enable_scan_journal'):
+                    self.journal = scan_journal.open_scan_journal()
+                # the refresh action starts over as well
+                if self.journal and self.journal.start(paths, resume=not self.refresh_listings):
+                    failed = self.journal.failed_files()
+                    log(f"Resuming unfinished scan, {len(failed)} failed files are not retried", xbmc.LOGINFO)
+                    self.failed_items.extend({'path': f, 'history': self.journal.history(f)} for f in failed)
+                self.pipeline = Pipeline([
+                    Stage('prepare', self.prepare_file, PREPARE_WORKERS),
+                    Stage('details', self.fetch_details, self.MAX_WORKERS),
+                    Stage('enrich', self.enrich_details, ENRICH_WORKERS),
+                ], self.fail_task).start()
+                self.db_writer = DatabaseWriter(self.open_writer_db, self.write_result,
+                                                self.commit_results, KodiDatabase.close).start()
+                discover = threading.Thread(target=self.discover_roots, args=(paths, icon_path), name='scan-discover')
+                discover.start()
+                self.collect_results(discover)
+                # everything found is saved once the writer is through its queue
+                self.db_writer.close()
+                if self.journal and not self.stop_scan:
+                    self.journal.finish()
                     
         except KeyboardInterrupt:
             log("Scan cancelled by user.", xbmc.LOGINFO)
@@ -1616,9 +1583,21 @@ class KodiScraperSimulation:
             log(f"Scan Process Error: {traceback.format_exc()}", xbmc.LOGERROR)
             xbmcgui.Dialog().notification("TMDB CN Optimization", f"扫描出错: {e}", icon_path, 4000)
         finally:
-            if self.executor:
-                self.executor.shutdown(wait=False)
-                self.executor = None
+            if self.pipeline:
+                # the discover thread stops with it
+                self.stop_scan = True
+                self.pipeline.stop()
+            if self.deepseek_executor:
+                self.deepseek_executor.shutdown(wait=False)
+                self.deepseek_executor = None
+            # batches of files that failed or were never reached
+            self.deepseek_prefetched.clear()
+            if self.db_writer:
+                # a cancelled scan keeps the results collected so far
+                self.db_writer.close()
+            if self.journal:
+                self.journal.close()
+                self.journal = None
 
             if self.pDialog:
                 self.pDialog.close()
@@ -1629,8 +1608,34 @@ class KodiScraperSimulation:
             # Refresh UI/Library
             self.trigger_library_refresh()
             msg = f"多线程刮削: {self.stats_processed} | 成功: {self.stats_success} | 失败: {self.stats_failed}"
+            if self.stats_save_errors:
+                msg += f" | 保存失败: {self.stats_save_errors}"
             xbmcgui.Dialog().notification("TMDB CN Optimization", msg, icon_path, 5000)
             log(f"[SUMMARY] {msg.replace(chr(10), ' ')}", xbmc.LOGINFO)
+            page_stats = get_speculative_page_stats()
+            if page_stats['hit'] or page_stats['waste']:
+                log(f"[SUMMARY] Speculative page 2 | hit: {page_stats['hit']} | waste: {page_stats['waste']} | ratio: {page_stats['ratio']:.0%}", xbmc.LOGINFO)
+            if self.listing_stats['cached']:
+                log(f"[SUMMARY] Directory listings | cached: {self.listing_stats['cached']} | listed: {self.listing_stats['listed']}", xbmc.LOGINFO)
+            speculative_stats = self.speculative_deepseek_stats
+            if speculative_stats['used'] or speculative_stats['ignored']:
+                log(f"[SUMMARY] Speculative DeepSeek | used: {speculative_stats['used']} | ignored: {speculative_stats['ignored']}", xbmc.LOGINFO)
+            if self.pipeline:
+                for name, stats in self.pipeline.stats():
+                    log(f"[SUMMARY] Pipeline {name} | done: {stats['processed']} | busy: {stats['busy']:.1f}s | queue avg: {stats['queue_avg']:.1f} max: {stats['queue_max']}", xbmc.LOGINFO)
+                self.pipeline = None
+            if self.db_writer:
+                log(f"[SUMMARY] DB writer | done: {self.db_writer.written} | save errors: {self.stats_save_errors} | busy: {self.db_writer.busy:.1f}s", xbmc.LOGINFO)
+                self.db_writer = None
+            deepseek_module = self.deepseek_module
+            if deepseek_module:
+                # DeepSeek errors of all workers, reported once instead of per request
+                ds_errors = deepseek_module.get_error_summary()
+                deepseek_module.reset_error_summary()
+                if ds_errors:
+                    ds_msg = ", ".join(f"{kind} x{count}" for kind, count in ds_errors.items())
+                    log(f"[SUMMARY] DeepSeek errors | {ds_msg}", xbmc.LOGWARNING)
+                    xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 错误: {ds_msg}", icon_path, 5000)
 
             if self.failed_items:
                 failed_map = {}
@@ -1669,4 +1674,6 @@ class KodiScraperSimulation:
 
 if __name__ == '__main__':
     sim = KodiScraperSimulation()
+    # RunScript(metadata.tmdb.cn.optimization,refresh_listings) lists every directory again
+    sim.refresh_listings = 'refresh_listings' in sys.argv[1:]
     sim.scan_and_process()
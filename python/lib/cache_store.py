@@ -0,0 +1,107 @@
+# coding: utf-8
+"""Persistent key/value cache with expiry, stored as SQLite in the addon profile."""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import xbmc
+    import xbmcaddon
+    import xbmcvfs
+except ModuleNotFoundError:
+    # only used for logging and the profile path, not available nor needed for testing
+    xbmc = None
+    xbmcaddon = None
+    xbmcvfs = None
+
+
+def get_profile_path(filename):
+    """Full path of `filename` in the addon profile folder, creating the folder if needed"""
+    profile = xbmcvfs.translatePath(xbmcaddon.Addon().getAddonInfo('profile'))
+    if not os.path.isdir(profile):
+        os.makedirs(profile, exist_ok=True)
+    return os.path.join(profile, filename)
+
+
+class CacheStore(object):
+    """
+    JSON values by string key, each with its own time to live.
+
+    One connection is shared by all threads behind a lock. SQLite errors are
+    logged and treated as a cache miss, so a broken cache never stops a scan.
+    """
+
+    def __init__(self, db_path, table='cache'):
+        self.db_path = db_path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS {} '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)'.format(self.table))
+            self._conn.commit()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired"""
+        try:
+            with self._lock:
+                row = self._conn.execute('SELECT value, expires FROM {} WHERE key = ?'.format(self.table),
+                    (key,)).fetchone()
+        except sqlite3.Error as e:
+            _log('read failed: {}'.format(e))
+            return None
+        if not row:
+            return None
+        value, expires = row
+        if expires < time.time():
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl):
+        """Store `value` for `key` for `ttl` seconds"""
+        try:
+            with self._lock:
+                self._conn.execute('INSERT OR REPLACE INTO {} (key, value, expires) VALUES (?, ?, ?)'.format(self.table),
+                    (key, json.dumps(value, ensure_ascii=False), time.time() + ttl))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            _log('write failed: {}'.format(e))
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM {} WHERE key = ?'.format(self.table), (key,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            _log('delete failed: {}'.format(e))
+
+    def purge_expired(self):
+        """Remove all expired entries, returns the number removed"""
+        try:
+            with self._lock:
+                cursor = self._conn.execute('DELETE FROM {} WHERE expires < ?'.format(self.table), (time.time(),))
+                self._conn.commit()
+                return cursor.rowcount
+        except sqlite3.Error as e:
+            _log('purge failed: {}'.format(e))
+            return 0
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM {}'.format(self.table))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            _log('clear failed: {}'.format(e))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _log(message):
+    if xbmc:
+        xbmc.log('[TMDB Scraper] Cache ' + message, xbmc.LOGWARNING)
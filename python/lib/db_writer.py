@@ -0,0 +1,104 @@
+# coding: utf-8
+"""
+A thread of its own writing the scan's results to the database.
+
+Results are queued to it and written in order, so the thread collecting them
+and updating the progress never waits on the database. The queue is bounded:
+a slow database holds back the scan instead of piling up results in memory.
+SQLite connections belong to the thread that opened them, the connection is
+opened, flushed and closed on the writer thread.
+"""
+import queue
+import threading
+import time
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+# Seconds between flushes while the queue is empty
+POLL_INTERVAL = 0.2
+QUEUE_SIZE = 64
+
+_CLOSE = object()
+
+
+class DatabaseWriter(object):
+    """
+    `open_db()` runs on the writer thread, the connection it returns (None
+    works too) is passed to `write(db, item)` for every item put, to
+    `flush(db, force)` after each item and while idle, then with force=True
+    and to `close_db(db)` when the writer is closed.
+    """
+
+    def __init__(self, open_db, write, flush=None, close_db=None, queue_size=QUEUE_SIZE):
+        self.open_db = open_db
+        self.write = write
+        self.flush = flush
+        self.close_db = close_db
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.busy = 0.0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name='scan-db-writer', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _call(self, what, function, *args):
+        try:
+            function(*args)
+        except Exception as e:
+            _log('{} failed: {}'.format(what, e))
+
+    def _run(self):
+        db = None
+        try:
+            db = self.open_db()
+        except Exception as e:
+            _log('open failed: {}'.format(e))
+        while True:
+            try:
+                item = self.queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.flush:
+                    self._call('flush', self.flush, db, False)
+                continue
+            if item is _CLOSE:
+                break
+            start = time.time()
+            self._call('write', self.write, db, item)
+            if self.flush:
+                self._call('flush', self.flush, db, False)
+            self.written += 1
+            self.busy += time.time() - start
+        if self.flush:
+            self._call('flush', self.flush, db, True)
+        if self.close_db and db is not None:
+            self._call('close', self.close_db, db)
+
+    def put(self, item):
+        """Blocks while the queue is full, False once the writer is closed"""
+        while not self.closed and self.thread.is_alive():
+            try:
+                self.queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def close(self):
+        """Writes what is still queued, flushes and closes the connection and waits for it"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+
+
+def _log(message):
+    if xbmc:
+        xbmc.log('[TMDB Scraper] DB writer ' + message, xbmc.LOGERROR)
@@ -1,14 +1,70 @@
 # coding: utf-8
 import json
-import urllib.request
-import urllib.error
-import xbmc
+import threading
+import time
 import re
-import xbmcgui
-import xbmcaddon
+import requests
 
-ADDON_SETTINGS = xbmcaddon.Addon()
-icon_path = ADDON_SETTINGS.getAddonInfo('icon')
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+# DeepSeek requests in flight at once, however many scan workers ask
+MAX_CONCURRENT_REQUESTS = 4
+# Retries of a rate limited (429), overloaded (5xx) or dropped request
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 2.0
+MAX_BACKOFF_SECONDS = 60.0
+CONNECT_TIMEOUT = 10
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_REQUEST_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
+# Errors are counted instead of notified per call, the scan reports them once
+_ERRORS = {}
+_ERRORS_LOCK = threading.Lock()
+
+def get_session():
+    """Keep-alive session shared by all extractors, one pooled connection per request slot"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _SESSION = session
+    return _SESSION
+
+def _log(message, level='LOGERROR'):
+    if xbmc:
+        xbmc.log(f"[DeepSeek] {message}", getattr(xbmc, level))
+
+def _record_error(kind):
+    with _ERRORS_LOCK:
+        _ERRORS[kind] = _ERRORS.get(kind, 0) + 1
+
+def get_error_summary():
+    """{error kind: count} since the last reset"""
+    with _ERRORS_LOCK:
+        return dict(_ERRORS)
+
+def reset_error_summary():
+    with _ERRORS_LOCK:
+        _ERRORS.clear()
+
+def _retry_delay(response, attempt):
+    """Seconds to wait before retry number `attempt`, honoring Retry-After"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    return min(BACKOFF_SECONDS * (2 ** attempt), MAX_BACKOFF_SECONDS)
 
 class DeepSeekExtractor:
     def __init__(self, api_key, base_url, model, prompt_template):
@@ -30,19 +86,12 @@ class DeepSeekExtractor:
         else:
              self.prompt_template = prompt_template
 
-    def extract(self, filename):
-        if not self.api_key:
-            xbmc.log("[DeepSeek] API Key is missing", xbmc.LOGWARNING)
-            return None
-
+    def _complete(self, content_prompt, label, timeout=30):
+        """Send one chat completion, returns the message content or None on errors"""
         # Handle different base URL styles if needed, but standard deepseek is https://api.deepseek.com
         # Completion endpoint: https://api.deepseek.com/chat/completions
         url = f"{self.base_url}/chat/completions"
-        
-        # Build prompt
-        # User defined prompt template + filename
-        content_prompt = f"{self.prompt_template}\n文件名: {filename}"
-        
+
         payload = {
             "model": self.model,
             "messages": [
@@ -58,36 +107,128 @@ class DeepSeekExtractor:
             "Accept": "application/json"
         }
 
-        try:
-            req = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'), headers=headers)
-            with urllib.request.urlopen(req, timeout=30) as response:
-                resp_data = response.read()
-                resp_json = json.loads(resp_data)
-                
-                # Check for errors in response
-                if 'error' in resp_json:
-                    xbmc.log(f"[DeepSeek] API returned error: {resp_json['error']}", xbmc.LOGERROR)
-                    return None
-
-                content = resp_json['choices'][0]['message']['content']
-                xbmc.log(f"[DeepSeek] Raw response for {filename}: {content}", xbmc.LOGDEBUG)
-                
-                # Attempt to find JSON blob
-                json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
+        for attempt in range(MAX_RETRIES + 1):
+            response = None
+            try:
+                # the slot is given back while backing off, other requests go on meanwhile
+                with _REQUEST_SLOTS:
                     try:
-                        data = json.loads(json_str)
-                        # Normalize keys if needed? User asked for specific keys.
-                        # {"chinese":chinese, "englist":english, "year":year} (sic) in request
-                        # Correct keys to expected internal use
-                        return data
-                    except json.JSONDecodeError:
-                        xbmc.log(f"[DeepSeek] JSON decode failed for: {json_str}", xbmc.LOGERROR)
-                else:
-                    xbmc.log("[DeepSeek] No JSON found in response", xbmc.LOGERROR)
-                    xbmcgui.Dialog().notification("TMDB CN Optimization", "DeepSeek 响应中未找到 JSON 数据", icon_path, 3000)
-        except Exception as e:
-            xbmc.log(f"[DeepSeek] Request Error: {e}", xbmc.LOGERROR)
-            xbmcgui.Dialog().notification("TMDB CN Optimization", f"DeepSeek 请求错误: {e}", icon_path, 3000)
+                        response = get_session().post(url, json=payload, headers=headers, timeout=(CONNECT_TIMEOUT, timeout))
+                    except (requests.ConnectionError, requests.Timeout) as e:
+                        _log(f"Request Error for {label} (attempt {attempt + 1}): {e}", 'LOGWARNING')
+                        error_kind = "请求超时" if isinstance(e, requests.Timeout) else "连接失败"
+                    else:
+                        if response.status_code != 429 and response.status_code < 500:
+                            break
+                        _log(f"HTTP {response.status_code} for {label} (attempt {attempt + 1})", 'LOGWARNING')
+                        error_kind = "请求过于频繁" if response.status_code == 429 else f"HTTP {response.status_code}"
+            except Exception as e:
+                _log(f"Request Error: {e}")
+                _record_error("请求错误")
+                return None
+            if attempt < MAX_RETRIES:
+                time.sleep(_retry_delay(response, attempt))
+        else:
+            _log(f"Giving up on {label} after {MAX_RETRIES + 1} attempts")
+            _record_error(error_kind)
+            return None
+
+        try:
+            resp_json = response.json()
+        except ValueError:
+            _log(f"HTTP {response.status_code}, invalid JSON response")
+            _record_error(f"HTTP {response.status_code}")
+            return None
+
+        # Check for errors in response
+        if not isinstance(resp_json, dict) or 'error' in resp_json or response.status_code != 200:
+            _log(f"API returned error (HTTP {response.status_code}): {resp_json}")
+            _record_error(f"HTTP {response.status_code}")
+            return None
+
+        try:
+            content = resp_json['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            _log(f"Unexpected response: {resp_json}")
+            _record_error("响应格式错误")
+            return None
+        _log(f"Raw response for {label}: {content}", 'LOGDEBUG')
+        return content
+
+    def extract(self, filename):
+        if not self.api_key:
+            _log("API Key is missing", 'LOGWARNING')
+            return None
+
+        # Build prompt
+        # User defined prompt template + filename
+        content_prompt = f"{self.prompt_template}\n文件名: {filename}"
+        content = self._complete(content_prompt, filename)
+        if content is None:
+            return None
+
+        # Attempt to find JSON blob
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+            try:
+                data = json.loads(json_str)
+                # Normalize keys if needed? User asked for specific keys.
+                # {"chinese":chinese, "englist":english, "year":year} (sic) in request
+                # Correct keys to expected internal use
+                return data
+            except json.JSONDecodeError:
+                _log(f"JSON decode failed for: {json_str}")
+        else:
+            _log("No JSON found in response")
+            _record_error("响应中未找到 JSON 数据")
         return None
+
+    def extract_batch(self, filenames):
+        """
+        Parse several filenames with one chat completion.
+        Returns a list aligned with `filenames`: the parsed dict, or None for
+        every filename the response has no valid element for.
+        """
+        results = [None] * len(filenames)
+        if not filenames:
+            return results
+        if not self.api_key:
+            _log("API Key is missing", 'LOGWARNING')
+            return results
+
+        lines = "\n".join(f"{index}: {filename}" for index, filename in enumerate(filenames))
+        content_prompt = (f"{self.prompt_template}\n"
+            f"以下每行是一个编号和文件名。为每个文件名返回一个上述格式的对象，并加上它的编号 \"index\"，"
+            f"所有对象组成一个 JSON 数组返回。\n{lines}")
+        # the response grows with the batch, allow for it
+        content = self._complete(content_prompt, f"batch of {len(filenames)}", timeout=30 + 2 * len(filenames))
+        if content is None:
+            return results
+
+        json_match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not json_match:
+            _log("No JSON array found in batch response")
+            _record_error("响应中未找到 JSON 数据")
+            return results
+        try:
+            items = json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            _log(f"JSON decode failed for batch: {json_match.group(0)}")
+            _record_error("JSON 解析失败")
+            return results
+        if not isinstance(items, list):
+            return results
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index')
+            if isinstance(index, str) and index.strip().isdigit():
+                index = int(index)
+            # bool is an int too, but never a valid index
+            if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < len(filenames):
+                continue
+            if results[index] is None:
+                results[index] = {key: value for key, value in item.items() if key != 'index'}
+        return results
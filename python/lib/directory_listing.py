@@ -0,0 +1,34 @@
+# coding: utf-8
+"""
+One directory's listing with the lookups the scan needs, built once per
+directory and shared by every video file in it: the local NFO and artwork
+checks are dict lookups by lowercase name instead of listing the directory
+again for each file.
+"""
+import os
+
+
+class DirectoryListing(object):
+    def __init__(self, path, dirs, files, video_extensions, image_extensions):
+        self.path = path
+        self.dirs = dirs
+        self.files = files
+        self.video_files = []
+        # lowercase name -> real name, per kind of file the local checks look for
+        self.nfo_map = {}
+        self.image_map = {}
+        video_extensions = frozenset(video_extensions)
+        image_extensions = frozenset(image_extensions)
+        for name in files:
+            ext = os.path.splitext(name)[1].lower()
+            if ext in video_extensions:
+                self.video_files.append(name)
+            elif ext == '.nfo':
+                self.nfo_map[name.lower()] = name
+            elif ext in image_extensions:
+                self.image_map[name.lower()] = name
+
+    @property
+    def video_files_in_dir(self):
+        """Number of videos, a single one may use movie.nfo and poster.jpg and the like"""
+        return len(self.video_files)
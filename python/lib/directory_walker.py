@@ -0,0 +1,90 @@
+# coding: utf-8
+"""
+Concurrent directory tree walk: a bounded pool of threads visits the
+directories, each visit returns the subdirectories to visit next, and the
+results are handed to the caller as they come in, not after the whole tree.
+
+Listing a remote source is latency bound, so several directories are listed
+at once; SourceLimiter caps how many per host and how often, for drives that
+block clients listing too fast.
+"""
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def source_of(path):
+    """'scheme://host' of a VFS path, '' for local paths"""
+    if '://' not in path:
+        return ''
+    parts = urllib.parse.urlsplit(path)
+    return '{}://{}'.format(parts.scheme.lower(), parts.netloc.lower())
+
+
+class SourceLimiter(object):
+    """At most `max_concurrent` calls per source, started at least `min_interval` seconds apart"""
+
+    def __init__(self, max_concurrent=2, min_interval=0.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def _get(self, source):
+        with self._lock:
+            if source not in self._sources:
+                self._sources[source] = [threading.BoundedSemaphore(self.max_concurrent), threading.Lock(), 0.0]
+            return self._sources[source]
+
+    def acquire(self, path):
+        semaphore, interval_lock, _ = entry = self._get(source_of(path))
+        semaphore.acquire()
+        if self.min_interval > 0:
+            with interval_lock:
+                delay = entry[2] + self.min_interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                entry[2] = time.monotonic()
+
+    def release(self, path):
+        self._get(source_of(path))[0].release()
+
+
+class DirectoryWalker(object):
+    """
+    Calls `visit(path, data)` for each directory on `workers` threads. A visit
+    returns (result, [(subdirectory, data), ...]); walk() yields (path, result)
+    in the order the visits finish.
+    """
+
+    def __init__(self, visit, workers=4):
+        self.visit = visit
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.pending = {}
+        self.closed = False
+
+    def _submit(self, path, data):
+        self.pending[self.executor.submit(self.visit, path, data)] = path
+
+    def walk(self, roots):
+        for path, data in roots:
+            self._submit(path, data)
+        while self.pending and not self.closed:
+            done, _ = wait(self.pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if self.closed:
+                    return
+                path = self.pending.pop(future)
+                result, subdirectories = future.result()
+                for subdirectory, subdirectory_data in subdirectories:
+                    self._submit(subdirectory, subdirectory_data)
+                yield path, result
+
+    def close(self):
+        """Drop the directories not visited yet and wait for the running visits"""
+        self.closed = True
+        for future in list(self.pending):
+            future.cancel()
+        self.pending.clear()
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,72 @@
+# coding: utf-8
+"""
+Persistent cache of the titles DeepSeek extracted from filenames. Cleaning a
+filename with the rules takes microseconds, less than a cache lookup, so only
+the LLM's answers are worth keeping.
+
+Entries are keyed by the pre-cleaned filename DeepSeek is sent together with
+the model and prompt template, so changing either simply stops the old
+entries from being found until they expire. The same release in another
+folder or source shares them.
+"""
+import hashlib
+import threading
+
+from . import cache_store
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+FILENAME_CACHE_FILE = 'filename_cache.db'
+FILENAME_CACHE_TTL = 180 * 24 * 3600
+# Filenames DeepSeek found no title in are asked again sooner, a newer model may do better
+DEEPSEEK_EMPTY_TTL = 7 * 24 * 3600
+
+
+def prompt_version(prompt_template):
+    return hashlib.md5((prompt_template or '').encode('utf-8')).hexdigest()[:8]
+
+def deepseek_key(ds_filename, model, prompt_template):
+    return 'deepseek|{}|{}|{}'.format(model or '', prompt_version(prompt_template), ds_filename)
+
+
+class FilenameCache(object):
+    def __init__(self, store, ttl=FILENAME_CACHE_TTL, empty_ttl=DEEPSEEK_EMPTY_TTL):
+        self.store = store
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+
+    def get_deepseek(self, ds_filename, model, prompt_template):
+        """
+        (title, year, english title) extracted from the pre-cleaned filename by
+        `model` with `prompt_template`, all None if nothing was found, None if not cached
+        """
+        value = self.store.get(deepseek_key(ds_filename, model, prompt_template))
+        return tuple(value) if value else None
+
+    def put_deepseek(self, ds_filename, model, prompt_template, title, year, english_title):
+        """Call only for an answer of the API, a failed request says nothing about the filename"""
+        ttl = self.ttl if title else self.empty_ttl
+        self.store.set(deepseek_key(ds_filename, model, prompt_template), [title, year, english_title], ttl)
+
+
+_FILENAME_CACHE = None
+_FILENAME_CACHE_LOCK = threading.Lock()
+
+def get_filename_cache():
+    """The filename cache in the addon profile, None if it cannot be opened"""
+    global _FILENAME_CACHE
+    if _FILENAME_CACHE is None:
+        with _FILENAME_CACHE_LOCK:
+            if _FILENAME_CACHE is None:
+                try:
+                    store = cache_store.CacheStore(cache_store.get_profile_path(FILENAME_CACHE_FILE), 'filename')
+                    _FILENAME_CACHE = FilenameCache(store)
+                except Exception as e:
+                    # don't retry for every file
+                    _FILENAME_CACHE = False
+                    if xbmc:
+                        xbmc.log('[TMDB Scraper] Filename cache unavailable: {}'.format(e), xbmc.LOGWARNING)
+    return _FILENAME_CACHE or None
@@ -0,0 +1,235 @@
+# coding: utf-8
+"""
+Kodi's CUtil::CleanString for movie filenames: title, year and unique id.
+
+clean_string_regex() is the straight port with Kodi's default advanced settings
+regexps. clean_string() returns the same results without running the year
+regexp (which backtracks over the whole name) and the clutter regexp (a hundred
+alternatives tried at every delimiter): it finds the year from the end with
+string searches, splits the rest into words once and looks them up in a set. It
+defers to clean_string_regex() for the inputs it does not model (newlines, and
+the few non-ASCII characters that match ASCII letters case-insensitively).
+"""
+import os
+import re
+
+# Fixed regex logic: Kodi C++ R-string delimiter "()" confused Python regex. Actual regex has NO outer parens.
+# NOTE: Using re.ASCII to mimic Kodi C++ regex behavior (which doesn't match Unicode in \w by default).
+# This prevents misdetection of Chinese/Unicode strings in brackets like [宾虚_Ben-Hur_1959] as IDs.
+IDENTIFIER_REGEXP = re.compile(r'[\{\[](\w+?)(?:id)?[-=](\w+)[\}\]]', re.IGNORECASE | re.ASCII)
+DATETIME_REGEXP = re.compile(r'(.*[^ _\,\.\(\)\[\]\-])[ _\.\(\)\[\]\-]+(19[0-9][0-9]|20[0-9][0-9])([ _\,\.\(\)\[\]\-]|[^0-9]$)?', re.IGNORECASE)
+CLEAN_STRING_REGEXPS = [
+    re.compile(r'[ _\,\.\(\)\[\]\-](10bit|480p|480i|576p|576i|720p|720i|1080p|1080i|2160p|3d|aac|ac3|aka|atmos|avi|bd5|bdrip|bdremux|bluray|brrip|cam|cd[1-9]|custom|dc|ddp|divx|divx5|dolbydigital|dolbyvision|dsr|dsrip|dts|dts-hdma|dts-hra|dts-x|dv|dvd|dvd5|dvd9|dvdivx|dvdrip|dvdscr|dvdscreener|extended|fragment|fs|h264|h265|hdr|hdr10|hevc|hddvd|hdrip|hdtv|hdtvrip|hrhd|hrhdtv|internal|limited|multisubs|nfofix|ntsc|ogg|ogm|pal|pdtv|proper|r3|r5|read.nfo|remastered|remux|repack|rerip|retail|screener|se|svcd|tc|telecine|telesync|truehd|ts|uhd|unrated|ws|x264|x265|xvid|xvidvd|xxx|web-dl|webrip|www.www|\[.*\])([ _\,\.\(\)\[\]\-]|$)', re.IGNORECASE),
+    re.compile(r'(\[.*\])', re.IGNORECASE)
+]
+
+# Token tables for clean_string. DELIMITERS is the character class around
+# clutter words; between title and year it is the same without the comma.
+DELIMITERS = frozenset(' _,.()[]-')
+# Clutter alternatives without delimiter characters; they match a whole word
+# token. 'dts-hdma', 'dts-hra' and 'dts-x' are covered by 'dts' followed by '-'.
+CLUTTER_WORDS = frozenset(['10bit', '480p', '480i', '576p', '576i', '720p', '720i', '1080p', '1080i', '2160p',
+    '3d', 'aac', 'ac3', 'aka', 'atmos', 'avi', 'bd5', 'bdrip', 'bdremux', 'bluray', 'brrip', 'cam', 'custom',
+    'dc', 'ddp', 'divx', 'divx5', 'dolbydigital', 'dolbyvision', 'dsr', 'dsrip', 'dts', 'dv', 'dvd', 'dvd5',
+    'dvd9', 'dvdivx', 'dvdrip', 'dvdscr', 'dvdscreener', 'extended', 'fragment', 'fs', 'h264', 'h265', 'hdr',
+    'hdr10', 'hevc', 'hddvd', 'hdrip', 'hdtv', 'hdtvrip', 'hrhd', 'hrhdtv', 'internal', 'limited', 'multisubs',
+    'nfofix', 'ntsc', 'ogg', 'ogm', 'pal', 'pdtv', 'proper', 'r3', 'r5', 'remastered', 'remux', 'repack', 'rerip',
+    'retail', 'screener', 'se', 'svcd', 'tc', 'telecine', 'telesync', 'truehd', 'ts', 'uhd', 'unrated', 'ws',
+    'x264', 'x265', 'xvid', 'xvidvd', 'xxx', 'webrip'] + ['cd%d' % digit for digit in range(1, 10)])
+# 'read.nfo' and 'www.www': the dot matches any character
+WILDCARD_WORDS = (('read', 'nfo'), ('www', 'www'))
+# Characters the IGNORECASE regexps match against ASCII letters although their lower() differs
+_CASE_FOLD_EXCEPTIONS = frozenset('İıſK')
+
+# Cleaned titles up to this many characters (spaces aside) are too short to search reliably
+SHORT_TITLE_LENGTH = 2
+_CJK = re.compile('[\u3400-\u9fff]')
+_LATIN_OR_DIGIT = re.compile('[A-Za-z0-9]')
+
+_WILDCARD_HEADS = frozenset(['web', 'rea', 'www'])
+_YEAR_DIGITS = frozenset('%02d' % number for number in range(100))
+_DELIMITER_RUN = re.compile(r'([ _,.()\[\]\-]+)')
+
+
+def get_filename_identifier(filename):
+    """
+    Parses filename for valid unique IDs (e.g. {tmdb=123})
+    Returns (success, type, id, match_string)
+    """
+    match = IDENTIFIER_REGEXP.search(filename)
+    if match:
+        # match.group(0) is the full match string e.g. [tmdb=123]
+        # match.group(1) is the type e.g. tmdb
+        # match.group(2) is the id e.g. 123
+        return True, match.group(1).lower(), match.group(2), match.group(0)
+    return False, "", "", ""
+
+def _clean_chars(str_title_and_year):
+    # Replace _ with space.
+    # If no spaces, replace . with space (skip initial dots)
+    already_contains_space = ' ' in str_title_and_year
+    text = str_title_and_year.replace('_', ' ')
+    if not already_contains_space:
+        initial_dots = len(text) - len(text.lstrip('.'))
+        text = text[:initial_dots] + text[initial_dots:].replace('.', ' ')
+    return text.strip()
+
+def clean_string_regex(filename):
+    """
+    Simulates CUtil::CleanString
+    """
+    str_title_and_year = filename
+    str_year = ""
+
+    if str_title_and_year == "..":
+        return "", "", ""
+
+    # 1. Check for identifier
+    has_id, id_type, id_val, id_match = get_filename_identifier(str_title_and_year)
+    if has_id:
+        str_title_and_year = str_title_and_year.replace(id_match, "")
+
+    # 2. Check for year (and extract title part)
+    # C++: if (reYear.RegFind(strTitleAndYear.c_str()) >= 0)
+    # Matches: 1 -> Title, 2 -> Year
+    year_match = DATETIME_REGEXP.search(str_title_and_year)
+    if year_match:
+        str_title_and_year = year_match.group(1)
+        str_year = year_match.group(2)
+
+    # 3. Remove extension
+    # If year was found, str_title_and_year is just the title part (captured before year).
+    # If year NOT found, we might still have the extension.
+    if not year_match:
+         # Python splitext handles removing extension
+         root, ext_found = os.path.splitext(str_title_and_year)
+         if ext_found:
+             str_title_and_year = root
+
+    # 4. Apply CleanString regexps (clutter removal)
+    for regex in CLEAN_STRING_REGEXPS:
+        match = regex.search(str_title_and_year)
+        if match:
+            # RegFind returns start index. We resize string to that index.
+            # In Python, we slice.
+            str_title_and_year = str_title_and_year[:match.start()]
+
+    # 5. Clean Chars
+    str_title = _clean_chars(str_title_and_year)
+
+    return str_title, str_year, (id_type, id_val) if has_id else None
+
+def _find_year(text):
+    """
+    (title end, year) of the year regexp match in `text`, None if none.
+
+    The year regexp wants a non-delimiter, a run of year delimiters and a
+    year, preferring the last year: that is the last 19xx/20xx following a
+    comma-free delimiter run that follows something else.
+    """
+    end = len(text)
+    while True:
+        position = max(text.rfind('19', 0, end), text.rfind('20', 0, end))
+        if position < 1:
+            return None
+        end = position + 1
+        if text[position + 2:position + 4] in _YEAR_DIGITS and text[position - 1] in DELIMITERS:
+            title_end = position - 1
+            while title_end > 0 and text[title_end - 1] in DELIMITERS:
+                title_end -= 1
+            if title_end > 0 and ',' not in text[title_end:position]:
+                return title_end, text[position:position + 4]
+
+def _find_clutter(text, lower, parts):
+    """Start of the first clutter regexp match in `text` (the delimiter before the clutter), None if none"""
+    # '[' preceded by a delimiter, with a ']' later that is followed by a delimiter or the end
+    bracket = None
+    position = text.find('[', 1)
+    if position > 0:
+        last_close = text.rfind(']')
+        while last_close > position and last_close + 1 < len(text) and text[last_close + 1] not in DELIMITERS:
+            last_close = text.rfind(']', position, last_close)
+        while 0 < position < last_close:
+            if text[position - 1] in DELIMITERS:
+                bracket = position - 1
+                break
+            position = text.find('[', position + 1)
+
+    # every word but one at the very start is preceded by a delimiter; set
+    # lookups find the first clutter word, its offset is only summed up then
+    words = parts[2::2]
+    found = len(words)
+    if not CLUTTER_WORDS.isdisjoint(words):
+        found = next(k for k, word in enumerate(words) if word in CLUTTER_WORDS)
+    if 'web' in lower or 'rea' in lower or 'www' in lower:
+        for k in range(found):
+            if words[k][:3] in _WILDCARD_HEADS and _is_wildcard_clutter(parts, 2 * k + 2):
+                found = k
+                break
+    if found == len(words):
+        return bracket
+    offset = sum(map(len, parts[:2 * found + 2])) - 1
+    return offset if bracket is None else min(offset, bracket)
+
+def _is_wildcard_clutter(parts, i):
+    word = parts[i]
+    following = parts[i + 2] if i + 2 < len(parts) else None
+    if word == 'web' and following == 'dl' and parts[i + 1] == '-':
+        return True
+    for head, tail in WILDCARD_WORDS:
+        if len(word) == len(head) + 1 + len(tail) and word.startswith(head) and word.endswith(tail):
+            return True
+        if word == head and following == tail and len(parts[i + 1]) == 1:
+            return True
+    return False
+
+def clean_string(filename):
+    """
+    Simulates CUtil::CleanString, same results as clean_string_regex()
+    """
+    if filename == "..":
+        return "", "", ""
+    if '\n' in filename or not (filename.isascii() or _CASE_FOLD_EXCEPTIONS.isdisjoint(filename)):
+        return clean_string_regex(filename)
+
+    text = filename
+    identifier = None
+    if '[' in text or '{' in text:
+        has_id, id_type, id_val, id_match = get_filename_identifier(text)
+        if has_id:
+            text = text.replace(id_match, "")
+            identifier = (id_type, id_val)
+
+    year = ""
+    found = _find_year(text)
+    if found:
+        title_end, year = found
+        text = text[:title_end]
+    else:
+        root, ext_found = os.path.splitext(text)
+        if ext_found:
+            text = root
+
+    # lowercased words at even, delimiter runs at odd indices; the first and last word may be empty
+    lower = text.lower()
+    parts = _DELIMITER_RUN.split(lower)
+    clutter = _find_clutter(text, lower, parts)
+    if clutter is not None:
+        text = text[:clutter]
+    bracket = text.find('[')
+    if bracket >= 0 and text.rfind(']') > bracket:
+        text = text[:bracket]
+
+    return _clean_chars(text), year, identifier
+
+def is_low_confidence(title, year):
+    """
+    Whether a cleaned title is unlikely to be found by a plain search: no
+    year, a very short title, or Chinese mixed with Latin words or digits
+    (an English title or release tags Kodi's rules don't know, like BD1080P)
+    """
+    if not title or not year:
+        return True
+    if len(title.replace(' ', '')) <= SHORT_TITLE_LENGTH:
+        return True
+    return bool(_CJK.search(title) and _LATIN_OR_DIGIT.search(title))
@@ -0,0 +1,630 @@
+# coding: utf-8
+"""
+Writes the scan's results into Kodi's video database (MyVideosNNN.db) the
+way Kodi's own scanner stores them: paths, files, movies and their links.
+"""
+import contextlib
+import os
+import sqlite3
+import time
+import urllib.parse
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+# Saved movies are committed together, every so many or after so many seconds
+DB_COMMIT_MOVIES = 50
+DB_COMMIT_SECONDS = 5
+# Seconds to wait for Kodi's own connection to release the database
+DB_BUSY_TIMEOUT = 30
+# Tables looked up by name while saving, cached per connection: { table: (id column, name column) }
+NAME_ID_COLUMNS = {
+    'actor': ('actor_id', 'name'),
+    'genre': ('genre_id', 'name'),
+    'studio': ('studio_id', 'name'),
+    'country': ('country_id', 'name'),
+    'tag': ('tag_id', 'name'),
+    'sets': ('idSet', 'strSet'),
+    'videoversiontype': ('id', 'name'),
+}
+
+
+class KodiDatabase:
+    def __init__(self, db_path, commit_movies=DB_COMMIT_MOVIES, commit_seconds=DB_COMMIT_SECONDS):
+        self.db_path = db_path
+        self.conn = None
+        # Writes are batched: one transaction for many movies
+        self.commit_movies = commit_movies
+        self.commit_seconds = commit_seconds
+        self.pending_movies = 0
+        self.last_commit = time.time()
+        # { table: { name: id } } of NAME_ID_COLUMNS, and the names added in the current savepoint
+        self.name_ids = {}
+        self.new_names = []
+        
+    def connect(self):
+        try:
+            self.conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT)
+            self.conn.row_factory = sqlite3.Row
+        except Exception as e:
+            _log(f"DB Connect Error: {e}", 'LOGERROR')
+            return
+        try:
+            # Readers (Kodi's GUI) don't block our long transactions and the other way round
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error as e:
+            _log(f"DB WAL not available: {e}", 'LOGWARNING')
+
+    def close(self):
+        if self.conn:
+            self.commit(force=True)
+            self.conn.close()
+            self.conn = None
+        self.name_ids = {}
+
+    def commit(self, force=False):
+        """
+        Commits the batch once it holds `commit_movies` movies or is older
+        than `commit_seconds`, or now if `force`. Returns True if committed.
+        """
+        if not self.conn or not self.conn.in_transaction:
+            self.last_commit = time.time()
+            return False
+        if not force and self.pending_movies < self.commit_movies and time.time() - self.last_commit < self.commit_seconds:
+            return False
+        try:
+            self.conn.commit()
+        except sqlite3.Error as e:
+            _log(f"DB Commit Error: {e}", 'LOGERROR')
+            # the batch may have been rolled back with the rows of the cached ids
+            self.name_ids = {}
+            return False
+        self.pending_movies = 0
+        self.last_commit = time.time()
+        self.new_names = []
+        return True
+
+    @contextlib.contextmanager
+    def savepoint(self):
+        """Undoes the writes of the block if it fails, without dropping the rest of the batch"""
+        if not self.conn.in_transaction:
+            # a savepoint outside a transaction would commit on release
+            self.conn.execute("BEGIN")
+        self.conn.execute("SAVEPOINT save_movie")
+        self.new_names = []
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK TO save_movie")
+            self.conn.execute("RELEASE save_movie")
+            # the cached ids of the rows rolled back are gone as well
+            for table, name in self.new_names:
+                self.name_ids.get(table, {}).pop(name, None)
+            self.new_names = []
+            raise
+        self.conn.execute("RELEASE save_movie")
+
+    def _name_ids(self, table):
+        """{ name: id } of `table`, loaded with one SELECT on first use"""
+        ids = self.name_ids.get(table)
+        if ids is None:
+            id_col, name_col = NAME_ID_COLUMNS[table]
+            ids = {}
+            for item_id, name in self.conn.execute(f"SELECT {id_col}, {name_col} FROM {table} ORDER BY {id_col}"):
+                # the first row wins, as a lookup by name would return it
+                ids.setdefault(name, item_id)
+            self.name_ids[table] = ids
+        return ids
+
+    def _get_or_create_name_id(self, table, name, **columns):
+        """Id of `name` in `table`, inserted with the extra `columns` if new"""
+        ids = self._name_ids(table)
+        item_id = ids.get(name)
+        if item_id is not None:
+            return item_id
+        id_col, name_col = NAME_ID_COLUMNS[table]
+        columns = {name_col: name, **columns}
+        cur = self.conn.cursor()
+        try:
+            cur.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                        list(columns.values()))
+            item_id = cur.lastrowid
+        except sqlite3.IntegrityError:
+            # added by Kodi since the cache was loaded
+            cur.execute(f"SELECT {id_col} FROM {table} WHERE {name_col}=?", (name,))
+            item_id = cur.fetchone()[0]
+        ids[name] = item_id
+        self.new_names.append((table, name))
+        return item_id
+
+    def _prepare_string_array(self, items, separator=" / "):
+        if isinstance(items, list):
+            return separator.join(items)
+        return str(items) if items else ""
+
+    def get_or_create_path(self, path):
+        # Ensure path ends with /
+        start_path = path.replace("\\", "/")
+        if not start_path.endswith("/"):
+            start_path += "/"
+            
+        cur = self.conn.cursor()
+        cur.execute("SELECT idPath FROM path WHERE strPath=?", (start_path,))
+        row = cur.fetchone()
+        if row: return row[0]
+        
+        # 2. 构建完整的父子目录关系 / Recursive parent creation
+        # Use string manipulation instead of os.path to safely handle URLs
+        path_no_slash = start_path.rstrip("/")
+        last_slash = path_no_slash.rfind("/")
+        
+        if last_slash > 0:
+            parent_path = path_no_slash[:last_slash] + "/"
+            # Avoid infinite recursion (e.g. smb:// -> smb:/ -> smb://)
+            if parent_path != start_path and "://" in start_path: 
+                # For URLs ensure we don't break protocol
+                if not parent_path.endswith(":///") and parent_path.count("/") >= 2:
+                     self.get_or_create_path(parent_path)
+            elif parent_path != start_path:
+                 # Local paths
+                 self.get_or_create_path(parent_path)
+            
+        # 1. path不需要写类型和刮削器 (Empty strings)
+        # 3. strhash，strSettings需要写入空字符串
+        cur.execute("INSERT INTO path (strPath, strContent, strScraper, strHash, strSettings, scanRecursive) VALUES (?, ?, ?, ?, ?, ?)", 
+                   (start_path, "", "", "", "", 0))
+        return cur.lastrowid
+
+    def set_path_hash(self, path, path_hash):
+        id_path = self.get_or_create_path(path)
+        self.conn.execute("UPDATE path SET strHash=? WHERE idPath=?", (path_hash, id_path))
+
+    def get_or_create_file(self, file_path, id_path):
+        filename = os.path.basename(file_path)
+        cur = self.conn.cursor()
+        cur.execute("SELECT idFile FROM files WHERE idPath=? AND strFilename=?", (id_path, filename))
+        row = cur.fetchone()
+        if row: return row[0]
+        
+        cur.execute("INSERT INTO files (idPath, strFilename, dateAdded) VALUES (?, ?, ?)", 
+                   (id_path, filename, time.strftime("%Y-%m-%d %H:%M:%S")))
+        return cur.lastrowid
+        
+    def get_or_create_set(self, set_name, set_overview=""):
+        if not set_name: return None
+        return self._get_or_create_name_id('sets', set_name, strOverview=set_overview)
+
+    def get_all_paths(self):
+        """
+        Retrieves all path configurations from the database.
+        Returns a dictionary: { normalized_path_str: { 'settings': xml, 'scraper': str, 'content': str, 'noUpdate': bool, 'exclude': bool, 'hash': str } }
+        """
+        paths_map = {}
+        if not self.conn:
+            return paths_map
+            
+        try:
+            cur = self.conn.cursor()
+            # Select necessary columns. Note: columns might vary by Kodi version, but these are standard enough.
+            # Use dictionary cursor or access by index
+            cur.execute("SELECT strPath, strSettings, strScraper, strContent, noUpdate, exclude, strHash FROM path")
+            rows = cur.fetchall()
+            
+            for row in rows:
+                p_str = row['strPath']
+                # Normalize path ending with slash
+                p_str = p_str.replace("\\", "/")
+                if not p_str.endswith("/"):
+                    p_str += "/"
+                    
+                paths_map[p_str] = {
+                    'settings': row['strSettings'],
+                    'scraper': row['strScraper'],
+                    'content': row['strContent'],
+                    'noUpdate': bool(row['noUpdate']),
+                    'exclude': bool(row['exclude']),
+                    'hash': row['strHash']
+                }
+        except Exception as e:
+            _log(f"Error fetching all paths: {e}", 'LOGERROR')
+            
+        return paths_map
+
+    def iter_movie_files(self, roots=None):
+        """
+        Yields the file of every movie in the library, as JSON-RPC reports it
+        (path + filename, stacks as they are), limited to `roots` if given.
+        Each root is an index range over path.strPath, in both separators.
+        """
+        query = ("SELECT path.strPath, files.strFilename FROM path"
+                 " JOIN files ON files.idPath = path.idPath"
+                 " JOIN movie ON movie.idFile = files.idFile")
+        ranges = [None]
+        if roots:
+            prefixes = {p for root in roots for p in (root, root.replace("/", "\\"))}
+            # "smb://nas/movies/" .. "smb://nas/movies0" covers everything below the root
+            ranges = [(p, p[:-1] + chr(ord(p[-1]) + 1)) for p in prefixes]
+            query += " WHERE path.strPath >= ? AND path.strPath < ?"
+        cur = self.conn.cursor()
+        for bounds in ranges:
+            cur.execute(query, bounds or ())
+            for str_path, filename in cur:
+                if filename.startswith(("stack://", "rar://", "zip://")):
+                    yield filename
+                else:
+                    yield str_path + filename
+
+    def add_links(self, table, names, media_id, media_type):
+        """Links `names` (created when new) to the media, the link rows in one executemany"""
+        cur = self.conn.cursor()
+        rows = [(self._get_or_create_name_id(table, name), media_id, media_type) for name in names if name]
+        if rows:
+            cur.executemany(f"INSERT OR IGNORE INTO {table}_link ({table}_id, media_id, media_type) VALUES (?, ?, ?)", rows)
+
+    def _handle_movie_version_merge(self, id_movie, id_file, file_path):
+        """
+        Logic for 'Merge same movie as versions'
+        1. Check existing versions of id_movie.
+        2. If any version has default/empty name (or 'Default'), update it to its filename.
+        3. Determine name for the NEW file (file_path).
+        4. Insert new version link.
+        """
+        try:
+            cur = self.conn.cursor()
+
+            # Helper to get decoded buffer filename
+            def get_decoded_name(path):
+                f_name = os.path.basename(path)
+                return urllib.parse.unquote(f_name)
+            
+            # 1. Get all existing versions for this movie
+            # List of {idFile, name, idType}
+            # Note: We use idType to know if it is a system default
+            # Join with videoversiontype on id (PK of type table) = idType (FK in version table)
+            cur.execute("SELECT vv.idFile, vvt.name, vv.idType FROM videoversion vv LEFT JOIN videoversiontype vvt ON vv.idType = vvt.id WHERE vv.idMedia=? AND vv.media_type='movie'", (id_movie,))
+            rows = cur.fetchall()
+            existing_versions = []
+            used_names = set()
+            
+            for r in rows:
+                existing_versions.append({'idFile': r[0], 'name': r[1], 'idType': r[2]})
+                if r[1]: used_names.add(r[1])
+
+            # 2. Fix existing versions if they have generic names
+            for ver in existing_versions:
+                 v_id_file = ver['idFile']
+                 v_name = ver['name']
+                 v_id_type = ver['idType']
+                 
+                 # Logic: If name is 'Default' or empty or it is a system type (< 40800), rename it to its filename
+                 if not v_name or v_id_type < 40800:
+                     cur.execute("SELECT strFilename FROM files WHERE idFile=?", (v_id_file,))
+                     f_row = cur.fetchone()
+                     if f_row and f_row[0]:
+                         v_filename = f_row[0]
+                         try: v_decoded_name = urllib.parse.unquote(v_filename)
+                         except: v_decoded_name = v_filename
+
+                         if v_decoded_name:
+                             new_type_id = self.get_video_version_type_id(v_decoded_name)
+                             # Update DB
+                             # videoversion PK is idFile!
+                             cur.execute("UPDATE videoversion SET idType=? WHERE idFile=? AND idMedia=?", (new_type_id, v_id_file, id_movie))
+                             used_names.add(v_decoded_name)
+            
+            # 3. Add link for NEW file
+            # Check if this file is already linked?
+            cur.execute("SELECT idType FROM videoversion WHERE idFile=? AND idMedia=? AND media_type='movie'", (id_file, id_movie))
+            if cur.fetchone():
+                 _log(f"Version link already exists for {file_path}", 'LOGINFO')
+                 return
+            
+            # Determine unique name for new file
+            new_name = get_decoded_name(file_path)
+            base_name = new_name
+            counter = 2
+            final_name = base_name
+            
+            # Simple collision resolution
+            while final_name in used_names:
+                final_name = f"{base_name} (v{counter})"
+                counter += 1
+            
+            _log(f"Merging merged Version: {final_name} -> ID {id_movie}", 'LOGINFO')
+            type_id = self.get_video_version_type_id(final_name)
+            
+            # Insert
+            # itemType=0 (Version)
+            # idType is the FK to videoversiontype
+            cur.execute("INSERT INTO videoversion (idFile, idMedia, media_type, itemType, idType) VALUES (?, ?, 'movie', 0, ?)", 
+                       (id_file, id_movie, type_id))
+
+        except Exception as e:
+            _log(f"Error _handle_movie_version_merge: {e}", 'LOGERROR')
+
+    def get_video_version_type_id(self, version_name):
+        if not version_name: 
+            return 40400 # Default
+        
+        try:
+            # Create new type if missing (owner=2 usually means user created/addon)
+            return self._get_or_create_name_id('videoversiontype', version_name, owner=2, itemType=0)
+        except Exception as e:
+            # Fallback for older Kodi versions without this table
+            _log(f"Error get_video_version_type_id: {e}", 'LOGERROR')
+            return 40400
+
+
+    def save_movie(self, id_file, details, file_path="", merge_versions=False):
+        if not self.conn: return None
+        cur = self.conn.cursor()
+        info = details.get('info', {})
+        available_art = details.get('available_art', {})
+        
+        # --- MERGE VERSION LOGIC ---
+        if merge_versions:
+            tmdb_id = None
+            if 'tmdb' in details.get('uniqueids', {}):
+                tmdb_id = details['uniqueids']['tmdb']
+            elif 'id' in details: # sometimes in root
+                tmdb_id = details['id']
+            
+            if tmdb_id:
+                # Check for EXISTING movie with this TMDB ID
+                cur.execute("SELECT media_id FROM uniqueid WHERE media_type='movie' AND type='tmdb' AND value=?", (str(tmdb_id),))
+                u_row = cur.fetchone()
+                if u_row:
+                    existing_id_movie = u_row[0]
+                    # Ensure it exists in movie table
+                    cur.execute("SELECT idMovie FROM movie WHERE idMovie=?", (existing_id_movie,))
+                    if cur.fetchone():
+                         # Perform merge
+                         self._handle_movie_version_merge(existing_id_movie, id_file, file_path)
+                         self.pending_movies += 1
+                         return existing_id_movie
+        # ---------------------------
+
+        cur.execute("SELECT idMovie FROM movie WHERE idFile=?", (id_file,))
+        row = cur.fetchone()
+        
+        if row: id_movie = row[0]
+        else:
+            cur.execute("INSERT INTO movie (idFile) VALUES (?)", (id_file,))
+            id_movie = cur.lastrowid
+            
+            # Kodi 19+ Video Versions (Asset management)
+            # VideoAssetType::VERSION = 0
+            # VIDEO_VERSION_ID_DEFAULT = 40400
+            try:
+                cur.execute("INSERT INTO videoversion (idFile, idMedia, media_type, itemType, idType) VALUES (?, ?, ?, ?, ?)",
+                            (id_file, id_movie, 'movie', 0, 40400))
+            except: 
+                # Older Kodi versions might not have this table
+                pass
+
+        c00 = info.get('title', '')
+        c01 = info.get('plot', '')
+        c02 = info.get('plotoutline', '')
+        c03 = info.get('tagline', '')
+        c06 = self._prepare_string_array(info.get('credits', []))
+        
+        premiered = info.get('premiered', '')
+
+        # c08: Thumb (XML Collection)
+        c08 = self._build_image_xml(available_art)
+        
+        # Fallback: If c08 empty, try info['thumb']
+        if not c08 and info.get('thumb'):
+             val = info.get('thumb')
+             c08 = f'<thumb spoof="" cache="" aspect="poster" preview="">{self._xml_escape(val)}</thumb>'
+
+        c10 = info.get('sorttitle', '')
+        c11 = info.get('duration', 0)
+        c12 = info.get('mpaa', '')
+        c13 = info.get('top250', 0)
+        c14 = self._prepare_string_array(info.get('genre', []))
+        c15 = self._prepare_string_array(info.get('director', []))
+        c16 = info.get('originaltitle', '')
+        c18 = self._prepare_string_array(info.get('studio', []))
+        c19 = info.get('trailer', '')
+        
+        # c20: Fanart (XML Collection)
+        c20 = self._build_fanart_xml(available_art)
+        
+        # Fallback: If c20 empty, try info['fanart']
+        if not c20 and info.get('fanart'):
+             val = info.get('fanart')
+             c20 = f'<fanart><thumb colors="" preview="">{self._xml_escape(val)}</thumb></fanart>'
+
+        c21 = self._prepare_string_array(info.get('country', []))
+        
+        # c22: File Path (Absolute)
+        c22 = file_path
+        
+        c23 = None
+        if id_file:
+             cur.execute("SELECT idPath FROM files WHERE idFile=?", (id_file,))
+             r = cur.fetchone()
+             if r: c23 = r[0]
+
+        id_set = None
+        if info.get('set'):
+             id_set = self.get_or_create_set(info.get('set'), info.get('setoverview', ''))
+
+        # Kodi Source: Check if we missed any columns.
+        # c04 is 'votes' string in older versions, but now typically unused or just string representation.
+        # c05 is idRating.
+        # c09 is idUniqueId.
+        # c07 is Year.
+        
+        sql = """UPDATE movie SET 
+            c00=?, c01=?, c02=?, c03=?, c06=?, c08=?, c10=?, c11=?, c12=?, c13=?, c14=?, c15=?, c16=?, c18=?, c19=?, c20=?, c21=?, c22=?, c23=?, premiered=?, idSet=?
+            WHERE idMovie=?"""
+        
+        try:
+            cur.execute(sql, (
+                c00, c01, c02, c03, c06, c08, c10, c11, c12, c13, c14, c15, c16, c18, c19, c20, c21, c22, c23, premiered, id_set,
+                id_movie
+            ))
+        except Exception as e:
+            _log(f"DB Error updating movie: {e}", 'LOGERROR')
+        
+        cur.execute("DELETE FROM genre_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self.add_links('genre', info.get('genre', []), id_movie, 'movie')
+            
+        cur.execute("DELETE FROM studio_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self.add_links('studio', info.get('studio', []), id_movie, 'movie')
+            
+        cur.execute("DELETE FROM country_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self.add_links('country', info.get('country', []), id_movie, 'movie')
+
+        cur.execute("DELETE FROM tag_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self.add_links('tag', info.get('tag', []), id_movie, 'movie')
+            
+        cur.execute("DELETE FROM director_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self._add_person_links(info.get('director', []), 'director', id_movie, 'movie')
+
+        cur.execute("DELETE FROM writer_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self._add_person_links(info.get('credits', []), 'writer', id_movie, 'movie')
+
+        cur.execute("DELETE FROM actor_link WHERE media_id=? AND media_type='movie'", (id_movie,))
+        self._add_actors(details.get('cast', []), id_movie, 'movie')
+
+        cur.execute("DELETE FROM rating WHERE media_id=? AND media_type='movie'", (id_movie,))
+        default_rating_id = None
+        for r_type, r_val in details.get('ratings', {}).items():
+            cur.execute("INSERT INTO rating (media_id, media_type, rating_type, rating, votes) VALUES (?, ?, ?, ?, ?)",
+                       (id_movie, 'movie', r_type, r_val.get('rating', 0), r_val.get('votes', 0)))
+            rid = cur.lastrowid
+            if r_val.get('default', False) or default_rating_id is None:
+                default_rating_id = rid
+        if default_rating_id:
+            cur.execute("UPDATE movie SET c05=? WHERE idMovie=?", (default_rating_id, id_movie))
+
+        cur.execute("DELETE FROM uniqueid WHERE media_id=? AND media_type='movie'", (id_movie,))
+        default_unique_id = None
+        for u_type, u_val in details.get('uniqueids', {}).items():
+             cur.execute("INSERT INTO uniqueid (media_id, media_type, value, type) VALUES (?, ?, ?, ?)",
+                        (id_movie, 'movie', u_val, u_type))
+             uid = cur.lastrowid
+             if u_type == 'tmdb': default_unique_id = uid
+        if default_unique_id:
+             try: cur.execute("UPDATE movie SET c09=? WHERE idMovie=?", (default_unique_id, id_movie))
+             except: pass
+
+        cur.execute("DELETE FROM art WHERE media_id=? AND media_type='movie'", (id_movie,))
+        
+        movie_art = []
+        for art_type, art_list in details.get('available_art', {}).items():
+            if not art_list: continue
+            
+            # Kodi Logic: Only one active art per type is stored in 'art' table.
+            # Usually the first one from the valid list.
+            img = art_list[0]
+            url = img if isinstance(img, str) else img.get('url', '')
+            if not url: continue
+
+            if art_type.startswith('set.') and id_set:
+                # Handle Set Art (stored with media_type='set')
+                real_type = art_type[4:] # remove 'set.'
+                # Ensure we update set art. Delete specific type to avoid duplicates.
+                cur.execute("DELETE FROM art WHERE media_id=? AND media_type='set' AND type=?", (id_set, real_type))
+                cur.execute("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)",
+                           (id_set, 'set', real_type, url))
+            elif not art_type.startswith('set.'):
+                # Handle Movie Art
+                movie_art.append((id_movie, 'movie', art_type, url))
+        cur.executemany("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)", movie_art)
+        
+        # committed with the batch, see commit()
+        self.pending_movies += 1
+        return id_movie
+
+    def _xml_escape(self, s):
+        if not s: return ""
+        return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+    def _build_image_xml(self, available_art):
+        """
+        Builds Kodi-compatible XML string for c08 (thumbnails/posters/logos etc).
+        Format: <thumb aspect="..." preview="...">url</thumb>
+        Exclude 'fanart' (singular) as it belongs in c20.
+        """
+        if not available_art:
+            return ""
+            
+        xml_parts = []
+        for aspect, items in available_art.items():
+            # 'fanart' key usually mapped to c20. 
+            # Note: 'set.fanart' MUST be included in c08 as per user requirement.
+            if aspect == 'fanart':
+                continue
+                
+            if not isinstance(items, list):
+                items = [items]
+            
+            for item in items:
+                url = item.get('url','') if isinstance(item, dict) else item
+                preview = item.get('preview','') if isinstance(item, dict) else ''
+                
+                if url:
+                    xml_parts.append(f'<thumb spoof="" cache="" aspect="{aspect}" preview="{self._xml_escape(preview)}">{self._xml_escape(url)}</thumb>')
+        
+        return "".join(xml_parts)
+
+    def _build_fanart_xml(self, available_art):
+        """
+        Builds Kodi-compatible XML string for c20 (fanart).
+        Format: <fanart><thumb colors="" preview="...">url</thumb>...</fanart>
+        """
+        fanart_items = available_art.get('fanart', [])
+        if not fanart_items:
+            return ""
+            
+        if not isinstance(fanart_items, list):
+            fanart_items = [fanart_items]
+            
+        xml_parts = ["<fanart>"]
+        for item in fanart_items:
+            url = item.get('url', '') if isinstance(item, dict) else item
+            preview = item.get('preview', '') if isinstance(item, dict) else ''
+            
+            if url:
+                xml_parts.append(f'<thumb colors="" preview="{self._xml_escape(preview)}">{self._xml_escape(url)}</thumb>')
+        
+        xml_parts.append("</fanart>")
+        return "".join(xml_parts)
+
+    def _add_person_links(self, names, role, media_id, media_type):
+        cur = self.conn.cursor()
+        rows = [(self._get_or_create_name_id('actor', name), media_id, media_type) for name in names if name]
+        if rows:
+            cur.executemany(f"INSERT OR IGNORE INTO {role}_link (actor_id, media_id, media_type) VALUES (?, ?, ?)", rows)
+
+    def _add_actors(self, actors, media_id, media_type):
+        cur = self.conn.cursor()
+        links = []
+        # Art Table for Actor: one 'thumb' per actor, the last one wins
+        thumbs = {}
+        for actor in actors:
+            name = actor.get('name')
+            if not name: continue
+            thumb = actor.get('thumbnail', '')
+            actor_id = self._get_or_create_name_id('actor', name, art_urls=thumb)
+            if thumb:
+                thumbs[actor_id] = thumb
+            links.append((actor_id, media_id, media_type, actor.get('role', ''), actor.get('order', 0)))
+        if thumbs:
+            cur.executemany("DELETE FROM art WHERE media_id=? AND media_type='actor' AND type='thumb'",
+                            [(actor_id,) for actor_id in thumbs])
+            cur.executemany("INSERT INTO art (media_id, media_type, type, url) VALUES (?, ?, ?, ?)",
+                            [(actor_id, 'actor', 'thumb', thumb) for actor_id, thumb in thumbs.items()])
+        if links:
+            cur.executemany("INSERT OR IGNORE INTO actor_link (actor_id, media_id, media_type, role, cast_order) VALUES (?, ?, ?, ?, ?)", links)
+
+
+def _log(message, level='LOGDEBUG'):
+    if xbmc:
+        xbmc.log(f"[TMDB Thread] {message}", getattr(xbmc, level))
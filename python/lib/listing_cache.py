@@ -0,0 +1,81 @@
+# coding: utf-8
+"""
+Persistent cache of directory listings of network sources (WebDAV, cloud
+drives, SMB, ...), where listing is slow and often rate limited.
+
+A cached listing is used as it is while it is younger than the trust window.
+After that it is revalidated by the directory's mtime: one stat instead of a
+listing, and the listing is only requested again if the mtime changed or the
+VFS reports none. Local directories are always listed, that is cheap.
+"""
+import threading
+import time
+
+from . import cache_store
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+LISTING_CACHE_FILE = 'listing_cache.db'
+# Unused entries are dropped after this, the directory is probably gone
+LISTING_CACHE_TTL = 30 * 24 * 3600
+LOCAL_PROTOCOLS = ('', 'file', 'special')
+
+
+def is_remote(path):
+    return path.split('://', 1)[0].lower() not in LOCAL_PROTOCOLS if '://' in path else False
+
+def listing_key(path):
+    return 'listing|' + path
+
+
+class ListingCache(object):
+    def __init__(self, store, ttl=LISTING_CACHE_TTL):
+        self.store = store
+        self.ttl = ttl
+
+    def get(self, path, trust_seconds=0, get_mtime=None):
+        """
+        (dirs, files) cached for `path`, None if it has to be listed again.
+        Entries checked less than `trust_seconds` ago are used as they are,
+        older ones only if `get_mtime()` returns the mtime they were listed at.
+        """
+        entry = self.store.get(listing_key(path))
+        if not entry:
+            return None
+        now = time.time()
+        if now - entry['checked'] < trust_seconds:
+            return entry['dirs'], entry['files']
+        mtime = get_mtime() if get_mtime and entry['mtime'] else None
+        if not mtime or mtime != entry['mtime']:
+            return None
+        entry['checked'] = now
+        self.store.set(listing_key(path), entry, self.ttl)
+        return entry['dirs'], entry['files']
+
+    def put(self, path, dirs, files, mtime=None):
+        """`mtime` of the directory taken before listing it, None if the VFS has none"""
+        entry = {'dirs': list(dirs), 'files': list(files), 'mtime': mtime or None, 'checked': time.time()}
+        self.store.set(listing_key(path), entry, self.ttl)
+
+
+_LISTING_CACHE = None
+_LISTING_CACHE_LOCK = threading.Lock()
+
+def get_listing_cache():
+    """The listing cache in the addon profile, None if it cannot be opened"""
+    global _LISTING_CACHE
+    if _LISTING_CACHE is None:
+        with _LISTING_CACHE_LOCK:
+            if _LISTING_CACHE is None:
+                try:
+                    store = cache_store.CacheStore(cache_store.get_profile_path(LISTING_CACHE_FILE), 'listing')
+                    _LISTING_CACHE = ListingCache(store)
+                except Exception as e:
+                    # don't retry for every directory
+                    _LISTING_CACHE = False
+                    if xbmc:
+                        xbmc.log('[TMDB Scraper] Listing cache unavailable: {}'.format(e), xbmc.LOGWARNING)
+    return _LISTING_CACHE or None
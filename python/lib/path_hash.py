@@ -0,0 +1,39 @@
+# coding: utf-8
+"""
+Kodi's directory fingerprint (path.strHash), so that our scan and Kodi's own
+VideoInfoScanner both skip directories that did not change.
+
+Kodi hashes a directory without subdirectories by its mtime only, its "fast
+hash" (CVideoInfoScanner::GetFastHash): MD5 over the movie exclude regexps
+joined by "|" and the mtime as a 64 bit integer. Only that form is computed
+here; Kodi's full hash of other directories needs the size and date of every
+entry, a stat per file on a network source.
+"""
+import hashlib
+import struct
+
+# Kodi's default <moviesexcludefromscan>, part of the hash; users overriding
+# it in advancedsettings.xml get different hashes, Kodi then just rescans
+MOVIES_EXCLUDE_FROM_SCAN = (
+    '-trailer',
+    '[!-._ \\\\/]sample[-._ ]',
+    '[\\/](proof|subs)[\\/]',
+    '[\\/]extrathumbs[\\/]',
+    '[\\/]extrafanart[\\/]',
+    '[\\/]\\.\\@__thumb[\\/]',
+)
+
+
+def fast_hash(mtime, excludes=MOVIES_EXCLUDE_FROM_SCAN):
+    """Kodi's fast hash of a directory last modified at `mtime` (seconds), '' without one"""
+    if not mtime:
+        return ''
+    digest = hashlib.md5()
+    if excludes:
+        digest.update('|'.join(excludes).encode('utf-8'))
+    digest.update(struct.pack('<q', int(mtime)))
+    return digest.hexdigest()
+
+def is_unchanged(stored_hash, current_hash):
+    # Kodi compares hashes case-insensitively
+    return bool(current_hash) and (stored_hash or '').lower() == current_hash.lower()
@@ -0,0 +1,224 @@
+# coding: utf-8
+"""
+Rule based title extraction for Chinese release filenames, e.g.
+
+    【字幕组】黑客帝国.The.Matrix.1999.BD1080P.国英双语.中字.mkv
+    -> title '黑客帝国', English title 'The Matrix', year '1999'
+
+Site prefixes, bracketed group tags, resolution/codec/source tags and Chinese
+audio/subtitle markers are dropped, the rest up to the year (or the first tag)
+is split into the Chinese and the Latin title. The confidence says how much of
+the name the rules could account for; only names below MIN_CONFIDENCE are worth
+an LLM call.
+"""
+import os
+import re
+
+# Confidence from which the parsed titles are searched before asking DeepSeek
+MIN_CONFIDENCE = 0.7
+
+CONFIDENCE_TITLE = 0.5
+CONFIDENCE_YEAR = 0.3
+# The title ends at a known tag (not just at the end of the name)
+CONFIDENCE_DELIMITED = 0.1
+# Chinese and Latin parts are not interleaved
+CONFIDENCE_SEPARATED = 0.1
+PENALTY_SHORT_TITLE = 0.4
+# Chinese titles up to this many characters, Latin ones up to twice as many, are short
+SHORT_TITLE_LENGTH = 1
+
+# Audio, subtitle, cut and quality markers of Chinese releases
+CHINESE_MARKERS = frozenset([
+    '国语', '粤语', '国粤', '国英', '国配', '台配', '粤配', '英语', '日语', '韩语', '原声',
+    '国英双语', '国粤双语', '国粤英', '双语', '三语', '多语', '中英双字', '中英字幕', '中英双语字幕', '中字',
+    '中文字幕', '简中', '繁中', '简繁', '简英', '繁英', '简繁英', '双字', '特效字幕', '内封', '内嵌', '外挂',
+    '字幕', '无字幕', '未删减', '无删减', '删减版', '导演剪辑版', '加长版', '剧场版', '修复版', '收藏版',
+    '完整版', '典藏版', '重制版', '蓝光', '原盘', '高清', '超清', '杜比视界', '杜比', '全景声', '中英', '音轨',
+])
+# Resolution, source, codec and audio tags, lowercase
+RELEASE_TAGS = frozenset([
+    '4k', '8k', 'uhd', 'hdr', 'hdr10', 'hdr10+', 'dv', 'dovi', 'sdr', 'bluray', 'blu-ray', 'bdrip', 'brrip',
+    'bd', 'bdmv', 'remux', 'web', 'webdl', 'web-dl', 'webrip', 'hdtv', 'hdrip', 'dvd', 'dvdrip', 'dvdscr',
+    'x264', 'x265', 'h264', 'h265', 'h.264', 'h.265', 'hevc', 'avc', 'xvid', 'divx', 'aac', 'ac3', 'dts',
+    'dts-hd', 'dts-hdma', 'dts-x', 'truehd', 'atmos', 'flac', 'ddp', 'dd', 'eac3', 'opus', '10bit', '8bit',
+    'hq', '60fps', 'proper', 'repack', 'extended', 'unrated', 'complete', 'chs', 'cht', 'eng', 'chs&eng',
+    'cht&eng', 'internal', 'limited', 'remastered', 'criterion', 'imax', 'hfr', 'ma', 'mp4', 'mkv',
+])
+_RELEASE_TAG_PATTERN = re.compile(
+    r'^(?:(?:bd|hd|web|uhd)?\d{3,4}[pi]|\d{3,4}x\d{3,4}|(?:dd|ddp|aac|dts|truehd)?\d\.\d(?:ch)?|\d+(?:ch|声道)'
+    r'|\d+(?:fps|bit)|[xh]\.?26[45](?:-\w+)?|\d+(?:\.\d+)?(?:gb|mb))$', re.IGNORECASE)
+
+_VIDEO_EXTENSION = re.compile(r'\.[a-z0-9]{2,5}$', re.IGNORECASE)
+# Download site domains, e.g. "www.dygod.net@" or "阳光电影www.ygdy8.com."
+_SITE = re.compile(
+    r'(?:www\.)?(?:[a-z0-9-]+\.)+(?:com|net|org|cn|cc|tv|me|xyz|top|vip|la|io)(?![a-z0-9])[@._\s\-]*', re.IGNORECASE)
+_BRACKETED = re.compile(r'【([^】]*)】|\[([^\]]*)\]|「([^」]*)」|《([^》]*)》|\(([^)]*)\)|（([^）]*)）')
+_SEPARATORS = re.compile(r'[\s._+]+')
+# Chinese next to Latin letters, or joined to anything by a hyphen ("满江红-2023")
+_SCRIPT_BOUNDARY = re.compile(
+    r'(?<=[\u3400-\u9fff])(?=[A-Za-z])|(?<=[A-Za-z])(?=[\u3400-\u9fff])|(?<=[\u3400-\u9fff])-|-(?=[\u3400-\u9fff])')
+_CJK = re.compile('[\u3400-\u9fff]')
+_LATIN = re.compile('[A-Za-z]')
+_YEAR = re.compile(r'^(?:19|20)\d\d$')
+# Release group suffix like "-CMCT" after the last tag
+_GROUP_SUFFIX = re.compile(r'-[A-Za-z0-9]+$')
+_MARKER_LENGTHS = sorted({len(marker) for marker in CHINESE_MARKERS}, reverse=True)
+
+
+def _strip_markers(token):
+    """`token` without the Chinese markers glued to its end, e.g. 英雄国语中字 -> 英雄"""
+    stripped = True
+    while stripped:
+        stripped = False
+        for length in _MARKER_LENGTHS:
+            if len(token) > length and token[-length:] in CHINESE_MARKERS:
+                token = token[:-length]
+                stripped = True
+                break
+    return token
+
+def is_tag(token):
+    if token in CHINESE_MARKERS or _strip_markers(token) in CHINESE_MARKERS:
+        return True
+    lower = token.lower()
+    if lower in RELEASE_TAGS or _RELEASE_TAG_PATTERN.match(lower):
+        return True
+    # "WEB-DL-CMCT", "x264-FRDS": a tag followed by the group
+    stripped = _GROUP_SUFFIX.sub('', lower)
+    return stripped != lower and (stripped in RELEASE_TAGS or bool(_RELEASE_TAG_PATTERN.match(stripped)))
+
+def _tokens(text):
+    tokens = []
+    for token in _SEPARATORS.split(text):
+        token = token.strip('-')
+        if token:
+            tokens.extend(part for part in _SCRIPT_BOUNDARY.split(token) if part)
+    return tokens
+
+def _split_brackets(name):
+    """
+    (title from 《》 or None, tokens) with group/site tags in leading brackets
+    and brackets holding only tags dropped, the content of any other kept.
+    A Chinese title in a leading bracket after the group's, "[YYeTs][复仇者联盟4]",
+    counts as a 《》 one if the rest has none; the brackets after it are kept
+    like the rest of the name, "【字幕组】[天气之子][Weathering with You][2019]".
+    """
+    book_title = None
+    bracket_title = None
+    kept = []
+    leading = []
+    position = 0
+    for i, match in enumerate(_BRACKETED.finditer(name)):
+        content = next(group for group in match.groups() if group is not None)
+        before = name[position:match.start()]
+        position = match.end()
+        if match.group(4) is not None and not book_title:
+            book_title = content.strip()
+        content_tokens = _tokens(content)
+        if not _tokens(before) and not kept and not bracket_title:
+            # nothing before it: a group or site tag, unless it is the only place for the title;
+            # the brackets after a bracketed title hold the rest of the name
+            leading.extend(content_tokens if match.group(4) is None else [])
+            if (i and not bracket_title and _CJK.search(content)
+                    and not any(is_tag(token) for token in content_tokens)):
+                bracket_title = content.strip()
+            continue
+        kept.extend(_tokens(before))
+        if match.group(4) is not None:
+            continue
+        if content_tokens and all(is_tag(token) for token in content_tokens):
+            continue
+        kept.extend(content_tokens)
+    kept.extend(_tokens(name[position:]))
+    if not book_title and bracket_title and not any(_CJK.search(token) and not is_tag(token) for token in kept):
+        book_title = bracket_title
+    if not kept and not book_title:
+        kept = [token for token in leading if not is_tag(token)]
+    return book_title, kept
+
+def parse(raw_name):
+    """
+    Parse a release filename, returns a dict with 'title' (the Chinese title,
+    else the Latin one), 'english_title', 'year' and 'confidence' in [0, 1].
+    """
+    name = raw_name.strip()
+    if _VIDEO_EXTENSION.search(name):
+        name = os.path.splitext(name)[0]
+    # the site's name usually precedes its domain, the title follows; sites in brackets go with them
+    brackets = [match.span() for match in _BRACKETED.finditer(name)]
+    for site in _SITE.finditer(name):
+        if not any(start <= site.start() < end for start, end in brackets):
+            name = name[site.end():] if name[site.end():].strip() else name[:site.start()]
+            break
+    book_title, tokens = _split_brackets(name)
+
+    # the last year after the first token ends the title, a 《》 title may be followed by the year directly
+    year = None
+    end = len(tokens)
+    for i in range(len(tokens) - 1, -1 if book_title else 0, -1):
+        if _YEAR.match(tokens[i]):
+            year = tokens[i]
+            end = i
+            break
+    delimited = year is not None
+    title_tokens = []
+    for token in tokens[:end]:
+        if is_tag(token):
+            delimited = True
+            if title_tokens:
+                break
+            continue
+        stripped = _strip_markers(token)
+        title_tokens.append(stripped)
+        if stripped != token:
+            delimited = True
+            break
+
+    if book_title:
+        title_tokens = _tokens(book_title) + [token for token in title_tokens if not _CJK.search(token)]
+
+    chinese = []
+    latin = []
+    runs = 0
+    previous = None
+    for i, token in enumerate(title_tokens):
+        # digits and the like ("5", "II") belong to the part they follow, but a
+        # year-like number after the Chinese title while the year comes later
+        # starts the Latin one (2001太空漫游.2001.A.Space.Odyssey.1968) or is
+        # the year given twice (霸王别姬.1993.Farewell.My.Concubine.1993)
+        script = 'cjk' if _CJK.search(token) else ('latin' if _LATIN.search(token) else previous)
+        if script == 'cjk' and year and _YEAR.match(token):
+            if token == year or not any(_LATIN.search(later) for later in title_tokens[i + 1:]):
+                continue
+            script = 'latin'
+        if script != previous:
+            runs += 1
+            previous = script
+        (chinese if script == 'cjk' else latin).append(token)
+
+    chinese_title = ' '.join(chinese)
+    english_title = ' '.join(latin)
+    title = chinese_title or english_title
+
+    confidence = 0.0
+    if title:
+        confidence += CONFIDENCE_TITLE
+        if year:
+            confidence += CONFIDENCE_YEAR
+        if delimited:
+            confidence += CONFIDENCE_DELIMITED
+        if runs <= 2:
+            confidence += CONFIDENCE_SEPARATED
+        short = (len(chinese_title.replace(' ', '')) <= SHORT_TITLE_LENGTH if chinese_title
+            else len(english_title.replace(' ', '')) <= 2 * SHORT_TITLE_LENGTH)
+        if short:
+            confidence -= PENALTY_SHORT_TITLE
+    return {
+        'title': title or None,
+        'english_title': english_title or None,
+        'year': year,
+        'confidence': round(max(confidence, 0.0), 2),
+    }
+
+def is_confident(parsed):
+    return bool(parsed['title']) and parsed['confidence'] >= MIN_CONFIDENCE
@@ -0,0 +1,181 @@
+# coding: utf-8
+"""
+Journal of a scan run, so that a cancelled or crashed scan resumes where it
+stopped instead of walking and checking everything again.
+
+The journal keeps the directories of the run (pending until their files were
+handed to the scrape stages, done after) and its files (pending, done or
+failed with their search history). A run that did not finish is resumed from
+its pending directories and files; files that failed are not retried until
+a new run starts.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from . import cache_store
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+SCAN_JOURNAL_FILE = 'scan_journal.db'
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class ScanJournal(object):
+    """
+    States are kept in memory for lookups and written through to SQLite. One
+    connection is shared by all threads behind a lock; SQLite errors are
+    logged, a broken journal only means the next run starts from the top.
+    """
+
+    def __init__(self, db_path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, weight REAL NOT NULL, state TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, state TEXT NOT NULL, history TEXT,
+                updated REAL NOT NULL);
+        ''')
+        self._conn.commit()
+        self.dirs = {}
+        self.files = {}
+        self.resumed = False
+
+    def _write(self, statements):
+        try:
+            with self._lock:
+                for sql, rows in statements:
+                    self._conn.executemany(sql, rows)
+                self._conn.commit()
+        except sqlite3.Error as e:
+            _log('write failed: {}'.format(e))
+
+    def start(self, roots, resume=True):
+        """
+        Resumes the unfinished run over the same `roots` if there is one and
+        `resume`, else starts a new one. Returns True if resumed.
+        """
+        signature = json.dumps(sorted(roots))
+        with self._lock:
+            meta = dict(self._conn.execute('SELECT key, value FROM run').fetchall())
+            self.resumed = resume and meta.get('roots') == signature and meta.get('finished') == '0'
+            if self.resumed:
+                self.dirs = {path: [weight, state] for path, weight, state
+                    in self._conn.execute('SELECT path, weight, state FROM dirs')}
+                self.files = dict(self._conn.execute('SELECT path, state FROM files'))
+            else:
+                self.dirs = {}
+                self.files = {}
+                self._conn.execute('DELETE FROM dirs')
+                self._conn.execute('DELETE FROM files')
+                self._conn.executemany('INSERT OR REPLACE INTO run (key, value) VALUES (?, ?)',
+                    [('roots', signature), ('started', str(time.time())), ('finished', '0')])
+            self._conn.commit()
+        return self.resumed
+
+    def finish(self):
+        """The run went through, the next one starts from the top"""
+        self._write([('INSERT OR REPLACE INTO run (key, value) VALUES (?, ?)', [('finished', '1')])])
+
+    def frontier(self, root):
+        """
+        (path, weight) of the directories under `root` to walk again: the
+        pending ones and the done ones that still have pending files.
+        """
+        with self._lock:
+            dirs_with_files = {path.rsplit('/', 1)[0] + '/' for path, state in self.files.items() if state == PENDING}
+            return [(path, entry[0]) for path, entry in self.dirs.items()
+                if path.startswith(root) and (entry[1] == PENDING or path in dirs_with_files)]
+
+    def is_known_dir(self, path):
+        return path in self.dirs
+
+    def is_finished_file(self, path):
+        """Done or failed in this run, not to be scraped again"""
+        return self.files.get(path, PENDING) != PENDING
+
+    def is_failed_file(self, path):
+        return self.files.get(path) == FAILED
+
+    def failed_files(self):
+        return [path for path, state in self.files.items() if state == FAILED]
+
+    def add_dirs(self, dirs):
+        """Directories found, as (path, weight)"""
+        dirs = [(path, weight) for path, weight in dirs if path not in self.dirs]
+        if not dirs:
+            return
+        with self._lock:
+            for path, weight in dirs:
+                self.dirs[path] = [weight, PENDING]
+        self._write([('INSERT OR IGNORE INTO dirs (path, weight, state) VALUES (?, ?, ?)',
+            [(path, weight, PENDING) for path, weight in dirs])])
+
+    def directory_done(self, path, subdirs=(), files=()):
+        """
+        `path` is walked: its `files` are about to be scraped and its
+        `subdirs` (path, weight) are to walk next, all in one transaction.
+        """
+        subdirs = [(sub, sub_weight) for sub, sub_weight in subdirs if sub not in self.dirs]
+        files = [file_path for file_path in files if file_path not in self.files]
+        now = time.time()
+        with self._lock:
+            weight = self.dirs.get(path, [0.0])[0]
+            self.dirs[path] = [weight, DONE]
+            for sub, sub_weight in subdirs:
+                self.dirs[sub] = [sub_weight, PENDING]
+            for file_path in files:
+                self.files[file_path] = PENDING
+        self._write([
+            ('INSERT OR IGNORE INTO dirs (path, weight, state) VALUES (?, ?, ?)',
+                [(sub, sub_weight, PENDING) for sub, sub_weight in subdirs]),
+            ('INSERT OR IGNORE INTO files (path, state, history, updated) VALUES (?, ?, NULL, ?)',
+                [(file_path, PENDING, now) for file_path in files]),
+            ('INSERT OR REPLACE INTO dirs (path, weight, state) VALUES (?, ?, ?)', [(path, weight, DONE)]),
+        ])
+
+    def file_done(self, path, success, history=None):
+        self.files_done([(path, success, history)])
+
+    def files_done(self, results):
+        """Scraped files as (path, success, history), all in one transaction"""
+        if not results:
+            return
+        now = time.time()
+        rows = [(path, DONE if success else FAILED, json.dumps(history or [], ensure_ascii=False), now)
+            for path, success, history in results]
+        with self._lock:
+            for path, state, _, _ in rows:
+                self.files[path] = state
+        self._write([('INSERT OR REPLACE INTO files (path, state, history, updated) VALUES (?, ?, ?, ?)', rows)])
+
+    def history(self, path):
+        with self._lock:
+            row = self._conn.execute('SELECT history FROM files WHERE path = ?', (path,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_scan_journal():
+    """The scan journal in the addon profile, None if it cannot be opened"""
+    try:
+        return ScanJournal(cache_store.get_profile_path(SCAN_JOURNAL_FILE))
+    except Exception as e:
+        _log('unavailable: {}'.format(e))
+        return None
+
+
+def _log(message):
+    if xbmc:
+        xbmc.log('[TMDB Scraper] Scan journal ' + message, xbmc.LOGWARNING)
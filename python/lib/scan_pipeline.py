@@ -0,0 +1,140 @@
+# coding: utf-8
+"""
+Stages of a scan connected by bounded queues.
+
+Each stage has its own worker threads taking items from its queue and passing
+what its handler returns on to the next stage, the last one to the output
+queue the caller drains. A full queue blocks the stage feeding it, so a slow
+stage holds back the ones before it instead of piling up work in memory.
+"""
+import queue
+import threading
+import time
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+# Seconds between checks of the stop flag while waiting on a queue
+POLL_INTERVAL = 0.2
+
+
+class Stage(object):
+    def __init__(self, name, handler, workers=1, queue_size=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size or 2 * self.workers)
+        self.processed = 0
+        self.busy = 0.0
+        # queue depth sampled by Pipeline.sample(): sum, count and maximum
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+
+    def sample(self):
+        depth = self.queue.qsize()
+        self.depth_total += depth
+        self.depth_samples += 1
+        self.depth_max = max(self.depth_max, depth)
+
+    def stats(self):
+        average = self.depth_total / self.depth_samples if self.depth_samples else 0.0
+        return {'processed': self.processed, 'busy': self.busy, 'queue_avg': average, 'queue_max': self.depth_max}
+
+
+class Pipeline(object):
+    """
+    put() items into the first stage and get() the results of the last one.
+    Every item put comes out of get() exactly once, a handler raising an
+    exception hands the item to `on_error(item, exception)` for its result.
+    """
+
+    def __init__(self, stages, on_error, output_size=None):
+        self.stages = stages
+        self.on_error = on_error
+        self.output = queue.Queue(maxsize=output_size or 2 * stages[-1].workers)
+        self.stopped = threading.Event()
+        self.threads = []
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def start(self):
+        for i, stage in enumerate(self.stages):
+            target = self.stages[i + 1].queue if i + 1 < len(self.stages) else self.output
+            for n in range(stage.workers):
+                thread = threading.Thread(target=self._run, args=(stage, target),
+                    name='scan-{}-{}'.format(stage.name, n), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        return self
+
+    def _put(self, target, item):
+        while not self.stopped.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self, stage, target):
+        while not self.stopped.is_set():
+            try:
+                item = stage.queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            start = time.time()
+            destination = target
+            try:
+                result = stage.handler(item)
+            except Exception as e:
+                _log('{} stage failed: {}'.format(stage.name, e))
+                result = self.on_error(item, e)
+                # the remaining stages are skipped
+                destination = self.output
+            with self._lock:
+                stage.processed += 1
+                stage.busy += time.time() - start
+            self._put(destination, result)
+
+    def put(self, item):
+        """Blocks while the first stage is full, False once the pipeline is stopped"""
+        with self._lock:
+            self.in_flight += 1
+        if self._put(self.stages[0].queue, item):
+            return True
+        with self._lock:
+            self.in_flight -= 1
+        return False
+
+    def get(self, timeout=POLL_INTERVAL):
+        """The next finished item, None if there is none within `timeout`"""
+        try:
+            item = self.output.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            self.in_flight -= 1
+        return item
+
+    def sample(self):
+        for stage in self.stages:
+            stage.sample()
+
+    def stop(self, wait=False):
+        """Stop all workers, items still queued are dropped; running handlers finish on their own unless `wait`"""
+        self.stopped.set()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+        self.threads = []
+
+    def stats(self):
+        return [(stage.name, stage.stats()) for stage in self.stages]
+
+
+def _log(message):
+    if xbmc:
+        xbmc.log('[TMDB Scraper] Pipeline ' + message, xbmc.LOGERROR)
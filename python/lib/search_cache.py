@@ -0,0 +1,90 @@
+# coding: utf-8
+"""
+Persistent cache of ranked TMDB search results by normalized title, year,
+search language and search mode. Poster paths are kept as TMDB returns them,
+the image proxy and base URL of the current settings go in front on read.
+"""
+import threading
+import unicodedata
+
+from . import cache_store
+
+try:
+    import xbmc
+except ModuleNotFoundError:
+    xbmc = None
+
+SEARCH_CACHE_FILE = 'search_cache.db'
+SEARCH_CACHE_TTL = 30 * 24 * 3600
+# Searches without results are retried sooner, TMDB may have added the movie meanwhile
+EMPTY_RESULT_TTL = 3 * 24 * 3600
+# Fields kept per movie: enough to pick a match and to list it in the search dialog
+RESULT_FIELDS = ('id', 'title', 'original_title', 'release_date', 'poster_path', 'popularity')
+
+_articles = [prefix + article for prefix in (', ', ' ') for article in ("the", "a", "an")]
+def strip_trailing_article(title):
+    title = title.lower()
+    for article in _articles:
+        if title.endswith(article):
+            return title[:-len(article)]
+    return title
+
+def normalize_title(title):
+    return strip_trailing_article(unicodedata.normalize('NFC', title).strip())
+
+def cache_key(title, year, language, year_fanout=False, include_adult=False):
+    # the year fan-out merges the results of neighbouring years, the sequential search does not
+    key = '{}|{}|{}'.format(normalize_title(title), year or '', language or '')
+    if year_fanout:
+        key += '|fanout'
+    return key + '|adult' if include_adult else key
+
+
+class SearchCache(object):
+    def __init__(self, store, ttl=SEARCH_CACHE_TTL, empty_ttl=EMPTY_RESULT_TTL):
+        self.store = store
+        self.ttl = ttl
+        self.empty_ttl = empty_ttl
+
+    def get(self, title, year, language, image_prefix='', year_fanout=False, include_adult=False):
+        """
+        Cached result list, an empty list for a cached miss, None if not cached.
+        Poster paths get `image_prefix` (proxy + preview base URL) in front.
+        """
+        entries = self.store.get(cache_key(title, year, language, year_fanout, include_adult))
+        for entry in entries or ():
+            if entry.get('poster_path'):
+                entry['poster_path'] = image_prefix + entry['poster_path']
+        return entries
+
+    def put(self, title, year, language, results, image_prefix='', year_fanout=False, include_adult=False):
+        """`results` as search() returns them, with `image_prefix` in front of the poster paths"""
+        # an error is a dict, not a result list
+        if results is None or isinstance(results, dict):
+            return
+        entries = [{field: item.get(field) for field in RESULT_FIELDS} for item in results]
+        for entry in entries:
+            poster_path = entry.get('poster_path')
+            if image_prefix and poster_path and poster_path.startswith(image_prefix):
+                entry['poster_path'] = poster_path[len(image_prefix):]
+        self.store.set(cache_key(title, year, language, year_fanout, include_adult), entries, self.ttl if entries else self.empty_ttl)
+
+
+_SEARCH_CACHE = None
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+def get_search_cache():
+    """The search cache in the addon profile, None if it cannot be opened"""
+    global _SEARCH_CACHE
+    if _SEARCH_CACHE is None:
+        with _SEARCH_CACHE_LOCK:
+            if _SEARCH_CACHE is None:
+                try:
+                    store = cache_store.CacheStore(cache_store.get_profile_path(SEARCH_CACHE_FILE), 'search')
+                    _SEARCH_CACHE = SearchCache(store)
+                except Exception as e:
+                    # don't retry for every search
+                    _SEARCH_CACHE = False
+                    if xbmc:
+                        xbmc.log('[TMDB Scraper] Search cache unavailable: {}'.format(e), xbmc.LOGWARNING)
+    return _SEARCH_CACHE or None
@@ -5,14 +5,22 @@ import xbmcgui
 import json
 import time
 import socket
+import threading
 import requests
 
+from collections import OrderedDict
 from urllib.parse import urlencode
 
 HEADERS = {}
 DNS_SETTINGS = {}
 SERVICE_PORT = 56789
 
+# Client side LRU of title -> pinyin initials, filled by pinyin lookups and by
+# daemon responses to requests that carry a 'pinyin_field'
+PINYIN_CACHE_SIZE = 512
+_PINYIN_CACHE = OrderedDict()
+_PINYIN_LOCK = threading.Lock()
+
 def set_headers(headers):
     HEADERS.clear()
     HEADERS.update(headers)
@@ -101,14 +109,42 @@ def set_custom_ip(hosts_map):
         return True
     return False
 
+def _remember_pinyin(text, initials):
+    with _PINYIN_LOCK:
+        _PINYIN_CACHE[text] = initials
+        _PINYIN_CACHE.move_to_end(text)
+        while len(_PINYIN_CACHE) > PINYIN_CACHE_SIZE:
+            _PINYIN_CACHE.popitem(last=False)
+
+def _recall_pinyin(text):
+    with _PINYIN_LOCK:
+        initials = _PINYIN_CACHE.get(text)
+        if initials is not None:
+            _PINYIN_CACHE.move_to_end(text)
+        return initials
+
+def _remember_pinyin_results(results):
+    """Cache pinyin the daemon attached to request results (see 'pinyin_field')"""
+    for res in results:
+        if isinstance(res, dict) and isinstance(res.get('pinyin'), dict):
+            text = res['pinyin'].get('text')
+            initials = res['pinyin'].get('initials')
+            if text and initials is not None:
+                _remember_pinyin(text, initials)
+
 def get_pinyin_from_service(text):
     """Request pinyin conversion from daemon"""
+    cached = _recall_pinyin(text)
+    if cached is not None:
+        return cached
+
     payload = {'pinyin': [text]} # New protocol: list of strings
     resp = _send_payload(payload, timeout=10)
     
     if resp and 'pinyin' in resp:
         results = resp['pinyin']
         if isinstance(results, list) and len(results) > 0:
+            _remember_pinyin(text, results[0])
             return results[0] # Returns list of permutations
             
     # Fallback
@@ -119,6 +155,9 @@ def load_info_from_service(url, params=None, headers=None, batch_payload=None):
     """
     Send request to the background service daemon via TCP socket.
     Supports single request (url, params) or batch request (batch_payload).
+    A request may name a 'pinyin_field' of its JSON response; the daemon then
+    returns the pinyin of that field alongside, and it is cached here so the
+    later get_pinyin_from_service call needs no extra round trip.
     """
     # Construct Protocol Payload
     requests_list = []
@@ -140,6 +179,8 @@ def load_info_from_service(url, params=None, headers=None, batch_payload=None):
     
     if 'requests' in resp:
         results = resp['requests']
+        if isinstance(results, list):
+            _remember_pinyin_results(results)
         # If it was a single request call (not batch_payload), unwrap logic
         if not batch_payload:
             if results and len(results) > 0:
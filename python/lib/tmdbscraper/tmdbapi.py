@@ -80,8 +80,17 @@ def search_movie(query, year=None, language=None, page=None, settings=None, incl
     :param include_adult: whether to include adult content (optional)
     :return: a list with found movies
     """
+    request = search_movie_request(query, year, language, page, settings, include_adult)
+    return _call_service(request['url'], request['params'])
+
+def search_movie_request(query, year=None, language=None, page=None, settings=None, include_adult=False):
+    """
+    Build a search request for a batch sent to the service daemon
+
+    Takes the same parameters as search_movie.
+    """
     query = unicodedata.normalize('NFC', query)
-    log('using title of %s to find movie' % query)
+    log('using title of %s year %s to find movie' % (query, year))
     theurl = get_base_url(settings).format('search/movie')
     params = _set_params(None, language)
     params['query'] = query
@@ -94,7 +103,7 @@ def search_movie(query, year=None, language=None, page=None, settings=None, incl
         params['page'] = page
     if year is not None:
         params['year'] = str(year)
-    return _call_service(theurl, params)
+    return {'url': theurl, 'params': params, 'headers': dict(HEADERS), 'type': 'tmdb_search'}
 
 
 def find_movie_by_external_id(external_id, language=None, settings=None):
@@ -0,0 +1,124 @@
+# coding: utf-8
+"""
+Rank TMDB search results against the title and year parsed from a filename.
+
+Every candidate gets a score in [0, 1] from its title similarity (to either its
+title or original title), a pinyin initials match, the distance of its release
+year and its popularity relative to the other candidates. A best candidate that
+scores high enough and clearly ahead of the runner-up is taken as the match;
+otherwise the file is ambiguous and worth a costlier strategy such as DeepSeek.
+"""
+import math
+import re
+from difflib import SequenceMatcher
+
+from . import pinyin
+from .title_index import normalize_title
+
+WEIGHT_TITLE = 0.55
+WEIGHT_PINYIN = 0.10
+WEIGHT_YEAR = 0.20
+WEIGHT_POPULARITY = 0.15
+
+# Title similarity credited to a candidate whose pinyin initials match the query
+PINYIN_TITLE_SIMILARITY = 0.8
+
+# Score of a year off by 0, 1 and 2; further off scores 0, unknown years are neutral
+YEAR_SCORES = (1.0, 0.6, 0.2)
+UNKNOWN_YEAR_SCORE = 0.5
+
+# The best candidate is a confident match when it scores at least MIN_SCORE
+# and beats the runner-up by at least MIN_MARGIN
+MIN_SCORE = 0.6
+MIN_MARGIN = 0.1
+
+_LATIN_INITIALS = re.compile(r'^[a-z]{2,}$')
+_CJK = re.compile('[\u3400-\u9fff]')
+
+
+def _compact(text):
+    return normalize_title(text).replace(' ', '')
+
+def _title_similarity(queries, candidate_titles):
+    best = 0.0
+    for query in queries:
+        for candidate in candidate_titles:
+            if not query or not candidate:
+                continue
+            if query == candidate:
+                return 1.0
+            best = max(best, SequenceMatcher(None, query, candidate).ratio())
+    return best
+
+def _pinyin_score(queries, candidate_title):
+    """1.0 when a query is the pinyin initials of the candidate, or both are Chinese with the same initials"""
+    if not candidate_title or not _CJK.search(candidate_title):
+        return 0.0
+    initials = None
+    for query in queries:
+        if _LATIN_INITIALS.match(query):
+            initials = initials or {variant.lower() for variant in pinyin.iter_pinyin_initials(candidate_title)}
+            if query in initials:
+                return 1.0
+        elif _CJK.search(query):
+            if pinyin.get_pinyin_permutations(query, limit=1) == pinyin.get_pinyin_permutations(candidate_title, limit=1):
+                return 1.0
+    return 0.0
+
+def _year_score(year, release_date):
+    candidate_year = (release_date or '')[:4]
+    if not year or not candidate_year.isdigit():
+        return UNKNOWN_YEAR_SCORE
+    distance = abs(int(year) - int(candidate_year))
+    return YEAR_SCORES[distance] if distance < len(YEAR_SCORES) else 0.0
+
+def score_candidates(results, title, year=None, alt_titles=()):
+    """
+    Score all search results in one pass, returns (score, result) pairs best first.
+
+    :param results: TMDB search results (dicts with title, original_title, release_date, popularity)
+    :param title: title cleaned from the filename
+    :param year: year from the filename (optional)
+    :param alt_titles: further titles of the same file, e.g. an English title (optional)
+    """
+    queries = [query for query in (_compact(text) for text in (title,) + tuple(alt_titles)) if query]
+    max_popularity = max([item.get('popularity') or 0 for item in results] + [0])
+    popularity_scale = math.log1p(max_popularity) or 1.0
+
+    scored = []
+    for item in results:
+        candidate_titles = (_compact(item.get('title')), _compact(item.get('original_title')))
+        pinyin_score = _pinyin_score(queries, item.get('title'))
+        # initials like "XLTX" in a filename are as good as a close title
+        title_score = max(_title_similarity(queries, candidate_titles), PINYIN_TITLE_SIMILARITY * pinyin_score)
+        score = (WEIGHT_TITLE * title_score
+            + WEIGHT_PINYIN * pinyin_score
+            + WEIGHT_YEAR * _year_score(year, item.get('release_date'))
+            + WEIGHT_POPULARITY * math.log1p(item.get('popularity') or 0) / popularity_scale)
+        scored.append((score, item))
+    # stable sort: equal scores keep TMDB's order
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return scored
+
+def is_confident(scored):
+    """Whether the best of score_candidates' output is a clear match"""
+    if not scored or scored[0][0] < MIN_SCORE:
+        return False
+    return len(scored) == 1 or scored[0][0] - scored[1][0] >= MIN_MARGIN
+
+def needs_better_title(scored):
+    """
+    Whether an unconfident best of score_candidates' output could change with
+    a better parsed title: it scores too low, or a close runner-up has another
+    title. Close candidates of the same title only differ by year or popularity.
+    """
+    if not scored or scored[0][0] < MIN_SCORE:
+        return True
+    best_score, best = scored[0]
+    best_titles = {_compact(best.get('title')), _compact(best.get('original_title'))} - {''}
+    for score, item in scored[1:]:
+        if best_score - score >= MIN_MARGIN:
+            break
+        if not best_titles & {_compact(item.get('title')), _compact(item.get('original_title'))}:
+            return True
+    return False
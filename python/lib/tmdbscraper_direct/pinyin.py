@@ -1,7 +1,11 @@
 # coding: utf-8
 import os
 import json
-import itertools
+import heapq
+import mmap
+import struct
+import time
+from functools import lru_cache
 try:
     import xbmc
     import xbmcaddon
@@ -9,7 +13,24 @@ except ModuleNotFoundError:
     xbmc = None
     xbmcaddon = None
 
-CHAR_MAP = {}
+# Compiled table (resources/char_map.bin, see tools/generate_pinyin_table.py):
+# header '<4sII' = magic, first code point, record count, followed by one
+# little-endian uint32 per code point. It holds the distinct initials of the
+# readings in frequency order, 5 bits each from the low bits up: 1 + the index
+# into INITIALS, 0 ends the list (a record of 0 = no entry). Initials beyond
+# TABLE_SLOTS are dropped, only two characters have more and the variant
+# cap never reaches their rarest reading.
+TABLE_MAGIC = b'PYI2'
+TABLE_HEADER = struct.Struct('<4sII')
+TABLE_RECORD = struct.Struct('<I')
+INITIALS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ\u00ca'
+TABLE_SLOT_BITS = 5
+TABLE_SLOTS = 6
+
+_TABLE = None
+_TABLE_FIRST = 0
+_TABLE_COUNT = 0
+
 ADDON = None
 if xbmcaddon:
     try:
@@ -17,9 +38,48 @@ if xbmcaddon:
     except:
         pass
 
+def compile_char_map(char_map):
+    """Compile a char_map.json style dict (char -> list of readings) into the binary table"""
+    records = {}
+    for char, pinyins in char_map.items():
+        if len(char) != 1:
+            continue
+        initials = []
+        for p in pinyins:
+            if not p:
+                continue
+            index = INITIALS.find(p[0].upper())
+            if index >= 0 and index not in initials:
+                initials.append(index)
+        if initials:
+            records[ord(char)] = sum((index + 1) << (slot * TABLE_SLOT_BITS)
+                for slot, index in enumerate(initials[:TABLE_SLOTS]))
+
+    if not records:
+        return TABLE_HEADER.pack(TABLE_MAGIC, 0, 0)
+
+    first = min(records)
+    count = max(records) - first + 1
+    buffer = bytearray(TABLE_HEADER.size + count * TABLE_RECORD.size)
+    TABLE_HEADER.pack_into(buffer, 0, TABLE_MAGIC, first, count)
+    for code_point, record in records.items():
+        TABLE_RECORD.pack_into(buffer, TABLE_HEADER.size + (code_point - first) * TABLE_RECORD.size, record)
+    return bytes(buffer)
+
+def _set_table(buffer):
+    global _TABLE, _TABLE_FIRST, _TABLE_COUNT
+    if buffer is None:
+        _TABLE, _TABLE_FIRST, _TABLE_COUNT = None, 0, 0
+        _joined_permutations.cache_clear()
+        return
+    magic, first, count = TABLE_HEADER.unpack_from(buffer, 0)
+    if magic != TABLE_MAGIC or len(buffer) < TABLE_HEADER.size + count * TABLE_RECORD.size:
+        raise ValueError('Invalid pinyin table')
+    _TABLE, _TABLE_FIRST, _TABLE_COUNT = buffer, first, count
+    _joined_permutations.cache_clear()
+
 def load_char_map():
-    global CHAR_MAP
-    if not ADDON:
+    if _TABLE is not None or not ADDON:
         return
 
     try:
@@ -27,71 +87,166 @@ def load_char_map():
         # Handle potential encoding issues with path on Windows
         if isinstance(addon_path, bytes):
             addon_path = addon_path.decode('utf-8')
-            
+
+        table_path = os.path.join(addon_path, 'resources', 'char_map.bin')
         map_path = os.path.join(addon_path, 'resources', 'char_map.json')
-        if os.path.exists(map_path):
+        if os.path.exists(table_path):
+            with open(table_path, 'rb') as f:
+                try:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    buffer = f.read()
+            _set_table(buffer)
+            if xbmc:
+                xbmc.log(f'[TMDB Scraper] Mapped char_map.bin with {_TABLE_COUNT} code points', xbmc.LOGINFO)
+        elif os.path.exists(map_path):
+            # Development checkouts may not have the compiled table yet
             with open(map_path, 'r', encoding='utf-8') as f:
-                CHAR_MAP = json.load(f)
+                _set_table(compile_char_map(json.load(f)))
             if xbmc:
-                xbmc.log(f'[TMDB Scraper] Loaded char_map.json with {len(CHAR_MAP)} entries', xbmc.LOGINFO)
+                xbmc.log(f'[TMDB Scraper] char_map.bin not found, compiled {map_path} in memory', xbmc.LOGWARNING)
         else:
             if xbmc:
-                xbmc.log(f'[TMDB Scraper] char_map.json not found at {map_path}', xbmc.LOGWARNING)
+                xbmc.log(f'[TMDB Scraper] char_map.bin not found at {table_path}', xbmc.LOGWARNING)
     except Exception as e:
         if xbmc:
-            xbmc.log(f'[TMDB Scraper] Failed to load char_map.json: {e}', xbmc.LOGERROR)
+            xbmc.log(f'[TMDB Scraper] Failed to load pinyin table: {e}', xbmc.LOGERROR)
 
-# Initialize on import
-if xbmc:
-    load_char_map()
+# Upper bound on the number of initial variants written per title.
+MAX_VARIANTS = 16
+# CPU time (seconds, measured on the calling thread) one title may spend generating variants.
+MAX_CPU_SECONDS = 0.05
+
+# Initials of common polyphonic words whose reading differs from the most
+# frequent reading of at least one of their characters.
+PHRASE_INITIALS = {
+    '重庆': 'CQ', '重生': 'CS', '重逢': 'CF', '重返': 'CF', '重启': 'CQ', '重温': 'CW',
+    '长城': 'CC', '长安': 'CA', '长江': 'CJ', '长征': 'CZ', '长夜': 'CY', '长河': 'CH',
+    '长空': 'CK', '漫长': 'MC',
+    '音乐': 'YY', '乐队': 'YD', '乐团': 'YT',
+    '传记': 'ZJ', '自传': 'ZZ', '外传': 'WZ', '前传': 'QZ', '正传': 'ZZ', '别传': 'BZ',
+    '西藏': 'XZ', '宝藏': 'BZ', '藏獒': 'ZA',
+    '投降': 'TX', '降龙': 'XL', '降魔': 'XM',
+    '调情': 'TQ', '空调': 'KT', '调皮': 'TP', '弹琴': 'TQ',
+    '银行': 'YH', '行业': 'HY', '排行': 'PH', '内行': 'NH', '外行': 'WH',
+    '会计': 'KJ', '人参': 'RS', '海参': 'HS', '反省': 'FX', '恐吓': 'KH', '可恶': 'KW',
+    '厦门': 'XM', '秘鲁': 'BL', '提防': 'DF', '吐蕃': 'TB', '朝花': 'ZH', '单于': 'CY',
+    '给予': 'JY', '供给': 'GJ', '星宿': 'XX', '猪圈': 'ZJ',
+}
+MAX_PHRASE_LEN = max(len(phrase) for phrase in PHRASE_INITIALS)
+
+@lru_cache(maxsize=None)
+def _decode_record(record):
+    initials = []
+    while record:
+        initials.append(INITIALS[(record & 0x1F) - 1])
+        record >>= TABLE_SLOT_BITS
+    return tuple(initials)
+
+def _char_initials(char):
+    """Distinct initials of char, in the frequency order of their readings"""
+    index = ord(char) - _TABLE_FIRST
+    if _TABLE is not None and 0 <= index < _TABLE_COUNT:
+        record = TABLE_RECORD.unpack_from(_TABLE, TABLE_HEADER.size + index * TABLE_RECORD.size)[0]
+        if record:
+            return list(_decode_record(record))
+    if char.isalnum():
+        return [char.upper()]
+    return []
 
-def get_pinyin_permutations(text):
+def _ranked_initials(text):
+    """Per-character candidate initials, with phrase readings promoted to the front"""
+    positions = [_char_initials(char) for char in text]
+    i = 0
+    while i < len(text):
+        for length in range(min(MAX_PHRASE_LEN, len(text) - i), 1, -1):
+            phrase_initials = PHRASE_INITIALS.get(text[i:i + length])
+            if phrase_initials:
+                for offset, init in enumerate(phrase_initials):
+                    candidates = positions[i + offset]
+                    positions[i + offset] = [init] + [c for c in candidates if c != init]
+                i += length
+                break
+        else:
+            i += 1
+    return [candidates for candidates in positions if candidates]
+
+def iter_pinyin_initials(text, limit=MAX_VARIANTS, cpu_budget=MAX_CPU_SECONDS, on_cutoff=None):
+    """
+    Lazily yield distinct pinyin initial strings for text, best ranked first.
+
+    A variant's rank is the sum of the ranks of the readings it uses, so the
+    reading built from every character's most likely initial comes first and
+    the full cartesian product is never materialised. Generation stops after
+    `limit` variants or once `cpu_budget` seconds of thread CPU time are spent,
+    the latter calls `on_cutoff()` if given.
+    """
     if not text:
-        return ""
-    
+        return
+
     # Lazy load if empty (e.g. if import happened before xbmc was ready, though unlikely)
-    if not CHAR_MAP and xbmc:
+    if _TABLE is None and xbmc:
         load_char_map()
 
-    # Convert each char to a list of possible initials
-    char_initials = []
-    for char in text:
-        if char in CHAR_MAP:
-            # Get all pinyin variations for this char
-            pinyins = CHAR_MAP[char]
-            # Extract initials and deduplicate preserving order
-            initials = []
-            seen = set()
-            for p in pinyins:
-                if p:
-                    init = p[0].upper()
-                    if init not in seen:
-                        seen.add(init)
-                        initials.append(init)
-            
-            if initials:
-                char_initials.append(initials)
-            else:
-                if char.isalnum():
-                    char_initials.append([char.upper()])
-        else:
-            if char.isalnum():
-                char_initials.append([char.upper()])
+    positions = _ranked_initials(text)
+    if not positions:
+        return
+
+    started = time.thread_time()
+    first = (0,) * len(positions)
+    heap = [(0, first)]
+    seen = {first}
+    emitted = 0
+    while heap and emitted < limit:
+        score, ranks = heapq.heappop(heap)
+        yield "".join(positions[i][r] for i, r in enumerate(ranks))
+        emitted += 1
+
+        if time.thread_time() - started > cpu_budget:
+            if xbmc:
+                xbmc.log(f'[TMDB Scraper] Pinyin CPU budget exhausted after {emitted} variants for "{text}"', xbmc.LOGDEBUG)
+            if on_cutoff and emitted < limit and (heap or any(r + 1 < len(positions[i]) for i, r in enumerate(ranks))):
+                on_cutoff()
+            return
+
+        for i, r in enumerate(ranks):
+            if r + 1 < len(positions[i]):
+                successor = ranks[:i] + (r + 1,) + ranks[i + 1:]
+                if successor not in seen:
+                    seen.add(successor)
+                    heapq.heappush(heap, (score + 1, successor))
+
+# Distinct titles whose joined variants are memoized (titles repeat across versions and rescans).
+PERMUTATIONS_CACHE_SIZE = 1024
+
+class _CutOff(Exception):
+    """Variants cut short by the CPU budget, raised so that lru_cache does not keep them"""
+    def __init__(self, joined):
+        Exception.__init__(self)
+        self.joined = joined
+
+@lru_cache(maxsize=PERMUTATIONS_CACHE_SIZE)
+def _joined_permutations(text, limit):
+    cut_off = []
+    joined = "|".join(iter_pinyin_initials(text, limit, on_cutoff=lambda: cut_off.append(True)))
+    if cut_off:
+        raise _CutOff(joined)
+    return joined
+
+def get_pinyin_permutations(text, limit=MAX_VARIANTS):
+    if not text:
+        return ""
 
-    # Generate Cartesian product
     try:
-        permutations = list(itertools.product(*char_initials))
-        # Join them back into strings
-        results = ["".join(p) for p in permutations]
-        # Deduplicate preserving order
-        seen_res = set()
-        unique_results = []
-        for r in results:
-            if r not in seen_res:
-                seen_res.add(r)
-                unique_results.append(r)
-        return "|".join(unique_results)
+        return _joined_permutations(text, limit)
+    except _CutOff as e:
+        # a later call with more time may get the full variants
+        return e.joined
     except Exception as e:
         if xbmc:
             xbmc.log(f'[TMDB Scraper] Pinyin generation error: {e}', xbmc.LOGERROR)
         return text
+
+# Initialize on import
+if xbmc:
+    load_char_map()
@@ -0,0 +1,337 @@
+# coding: utf-8
+"""
+Offline TMDB title index, resolves titles to TMDB IDs without the search endpoint.
+
+Built by tools/generate_title_index.py from TMDB's daily movie ID export and/or
+a CSV with localized titles and release dates. Layout (all little-endian):
+
+    header    HEADER
+    movies    MOVIE per movie: tmdb id, year (0 = unknown), popularity * 10,
+              string offsets of title and original title
+    keys      KEY per normalized title, sorted by key bytes: string offset, movie index
+    trigrams  TRIGRAM per trigram of the keys, sorted by code: code, posting offset, count
+    postings  POSTING movie indices, sorted per trigram
+    strings   uint16 length + UTF-8 bytes, string offsets are relative to this section
+
+Sorted keys give exact and prefix lookups by binary search, the trigram
+postings give fuzzy lookups; nothing is unpacked until it is looked up.
+"""
+import mmap
+import os
+import re
+import struct
+import threading
+import unicodedata
+try:
+    import xbmc
+    import xbmcaddon
+except ModuleNotFoundError:
+    xbmc = None
+    xbmcaddon = None
+
+INDEX_MAGIC = b'TTI1'
+# magic, movie count, key count, trigram count, offsets of movies, keys, trigrams, postings, strings
+HEADER = struct.Struct('<4s8I')
+MOVIE = struct.Struct('<IHHII')
+KEY = struct.Struct('<II')
+TRIGRAM = struct.Struct('<QII')
+POSTING = struct.Struct('<I')
+STRING_LENGTH = struct.Struct('<H')
+
+# Trigrams shared by more movies than this carry no information and are skipped
+MAX_POSTINGS = 20000
+# Minimum trigram similarity (Dice coefficient) of a fuzzy match
+MIN_SIMILARITY = 0.6
+# A title with several exact matches resolves to the most popular one only if
+# it is this many times more popular than the next
+POPULARITY_DOMINANCE = 5.0
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+def normalize_title(title):
+    """Index key of a title: NFKC, lowercased, punctuation and spacing collapsed to single spaces"""
+    if not title:
+        return ''
+    return _NON_WORD.sub(' ', unicodedata.normalize('NFKC', title).lower()).strip()
+
+def trigrams(key):
+    """Trigram codes of an index key, padded so short (e.g. two character Chinese) titles have some"""
+    padded = ' ' + key + ' '
+    return {(ord(padded[i]) << 42) | (ord(padded[i + 1]) << 21) | ord(padded[i + 2])
+        for i in range(len(padded) - 2)}
+
+def _similarity(query_trigrams, key):
+    key_trigrams = trigrams(key)
+    if not query_trigrams or not key_trigrams:
+        return 0.0
+    return 2.0 * len(query_trigrams & key_trigrams) / (len(query_trigrams) + len(key_trigrams))
+
+
+def build_index(movies):
+    """
+    Build the binary index from an iterable of dicts with 'id' and optional
+    'title', 'original_title', 'year' and 'popularity'.
+    """
+    strings = bytearray()
+    string_offsets = {}
+
+    def add_string(text):
+        text = text or ''
+        if text not in string_offsets:
+            data = text.encode('utf-8')[:0xFFFF]
+            string_offsets[text] = len(strings)
+            strings.extend(STRING_LENGTH.pack(len(data)))
+            strings.extend(data)
+        return string_offsets[text]
+
+    movie_records = []
+    keys = []
+    postings = {}
+    for movie in movies:
+        index = len(movie_records)
+        title = movie.get('title') or ''
+        original_title = movie.get('original_title') or ''
+        popularity = min(int(round(float(movie.get('popularity') or 0) * 10)), 0xFFFF)
+        year = int(movie.get('year') or 0)
+        year = year if 0 < year <= 0xFFFF else 0
+        movie_records.append(MOVIE.pack(int(movie['id']), year, popularity,
+            add_string(title), add_string(original_title)))
+        for key in {normalize_title(title), normalize_title(original_title)}:
+            if not key:
+                continue
+            keys.append((key.encode('utf-8'), add_string(key), index))
+            for code in trigrams(key):
+                postings.setdefault(code, set()).add(index)
+
+    keys.sort()
+    movies_off = HEADER.size
+    keys_off = movies_off + len(movie_records) * MOVIE.size
+    trigrams_off = keys_off + len(keys) * KEY.size
+    postings_off = trigrams_off + len(postings) * TRIGRAM.size
+
+    trigram_records = bytearray()
+    posting_records = bytearray()
+    for code in sorted(postings):
+        indices = sorted(postings[code])
+        trigram_records.extend(TRIGRAM.pack(code, postings_off + len(posting_records), len(indices)))
+        for index in indices:
+            posting_records.extend(POSTING.pack(index))
+    strings_off = postings_off + len(posting_records)
+
+    buffer = bytearray(HEADER.pack(INDEX_MAGIC, len(movie_records), len(keys), len(postings),
+        movies_off, keys_off, trigrams_off, postings_off, strings_off))
+    for record in movie_records:
+        buffer.extend(record)
+    for _, string_offset, index in keys:
+        buffer.extend(KEY.pack(string_offset, index))
+    buffer.extend(trigram_records)
+    buffer.extend(posting_records)
+    buffer.extend(strings)
+    return bytes(buffer)
+
+
+class TitleIndex(object):
+    def __init__(self, buffer):
+        (magic, self.movie_count, self.key_count, self.trigram_count, self._movies_off, self._keys_off,
+            self._trigrams_off, self._postings_off, self._strings_off) = HEADER.unpack_from(buffer, 0)
+        if magic != INDEX_MAGIC or len(buffer) < self._strings_off:
+            raise ValueError('Invalid title index')
+        self._buffer = buffer
+
+    def _string(self, offset):
+        offset += self._strings_off
+        length = STRING_LENGTH.unpack_from(self._buffer, offset)[0]
+        start = offset + STRING_LENGTH.size
+        return bytes(self._buffer[start:start + length])
+
+    def _key(self, position):
+        string_offset, index = KEY.unpack_from(self._buffer, self._keys_off + position * KEY.size)
+        return self._string(string_offset), index
+
+    def movie(self, index):
+        tmdb_id, year, popularity, title_off, original_off = MOVIE.unpack_from(
+            self._buffer, self._movies_off + index * MOVIE.size)
+        return {
+            'id': tmdb_id,
+            'title': self._string(title_off).decode('utf-8', 'replace'),
+            'original_title': self._string(original_off).decode('utf-8', 'replace'),
+            'year': year or None,
+            'popularity': popularity / 10.0,
+        }
+
+    def _lower_bound(self, key):
+        low, high = 0, self.key_count
+        while low < high:
+            mid = (low + high) // 2
+            if self._key(mid)[0] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def find_exact(self, title):
+        """Movie indices with a title or original title equal to `title` after normalization"""
+        key = normalize_title(title).encode('utf-8')
+        if not key:
+            return []
+        result = []
+        position = self._lower_bound(key)
+        while position < self.key_count:
+            current, index = self._key(position)
+            if current != key:
+                break
+            if index not in result:
+                result.append(index)
+            position += 1
+        return result
+
+    def find_prefix(self, prefix, limit=50):
+        """Movie indices with a normalized title starting with `prefix`, in key order"""
+        key = normalize_title(prefix).encode('utf-8')
+        if not key:
+            return []
+        result = []
+        position = self._lower_bound(key)
+        while position < self.key_count and len(result) < limit:
+            current, index = self._key(position)
+            if not current.startswith(key):
+                break
+            if index not in result:
+                result.append(index)
+            position += 1
+        return result
+
+    def _postings(self, code):
+        low, high = 0, self.trigram_count
+        while low < high:
+            mid = (low + high) // 2
+            current, offset, count = TRIGRAM.unpack_from(self._buffer, self._trigrams_off + mid * TRIGRAM.size)
+            if current < code:
+                low = mid + 1
+            elif current > code:
+                high = mid
+            else:
+                return offset, count
+        return None, 0
+
+    def find_similar(self, title, limit=20):
+        """(similarity, movie index) pairs of fuzzy trigram matches, best first"""
+        key = normalize_title(title)
+        query = trigrams(key) if key else set()
+        shared = {}
+        for code in query:
+            offset, count = self._postings(code)
+            if not count or count > MAX_POSTINGS:
+                continue
+            for i in range(count):
+                index = POSTING.unpack_from(self._buffer, offset + i * POSTING.size)[0]
+                shared[index] = shared.get(index, 0) + 1
+
+        # only score the candidates sharing most trigrams, scoring needs their titles
+        candidates = sorted(shared, key=shared.get, reverse=True)[:limit * 5]
+        result = []
+        for index in candidates:
+            movie = self.movie(index)
+            similarity = max(_similarity(query, normalize_title(movie['title'])),
+                _similarity(query, normalize_title(movie['original_title'])))
+            if similarity >= MIN_SIMILARITY:
+                result.append((similarity, index))
+        result.sort(key=lambda item: (-item[0], -self.movie(item[1])['popularity']))
+        return result[:limit]
+
+    def search(self, title, year=None, limit=10):
+        """
+        Movies matching `title` as search-result-like dicts (with 'release_date'
+        holding the year): exact matches first, then titles starting with it,
+        then fuzzy ones, each group ranked by year distance and popularity.
+        """
+        year = int(year) if year else None
+
+        def rank(movie):
+            distance = abs(movie['year'] - year) if year and movie['year'] else 0
+            return (distance, -movie['popularity'])
+
+        movies = []
+        seen = set()
+        for indices in (self.find_exact(title), self.find_prefix(title, limit),
+                [index for _, index in self.find_similar(title, limit)]):
+            group = [self.movie(index) for index in indices if index not in seen]
+            seen.update(indices)
+            movies.extend(sorted(group, key=rank))
+        return [_as_search_result(movie) for movie in movies[:limit]]
+
+    def resolve(self, title, year=None):
+        """
+        The TMDB search-result-like dict `title` unambiguously refers to, None if
+        the index cannot tell: only exact title matches count, narrowed to the
+        year (or a year off by one) when there is one, titles of unknown year
+        never match a year; several remaining ones resolve only if the
+        most popular clearly dominates.
+        """
+        candidates = [self.movie(index) for index in self.find_exact(title)]
+        if year and candidates:
+            year = int(year)
+            same_year = [movie for movie in candidates if movie['year'] == year]
+            near_year = [movie for movie in candidates if movie['year'] and abs(movie['year'] - year) == 1]
+            # a title of unknown year (the daily export has none) may be a
+            # remake of another year, the search decides
+            candidates = same_year or near_year
+        if not candidates:
+            return None
+        candidates.sort(key=lambda movie: movie['popularity'], reverse=True)
+        if len(candidates) > 1 and candidates[0]['popularity'] < POPULARITY_DOMINANCE * max(candidates[1]['popularity'], 0.1):
+            return None
+        return _as_search_result(candidates[0])
+
+
+def _as_search_result(movie):
+    return {
+        'id': movie['id'],
+        'title': movie['title'] or movie['original_title'],
+        'original_title': movie['original_title'],
+        'release_date': str(movie['year']) if movie['year'] else '',
+        'popularity': movie['popularity'],
+    }
+
+
+# Singleton instance
+_index = None
+_index_lock = threading.Lock()
+
+def get_index():
+    """The index mapped from resources/data/tmdb_title_index.bin, None if it is not installed"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _load_index() or False
+    return _index or None
+
+def _load_index():
+    if not xbmcaddon:
+        return None
+    try:
+        addon_path = xbmcaddon.Addon(id='metadata.tmdb.cn.optimization').getAddonInfo('path')
+        index_path = os.path.join(addon_path, 'resources', 'data', 'tmdb_title_index.bin')
+        if not os.path.exists(index_path):
+            xbmc.log(f'[TMDB Scraper] Title index not found: {index_path}', xbmc.LOGDEBUG)
+            return None
+        with open(index_path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                buffer = f.read()
+        index = TitleIndex(buffer)
+        xbmc.log(f'[TMDB Scraper] Mapped title index with {index.movie_count} movies', xbmc.LOGINFO)
+        return index
+    except Exception as e:
+        xbmc.log(f'[TMDB Scraper] Failed to load title index: {e}', xbmc.LOGERROR)
+        return None
+
+def search(title, year=None, limit=10):
+    index = get_index()
+    return index.search(title, year, limit) if index else []
+
+def resolve(title, year=None):
+    index = get_index()
+    return index.resolve(title, year) if index else None
@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
 from datetime import datetime, timedelta
 from . import tmdbapi
 from . import api_utils
@@ -5,6 +7,12 @@ from . import pinyin
 
 import json
 
+# Titles up to this length are searched with page 2 speculatively, see _speculate_page2
+SPECULATIVE_TITLE_LENGTH = 4
+
+_SPECULATIVE_STATS = {'hit': 0, 'waste': 0}
+_SPECULATIVE_LOCK = threading.Lock()
+
 class TMDBMovieScraper(object):
     def __init__(self, url_settings, language, certification_country, search_language="", include_adult=False):
         self.url_settings = url_settings
@@ -16,6 +24,10 @@ class TMDBMovieScraper(object):
             self.search_language = search_language
         self.include_adult = include_adult
         self._urls = None
+        try:
+            self.speculative_page2 = bool(url_settings) and url_settings.getSettingBool('search_speculative_page2')
+        except:
+            self.speculative_page2 = False
 
     @property
     def urls(self):
@@ -38,8 +50,7 @@ class TMDBMovieScraper(object):
     def search(self, title, year=None):
 
         def is_best(item):
-            return item['title'].lower() == title and (
-                not year or item.get('release_date', '').startswith(year))
+            return _is_best(item, title, year)
 
         search_media_id = _parse_media_id(title)
         if search_media_id:
@@ -54,31 +65,72 @@ class TMDBMovieScraper(object):
                     return result
                 result = result.get('movie_results')
         else:
-            response = tmdbapi.search_movie(query=title, year=year, language=self.search_language, settings=self.url_settings, include_adult=self.include_adult)
+            response_page2 = None
+            if self.speculative_page2 and _speculate_page2(title, year):
+                response, response_page2 = self._search_first_pages(title, year)
+            else:
+                response = tmdbapi.search_movie(query=title, year=year, language=self.search_language, settings=self.url_settings, include_adult=self.include_adult)
             if 'error' in response:
                 return response
             result = response['results']
             # get second page if available and if first page doesn't contain an `is_best` result with popularity > 5
+            needs_page2 = False
             if response['total_pages'] > 1:
                 bests = [item for item in result if is_best(item) and item.get('popularity',0) > 5]
-                if not bests:
-                    response = tmdbapi.search_movie(query=title, year=year, language=self.language, page=2, settings=self.url_settings, include_adult=self.include_adult)
-                    if not 'error' in response:
-                        result += response['results']
-        urls = self.urls
+                needs_page2 = not bests
+            if response_page2 is not None:
+                _record_speculative_page(needs_page2)
+            if needs_page2:
+                if response_page2 is None:
+                    response_page2 = tmdbapi.search_movie(query=title, year=year, language=self.language, page=2, settings=self.url_settings, include_adult=self.include_adult)
+                if not 'error' in response_page2:
+                    result += response_page2['results']
 
         if result:
-            # move all `is_best` results at the beginning of the list, sort them by popularity (if found):
-            bests_first = sorted([item for item in result if is_best(item)], key=lambda k: k.get('popularity',0), reverse=True)
-            result = bests_first + [item for item in result if item not in bests_first]
-
-        proxy = self._get_image_proxy()
+            result = _bests_first(result, title, year)
+        return self._set_image_urls(result)
+
+    def search_year_window(self, title, year):
+        """
+        Search `year`, `year-1`, `year+1` and no year at once instead of one after
+        the other. Results are merged in that order of preference, without
+        duplicates and with the `is_best` ranking of search().
+        """
+        if _parse_media_id(title):
+            return self.search(title, year)
+        years = _year_window(year)
+        with ThreadPoolExecutor(max_workers=len(years)) as executor:
+            responses = list(executor.map(lambda window_year: tmdbapi.search_movie(query=title, year=window_year,
+                language=self.search_language, settings=self.url_settings, include_adult=self.include_adult), years))
+        result = _merge_year_window(title, years, responses)
+        if 'error' in result:
+            return result
+        return self._set_image_urls(result)
+
+    def _search_first_pages(self, title, year):
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page2 = executor.submit(tmdbapi.search_movie, query=title, year=year, language=self.language, page=2,
+                settings=self.url_settings, include_adult=self.include_adult)
+            response = tmdbapi.search_movie(query=title, year=year, language=self.search_language,
+                settings=self.url_settings, include_adult=self.include_adult)
+            try:
+                response_page2 = page2.result()
+            except Exception as e:
+                response_page2 = {'error': str(e)}
+        return response, response_page2
+
+    def image_preview_prefix(self):
+        """What goes in front of a TMDB image path in search results"""
+        return self._get_image_proxy() + self.urls['preview']
+
+    def _set_image_urls(self, result):
+        prefix = self.image_preview_prefix()
 
         for item in result:
             if item.get('poster_path'):
-                item['poster_path'] = proxy + urls['preview'] + item['poster_path']
+                item['poster_path'] = prefix + item['poster_path']
             if item.get('backdrop_path'):
-                item['backdrop_path'] = proxy + urls['preview'] + item['backdrop_path']
+                item['backdrop_path'] = prefix + item['backdrop_path']
         return result
 
     def get_details(self, uniqueids):
@@ -220,6 +272,60 @@ def _parse_media_id(title):
         return {'type': 'imdb', 'id':title[5:]}
     return None
 
+def _speculate_page2(title, year):
+    """Whether a search is ambiguous enough to fetch page 2 along with page 1"""
+    return not year or len(title) <= SPECULATIVE_TITLE_LENGTH
+
+def _record_speculative_page(hit):
+    with _SPECULATIVE_LOCK:
+        _SPECULATIVE_STATS['hit' if hit else 'waste'] += 1
+        hits, waste = _SPECULATIVE_STATS['hit'], _SPECULATIVE_STATS['waste']
+    tmdbapi.log('speculative page 2 %s (hit: %d, waste: %d)' % ('used' if hit else 'discarded', hits, waste))
+
+def get_speculative_page_stats():
+    """Count of speculative page-2 fetches that were used (hit) or discarded (waste)"""
+    with _SPECULATIVE_LOCK:
+        hits, waste = _SPECULATIVE_STATS['hit'], _SPECULATIVE_STATS['waste']
+    total = hits + waste
+    return {'hit': hits, 'waste': waste, 'ratio': float(hits) / total if total else 0.0}
+
+def _year_window(year):
+    """Years tried for a search with a year, in order of preference"""
+    year = int(year)
+    return [str(year), str(year - 1), str(year + 1), None]
+
+def _is_best(item, title, year):
+    return item['title'].lower() == title and (
+        not year or item.get('release_date', '').startswith(year))
+
+def _bests_first(result, title, year):
+    # move all `is_best` results at the beginning of the list, sort them by popularity (if found):
+    bests_first = sorted([item for item in result if _is_best(item, title, year)], key=lambda k: k.get('popularity',0), reverse=True)
+    return bests_first + [item for item in result if item not in bests_first]
+
+def _merge_year_window(title, years, responses):
+    """
+    Merge the search responses of a year window into one result list.
+
+    Each year keeps its `is_best` ranking and years are kept in the order of
+    `years`, so the list starts with what the sequential fallback would have
+    found; movies already listed for a preferred year are dropped.
+    """
+    result = []
+    seen = set()
+    error = None
+    for year, response in zip(years, responses):
+        if 'error' in response:
+            error = error or response
+            continue
+        for item in _bests_first(response.get('results', []), title, year):
+            if item['id'] not in seen:
+                seen.add(item['id'])
+                result.append(item)
+    if not result and error:
+        return error
+    return result
+
 def _get_movie(mid, language=None, search=False):
     details = None if search else \
         'trailers,images,releases,casts,keywords' if language is not None else \
@@ -12,6 +12,7 @@ from lib.tmdbscraper import traktratings
 from lib.tmdbscraper import api_utils
 from lib.tmdbscraper import tmdbapi
 from lib.tmdbscraper import imdb_mapper
+from lib import search_cache
 
 from scraper_datahelper import combine_scraped_details_info_and_ratings, \
     combine_scraped_details_available_artwork, find_uniqueids_in_text, get_params
@@ -46,17 +47,28 @@ def get_dns_settings(settings):
 
 def search_for_movie(title, year, handle, settings):
     log("Find movie with title '{title}' from year '{year}'".format(title=title, year=year), xbmc.LOGINFO)
-    title = _strip_trailing_article(title)
+    title = search_cache.strip_trailing_article(title)
     scraper = get_tmdb_scraper(settings)
 
-    search_results = scraper.search(title, year)
-    if year is not None:
-        if not search_results:
-            search_results = scraper.search(title,str(int(year)-1))
-        if not search_results:
-            search_results = scraper.search(title,str(int(year)+1))
-        if not search_results:
-            search_results = scraper.search(title)
+    cache = search_cache.get_search_cache() if settings.getSettingBool('enable_search_cache') else None
+    year_fanout = year is not None and settings.getSettingBool('search_year_fanout')
+    image_prefix = scraper.image_preview_prefix() if cache else ''
+    search_results = cache.get(title, year, scraper.search_language, image_prefix, year_fanout, scraper.include_adult) if cache else None
+    if search_results is None:
+        if year_fanout:
+            search_results = scraper.search_year_window(title, year)
+        else:
+            search_results = scraper.search(title, year)
+            if year is not None:
+                if not search_results:
+                    search_results = scraper.search(title,str(int(year)-1))
+                if not search_results:
+                    search_results = scraper.search(title,str(int(year)+1))
+                if not search_results:
+                    search_results = scraper.search(title)
+        if cache:
+            cache.put(title, year, scraper.search_language, search_results, image_prefix, year_fanout,
+                scraper.include_adult)
     if not search_results:
         return
 
@@ -72,14 +84,6 @@ def search_for_movie(title, year, handle, settings):
         xbmcplugin.addDirectoryItem(handle=handle, url=build_lookup_string(uniqueids),
             listitem=listitem, isFolder=True)
 
-_articles = [prefix + article for prefix in (', ', ' ') for article in ("the", "a", "an")]
-def _strip_trailing_article(title):
-    title = title.lower()
-    for article in _articles:
-        if title.endswith(article):
-            return title[:-len(article)]
-    return title
-
 def _searchresult_to_listitem(movie):
     movie_label = movie['title']
 
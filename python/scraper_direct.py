@@ -13,6 +13,7 @@ from lib.tmdbscraper_direct.tmdb import TMDBMovieScraper
 from lib.tmdbscraper_direct import fanarttv
 from lib.tmdbscraper_direct import imdbratings
 from lib.tmdbscraper_direct import traktratings
+from lib import search_cache
 
 from scraper_datahelper import combine_scraped_details_info_and_ratings, \
     combine_scraped_details_available_artwork
@@ -42,6 +43,16 @@ class ScraperRunner(object):
             search_language = self.settings.getSettingString('searchlanguage')
         except:
             search_language = language
+
+        try:
+            self.year_fanout = self.settings.getSettingBool('search_year_fanout')
+        except:
+            self.year_fanout = False
+
+        try:
+            self.use_search_cache = self.settings.getSettingBool('enable_search_cache')
+        except:
+            self.use_search_cache = False
             
         self.tmdb = TMDBMovieScraper(
             url_settings=self.settings,
@@ -56,29 +67,36 @@ class ScraperRunner(object):
         Run search and return raw list of dicts.
         Matches logic in scraper.py search_for_movie (strips articles, fallbacks for year)
         """
-        title = self._strip_trailing_article(title)
-
-        # Call the direct scraper search
-        search_results = self.tmdb.search(title, year)
-        
-        if year is not None:
-            if not search_results:
-                search_results = self.tmdb.search(title, str(int(year)-1))
-            if not search_results:
-                search_results = self.tmdb.search(title, str(int(year)+1))
-            if not search_results:
-                search_results = self.tmdb.search(title)
-        
+        title = search_cache.strip_trailing_article(title)
+
+        cache = search_cache.get_search_cache() if self.use_search_cache else None
+        year_fanout = year is not None and self.year_fanout
+        if cache:
+            image_prefix = self.tmdb.image_preview_prefix()
+            search_results = cache.get(title, year, self.tmdb.search_language, image_prefix, year_fanout,
+                self.tmdb.include_adult)
+            if search_results is not None:
+                return search_results
+
+        if year_fanout:
+            search_results = self.tmdb.search_year_window(title, year)
+        else:
+            # Call the direct scraper search
+            search_results = self.tmdb.search(title, year)
+            
+            if year is not None:
+                if not search_results:
+                    search_results = self.tmdb.search(title, str(int(year)-1))
+                if not search_results:
+                    search_results = self.tmdb.search(title, str(int(year)+1))
+                if not search_results:
+                    search_results = self.tmdb.search(title)
+
+        if cache:
+            cache.put(title, year, self.tmdb.search_language, search_results, image_prefix, year_fanout,
+                self.tmdb.include_adult)
         return search_results
 
-    def _strip_trailing_article(self, title):
-        _articles = [prefix + article for prefix in (', ', ' ') for article in ("the", "a", "an")]
-        title = title.lower()
-        for article in _articles:
-            if title.endswith(article):
-                return title[:-len(article)]
-        return title
-
     def get_details(self, uniqueids):
         """
         Args:
@@ -0,0 +1,107 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+
+from python.lib.tmdbscraper_direct import candidate_scorer
+from python.lib.tmdbscraper_direct import pinyin
+
+CHAR_MAP = {
+    '英': ['ying'], '雄': ['xiong'], '本': ['ben'], '色': ['se'],
+    '黑': ['hei'], '客': ['ke'], '帝': ['di'], '国': ['guo'],
+}
+
+class TestCandidateScorer(unittest.TestCase):
+    def setUp(self):
+        pinyin._set_table(pinyin.compile_char_map(CHAR_MAP))
+        self.addCleanup(pinyin._set_table, None)
+
+    def test_score_candidates__year_breaks_title_tie(self):
+        results = [
+            {'id': 500, 'title': '英雄', 'original_title': 'Hero', 'release_date': '1992-01-01', 'popularity': 30},
+            {'id': 9700, 'title': '英雄', 'original_title': '英雄', 'release_date': '2002-12-19', 'popularity': 20},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, '英雄', '2002')
+
+        self.assertEqual(9700, actual_output[0][1]['id'])
+        self.assertTrue(candidate_scorer.is_confident(actual_output))
+
+    def test_score_candidates__original_title(self):
+        results = [
+            {'id': 1, 'title': '黑客', 'original_title': 'Hackers', 'release_date': '1995-09-15', 'popularity': 90},
+            {'id': 603, 'title': '黑客帝国', 'original_title': 'The Matrix', 'release_date': '1999-03-30', 'popularity': 70},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, 'The.Matrix', '1999')
+
+        self.assertEqual(603, actual_output[0][1]['id'])
+
+    def test_score_candidates__pinyin_initials(self):
+        results = [
+            {'id': 2, 'title': 'Yes', 'original_title': 'Yes', 'release_date': '', 'popularity': 5},
+            {'id': 9700, 'title': '英雄', 'original_title': '英雄', 'release_date': '', 'popularity': 5},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, 'YX')
+
+        self.assertEqual(9700, actual_output[0][1]['id'])
+
+    def test_score_candidates__alt_titles(self):
+        results = [
+            {'id': 1, 'title': 'Heroes', 'original_title': 'Heroes', 'release_date': '2002', 'popularity': 5},
+            {'id': 9700, 'title': '英雄', 'original_title': '英雄', 'release_date': '2002', 'popularity': 5},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, '英雄', '2002', ('Hero',))
+
+        self.assertEqual(9700, actual_output[0][1]['id'])
+
+    def test_score_candidates__empty(self):
+        self.assertEqual([], candidate_scorer.score_candidates([], 'title'))
+        self.assertFalse(candidate_scorer.is_confident([]))
+
+    def test_is_confident__close_scores(self):
+        results = [
+            {'id': 1, 'title': '本色', 'original_title': '', 'release_date': '2001', 'popularity': 10},
+            {'id': 2, 'title': '本色', 'original_title': '', 'release_date': '2001', 'popularity': 10},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, '本色', '2001')
+
+        self.assertFalse(candidate_scorer.is_confident(actual_output))
+
+    def test_is_confident__low_score(self):
+        results = [{'id': 1, 'title': 'Something Else', 'original_title': '', 'release_date': '1980', 'popularity': 1}]
+
+        actual_output = candidate_scorer.score_candidates(results, '本色', '2001')
+
+        self.assertFalse(candidate_scorer.is_confident(actual_output))
+
+    def test_needs_better_title__same_title_other_year(self):
+        results = [
+            {'id': 1, 'title': '本色', 'original_title': '', 'release_date': '2001', 'popularity': 10},
+            {'id': 2, 'title': '本色', 'original_title': '', 'release_date': '2002', 'popularity': 10},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, '本色')
+
+        self.assertFalse(candidate_scorer.is_confident(actual_output))
+        self.assertFalse(candidate_scorer.needs_better_title(actual_output))
+
+    def test_needs_better_title__close_other_title(self):
+        results = [
+            {'id': 1, 'title': '本色', 'original_title': '', 'release_date': '2001', 'popularity': 10},
+            {'id': 2, 'title': '本色帝国', 'original_title': '', 'release_date': '2001', 'popularity': 10},
+        ]
+
+        actual_output = candidate_scorer.score_candidates(results, '本色帝', '2001')
+
+        self.assertFalse(candidate_scorer.is_confident(actual_output))
+        self.assertTrue(candidate_scorer.needs_better_title(actual_output))
+
+    def test_needs_better_title__low_score(self):
+        results = [{'id': 1, 'title': 'Something Else', 'original_title': '', 'release_date': '1980', 'popularity': 1}]
+
+        actual_output = candidate_scorer.score_candidates(results, '本色', '2001')
+
+        self.assertTrue(candidate_scorer.needs_better_title(actual_output))
+        self.assertTrue(candidate_scorer.needs_better_title([]))
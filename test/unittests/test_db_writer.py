@@ -0,0 +1,68 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import sqlite3
+import threading
+import unittest
+
+from python.lib import db_writer
+
+class TestDatabaseWriter(unittest.TestCase):
+    def make_writer(self, write, flush=None, close_db=None, queue_size=db_writer.QUEUE_SIZE):
+        writer = db_writer.DatabaseWriter(lambda: [], write, flush, close_db, queue_size).start()
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_writer__writes_in_order_and_flushes_on_close(self):
+        calls = []
+        writer = self.make_writer(lambda db, item: db.append(item),
+                                  flush=lambda db, force: force and calls.append(('flush', list(db))),
+                                  close_db=lambda db: calls.append(('close', list(db))))
+
+        for i in range(10):
+            self.assertTrue(writer.put(i))
+        writer.close()
+
+        self.assertEqual([('flush', list(range(10))), ('close', list(range(10)))], calls)
+        self.assertEqual(10, writer.written)
+        self.assertFalse(writer.put(10))
+
+    def test_writer__error_does_not_stop_writer(self):
+        def write(db, item):
+            if item == 1:
+                raise ValueError('bad item')
+            db.append(item)
+        written = []
+        writer = self.make_writer(write, close_db=written.extend)
+
+        for i in range(3):
+            writer.put(i)
+        writer.close()
+
+        self.assertEqual([0, 2], written)
+
+    def test_writer__connection_belongs_to_writer_thread(self):
+        results = []
+        def open_db():
+            return sqlite3.connect(':memory:')
+        def write(db, item):
+            results.append(db.execute('SELECT ?', (item,)).fetchone()[0])
+        writer = db_writer.DatabaseWriter(open_db, write, close_db=lambda db: db.close()).start()
+
+        writer.put('a')
+        writer.close()
+
+        self.assertEqual(['a'], results)
+
+    def test_writer__put_blocks_while_queue_is_full(self):
+        release = threading.Event()
+        writer = self.make_writer(lambda db, item: release.wait(), queue_size=1)
+        writer.put(0)
+        writer.put(1)
+
+        blocked = threading.Thread(target=writer.put, args=(2,))
+        blocked.start()
+        blocked.join(0.5)
+        self.assertTrue(blocked.is_alive())
+
+        release.set()
+        blocked.join(2)
+        self.assertFalse(blocked.is_alive())
@@ -0,0 +1,103 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+from unittest import mock
+
+from python.lib import deepseek_extractor
+
+
+def make_response(status_code, content=None, headers=None):
+    response = mock.Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = {'choices': [{'message': {'content': content}}]} if content is not None else {}
+    return response
+
+
+class TestDeepSeekExtractor(unittest.TestCase):
+    def setUp(self):
+        deepseek_extractor.reset_error_summary()
+        self.addCleanup(deepseek_extractor.reset_error_summary)
+        self.extractor = deepseek_extractor.DeepSeekExtractor('key', 'https://api.deepseek.com', 'deepseek-chat', 'Parse {}')
+        self.session = mock.Mock()
+        patcher = mock.patch.object(deepseek_extractor, 'get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.sleep = mock.Mock()
+        patcher = mock.patch.object(deepseek_extractor.time, 'sleep', self.sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_complete__retries_rate_limited_request(self):
+        self.session.post.side_effect = [make_response(429, headers={'Retry-After': '7'}), make_response(200, 'answer')]
+
+        self.assertEqual('answer', self.extractor._complete('prompt', 'label'))
+        self.assertEqual(2, self.session.post.call_count)
+        self.sleep.assert_called_once_with(7.0)
+        self.assertEqual({}, deepseek_extractor.get_error_summary())
+
+    def test_complete__gives_up_after_retries(self):
+        self.session.post.return_value = make_response(429)
+
+        self.assertIsNone(self.extractor._complete('prompt', 'label'))
+        self.assertEqual(deepseek_extractor.MAX_RETRIES + 1, self.session.post.call_count)
+        self.assertEqual([mock.call(deepseek_extractor._retry_delay(None, attempt))
+                          for attempt in range(deepseek_extractor.MAX_RETRIES)], self.sleep.call_args_list)
+        self.assertEqual({'请求过于频繁': 1}, deepseek_extractor.get_error_summary())
+
+    def test_complete__backs_off_without_request_slot(self):
+        free_slots = []
+        self.sleep.side_effect = lambda seconds: free_slots.append(deepseek_extractor._REQUEST_SLOTS._value)
+        self.session.post.side_effect = [make_response(503), make_response(200, 'answer')]
+
+        self.assertEqual('answer', self.extractor._complete('prompt', 'label'))
+        self.assertEqual([deepseek_extractor.MAX_CONCURRENT_REQUESTS], free_slots)
+
+    def test_complete__client_error_is_not_retried(self):
+        self.session.post.return_value = make_response(401)
+
+        self.assertIsNone(self.extractor._complete('prompt', 'label'))
+        self.assertEqual(1, self.session.post.call_count)
+        self.sleep.assert_not_called()
+        self.assertEqual({'HTTP 401': 1}, deepseek_extractor.get_error_summary())
+
+    def test_retry_delay__exponential_and_capped(self):
+        self.assertEqual(deepseek_extractor.BACKOFF_SECONDS, deepseek_extractor._retry_delay(None, 0))
+        self.assertEqual(deepseek_extractor.BACKOFF_SECONDS * 4, deepseek_extractor._retry_delay(None, 2))
+        self.assertEqual(deepseek_extractor.MAX_BACKOFF_SECONDS, deepseek_extractor._retry_delay(None, 20))
+        self.assertEqual(deepseek_extractor.MAX_BACKOFF_SECONDS,
+                         deepseek_extractor._retry_delay(make_response(429, headers={'Retry-After': '3600'}), 0))
+
+    def test_extract_batch__invalid_json_is_recorded(self):
+        self.session.post.return_value = make_response(200, '[{"index": 0, "chinese": "无间道",]')
+
+        self.assertEqual([None, None], self.extractor.extract_batch(['a.mkv', 'b.mkv']))
+        self.assertEqual({'JSON 解析失败': 1}, deepseek_extractor.get_error_summary())
+
+    def test_extract_batch__aligned_by_index(self):
+        self.session.post.return_value = make_response(200, 'json:\n['
+            '{"index": 1, "chinese": "英雄", "year": "2002"},'
+            '{"index": "0", "chinese": "无间道", "year": "2002"}]')
+
+        self.assertEqual([{'chinese': '无间道', 'year': '2002'}, {'chinese': '英雄', 'year': '2002'}],
+                         self.extractor.extract_batch(['a.mkv', 'b.mkv']))
+
+    def test_extract_batch__invalid_indexes_are_skipped(self):
+        self.session.post.return_value = make_response(200, '['
+            '{"index": 2, "chinese": "越界"},'
+            '{"index": -1, "chinese": "负数"},'
+            '{"index": true, "chinese": "布尔"},'
+            '{"chinese": "无编号"},'
+            '"not an object",'
+            '{"index": 0, "chinese": "第一个"},'
+            '{"index": 0, "chinese": "重复"}]')
+
+        self.assertEqual([{'chinese': '第一个'}, None], self.extractor.extract_batch(['a.mkv', 'b.mkv']))
+
+    def test_extract_batch__short_response_leaves_the_rest(self):
+        self.session.post.return_value = make_response(200, '[{"index": 0, "chinese": "无间道"}]')
+
+        self.assertEqual([{'chinese': '无间道'}, None, None], self.extractor.extract_batch(['a.mkv', 'b.mkv', 'c.mkv']))
+
+    def test_extract_batch__no_array(self):
+        self.session.post.return_value = make_response(200, '{"index": 0, "chinese": "无间道"}')
+
+        self.assertEqual([None], self.extractor.extract_batch(['a.mkv']))
+        self.assertEqual({'响应中未找到 JSON 数据': 1}, deepseek_extractor.get_error_summary())
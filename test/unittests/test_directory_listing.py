@@ -0,0 +1,20 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+
+from python.lib.directory_listing import DirectoryListing
+
+VIDEO_EXTENSIONS = ['.mkv', '.mp4', '.iso']
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.tbn', '.webp']
+
+class TestDirectoryListing(unittest.TestCase):
+    def test_init__index_by_kind(self):
+        files = ['Hero.2002.mkv', 'Hero.2002.NFO', 'Poster.JPG', 'hero.2002-fanart.jpg', 'Hero.2002.srt', 'Extra.MP4']
+
+        listing = DirectoryListing('/movies/Hero/', ['extras'], files, VIDEO_EXTENSIONS, IMAGE_EXTENSIONS)
+
+        self.assertEqual(['Hero.2002.mkv', 'Extra.MP4'], listing.video_files)
+        self.assertEqual(2, listing.video_files_in_dir)
+        self.assertEqual({'hero.2002.nfo': 'Hero.2002.NFO'}, listing.nfo_map)
+        self.assertEqual({'poster.jpg': 'Poster.JPG', 'hero.2002-fanart.jpg': 'hero.2002-fanart.jpg'},
+            listing.image_map)
+        self.assertEqual(['extras'], listing.dirs)
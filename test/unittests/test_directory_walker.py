@@ -0,0 +1,75 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import threading
+import time
+import unittest
+
+from python.lib import directory_walker
+
+TREE = {
+    'dav://nas/movies/': ['A', 'B'],
+    'dav://nas/movies/A/': ['A1', 'A2'],
+    'dav://nas/movies/B/': [],
+    'dav://nas/movies/A/A1/': [],
+    'dav://nas/movies/A/A2/': [],
+}
+
+class TestDirectoryWalker(unittest.TestCase):
+    def test_source_of(self):
+        self.assertEqual('dav://nas', directory_walker.source_of('DAV://NAS/movies/'))
+        self.assertEqual('smb://user@nas:445', directory_walker.source_of('smb://user@nas:445/share/'))
+        self.assertEqual('', directory_walker.source_of('/storage/movies/'))
+
+    def test_walk__visits_tree(self):
+        def visit(path, depth):
+            return depth, [(path + d + '/', depth + 1) for d in TREE[path]]
+        walker = directory_walker.DirectoryWalker(visit, workers=3)
+        self.addCleanup(walker.close)
+
+        actual_output = dict(walker.walk([('dav://nas/movies/', 0)]))
+
+        self.assertEqual({'dav://nas/movies/': 0, 'dav://nas/movies/A/': 1, 'dav://nas/movies/B/': 1,
+            'dav://nas/movies/A/A1/': 2, 'dav://nas/movies/A/A2/': 2}, actual_output)
+
+    def test_walk__close_stops(self):
+        walker = directory_walker.DirectoryWalker(lambda path, data: (None, [(path + 'x/', None)]), workers=2)
+
+        for i, _ in enumerate(walker.walk([('dav://nas/', None)])):
+            if i == 3:
+                walker.close()
+
+        self.assertEqual({}, walker.pending)
+
+    def test_source_limiter__caps_concurrency(self):
+        limiter = directory_walker.SourceLimiter(max_concurrent=2)
+        lock = threading.Lock()
+        running = {'dav://a': 0, 'dav://b': 0}
+        peak = {'dav://a': 0, 'dav://b': 0}
+        def visit(path, data):
+            source = directory_walker.source_of(path)
+            limiter.acquire(path)
+            try:
+                with lock:
+                    running[source] += 1
+                    peak[source] = max(peak[source], running[source])
+                time.sleep(0.02)
+                with lock:
+                    running[source] -= 1
+            finally:
+                limiter.release(path)
+            return None, []
+        walker = directory_walker.DirectoryWalker(visit, workers=8)
+        self.addCleanup(walker.close)
+
+        list(walker.walk([('dav://{}/{}/'.format(host, i), None) for host in 'ab' for i in range(6)]))
+
+        self.assertEqual({'dav://a': 2, 'dav://b': 2}, peak)
+
+    def test_source_limiter__min_interval(self):
+        limiter = directory_walker.SourceLimiter(max_concurrent=4, min_interval=0.05)
+        started = []
+        for _ in range(3):
+            limiter.acquire('dav://a/')
+            started.append(time.monotonic())
+            limiter.release('dav://a/')
+
+        self.assertGreaterEqual(started[2] - started[0], 0.09)
@@ -0,0 +1,28 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import time
+import unittest
+
+from python.lib import cache_store
+from python.lib import filename_cache
+
+PROMPT = 'Parse filename to JSON: {"cn":"中文名","en":"英文名","year":"年份"}'
+
+class TestFilenameCache(unittest.TestCase):
+    def setUp(self):
+        self.store = cache_store.CacheStore(':memory:')
+        self.addCleanup(self.store.close)
+        self.cache = filename_cache.FilenameCache(self.store)
+
+    def test_get_deepseek__per_model_and_prompt(self):
+        self.cache.put_deepseek('yx.2002.mkv', 'deepseek-chat', PROMPT, '英雄', '2002', 'Hero')
+
+        self.assertEqual(('英雄', '2002', 'Hero'), self.cache.get_deepseek('yx.2002.mkv', 'deepseek-chat', PROMPT))
+        self.assertIsNone(self.cache.get_deepseek('yx.2002.mkv', 'deepseek-reasoner', PROMPT))
+        self.assertIsNone(self.cache.get_deepseek('yx.2002.mkv', 'deepseek-chat', PROMPT + ' '))
+
+    def test_put_deepseek__nothing_extracted_cached_shorter(self):
+        self.cache.put_deepseek('junk.mkv', 'deepseek-chat', PROMPT, None, None, None)
+
+        self.assertEqual((None, None, None), self.cache.get_deepseek('junk.mkv', 'deepseek-chat', PROMPT))
+        expires = self.store._conn.execute('SELECT expires FROM cache').fetchone()[0]
+        self.assertLess(expires, time.time() + filename_cache.DEEPSEEK_EMPTY_TTL + 60)
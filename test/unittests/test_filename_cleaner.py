@@ -0,0 +1,67 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import random
+import unittest
+
+from python.lib import filename_cleaner
+
+# Pieces of release names, including the inputs each clutter alternative is
+# sensitive to and the characters that make clean_string defer to the regexps
+WORDS = ['The', 'Matrix', 'Hero', 'Ben-Hur', '英雄', '黑客帝国', '宾虚', 'a', 'B', '1999', '2002', '1899', '2100',
+    '19999', '2010x', '１９９９', '1080p', '720P', '2160p', 'x264', 'H265', 'HEVC', 'BluRay', 'WEB', 'web', 'DL',
+    'dl', 'Web-DL', 'WEBRip', 'read', 'nfo', 'readXnfo', 'READ.NFO', 'www', 'wwwzwww', 'WWW.WWW', 'DTS', 'dts-x',
+    'DTS-HDMA', 'hdma', 'cd1', 'CD9', 'cd0', 'se', 'SE', 'ts', 'TS', 'Extended', 'remux', 'mkv', 'avi', 'é',
+    '[tmdb=603]', '{imdb=tt0133093}', '[tmdbid-1]', '{tmdb-2}', '[x]', '[', ']', '[CHD]', '[宾虚_Ben-Hur_1959]',
+    'İ', 'ı', 'ſ', 'K', '\n']
+DELIMITERS = ['', ' ', '.', '_', '-', ',', '(', ')', '[', ']', '. ', '.-.', ', ', ' - ', '..']
+EXTENSIONS = ['', '', '.mkv', '.MKV', '.avi', '.ts', '.x', '.']
+CHARACTERS = ' _,.()[]-{}=12903dlwebreadnfotxsiIkK英'
+
+def make_corpus(seed=34, size=20000):
+    rnd = random.Random(seed)
+    corpus = ['..', '', '.', '.hidden', '...Title', '_.Title', 'The.Matrix.1999.1080p.BluRay.x264.mkv',
+        'The Matrix (1999) [tmdb=603].mkv', '黑客帝国.The.Matrix.1999.BD1080P.国英双语.mkv']
+    for _ in range(size):
+        parts = []
+        for _ in range(rnd.randint(1, 8)):
+            parts.append(rnd.choice(WORDS))
+            parts.append(rnd.choice(DELIMITERS))
+        parts.append(rnd.choice(EXTENSIONS))
+        corpus.append(''.join(parts))
+        corpus.append(''.join(rnd.choice(CHARACTERS) for _ in range(rnd.randint(0, 16))))
+    return corpus
+
+class TestFilenameCleaner(unittest.TestCase):
+    def test_clean_string__release_name(self):
+        actual_output = filename_cleaner.clean_string('The.Matrix.1999.1080p.BluRay.x264.mkv')
+
+        self.assertEqual(('The Matrix', '1999', None), actual_output)
+
+    def test_clean_string__identifier(self):
+        actual_output = filename_cleaner.clean_string('The Matrix (1999) {tmdb=603}.mkv')
+
+        self.assertEqual(('The Matrix', '1999', ('tmdb', '603')), actual_output)
+
+    def test_clean_string__clutter_without_year(self):
+        actual_output = filename_cleaner.clean_string('Ben-Hur.Extended.WEB-DL.mkv')
+
+        self.assertEqual(('Ben-Hur', '', None), actual_output)
+
+    def test_clean_string__unicode_brackets_are_no_identifier(self):
+        actual_output = filename_cleaner.clean_string('[宾虚_Ben-Hur_1959].mkv')
+
+        self.assertEqual(('[宾虚 Ben-Hur', '1959', None), actual_output)
+
+    def test_is_low_confidence(self):
+        self.assertFalse(filename_cleaner.is_low_confidence('The Matrix', '1999'))
+        self.assertFalse(filename_cleaner.is_low_confidence('黑客帝国', '1999'))
+        self.assertTrue(filename_cleaner.is_low_confidence('The Matrix', ''))
+        self.assertTrue(filename_cleaner.is_low_confidence('YX', '2002'))
+        self.assertTrue(filename_cleaner.is_low_confidence('黑客帝国 BD1080P 国英双语', '1999'))
+
+    def test_clean_string__matches_regex_implementation(self):
+        for filename in make_corpus():
+            expected_output = filename_cleaner.clean_string_regex(filename)
+
+            actual_output = filename_cleaner.clean_string(filename)
+
+            self.assertEqual(expected_output, actual_output, repr(filename))
@@ -0,0 +1,194 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import sqlite3
+import unittest
+from unittest import mock
+
+from python.lib import kodi_database
+
+# The part of Kodi's MyVideos schema save_movie writes to
+SCHEMA = '''
+CREATE TABLE path (idPath INTEGER PRIMARY KEY, strPath TEXT, strContent TEXT, strScraper TEXT, strHash TEXT,
+    scanRecursive INTEGER, useFolderNames BOOL, strSettings TEXT, noUpdate BOOL, exclude BOOL, dateAdded TEXT);
+CREATE UNIQUE INDEX ix_path ON path (strPath);
+CREATE TABLE files (idFile INTEGER PRIMARY KEY, idPath INTEGER, strFilename TEXT, dateAdded TEXT);
+CREATE UNIQUE INDEX ix_files ON files (idPath, strFilename);
+CREATE TABLE movie (idMovie INTEGER PRIMARY KEY, idFile INTEGER, c00 TEXT, c01 TEXT, c02 TEXT, c03 TEXT, c04 TEXT,
+    c05 TEXT, c06 TEXT, c07 TEXT, c08 TEXT, c09 TEXT, c10 TEXT, c11 TEXT, c12 TEXT, c13 TEXT, c14 TEXT, c15 TEXT,
+    c16 TEXT, c17 TEXT, c18 TEXT, c19 TEXT, c20 TEXT, c21 TEXT, c22 TEXT, c23 TEXT, idSet INTEGER, premiered TEXT);
+CREATE TABLE videoversion (idFile INTEGER PRIMARY KEY, idMedia INTEGER, media_type TEXT, itemType INTEGER, idType INTEGER);
+CREATE TABLE videoversiontype (id INTEGER PRIMARY KEY, name TEXT, owner INTEGER, itemType INTEGER);
+CREATE TABLE sets (idSet INTEGER PRIMARY KEY, strSet TEXT, strOverview TEXT);
+CREATE TABLE uniqueid (uniqueid_id INTEGER PRIMARY KEY, media_id INTEGER, media_type TEXT, value TEXT, type TEXT);
+CREATE TABLE rating (rating_id INTEGER PRIMARY KEY, media_id INTEGER, media_type TEXT, rating_type TEXT, rating FLOAT, votes INTEGER);
+CREATE TABLE art (art_id INTEGER PRIMARY KEY, media_id INTEGER, media_type TEXT, type TEXT, url TEXT);
+CREATE TABLE actor (actor_id INTEGER PRIMARY KEY, name TEXT, art_urls TEXT);
+CREATE UNIQUE INDEX ix_actor_1 ON actor (name);
+CREATE TABLE actor_link (actor_id INTEGER, media_id INTEGER, media_type TEXT, role TEXT, cast_order INTEGER);
+CREATE UNIQUE INDEX ix_actor_link_1 ON actor_link (actor_id, media_type, media_id);
+CREATE TABLE director_link (actor_id INTEGER, media_id INTEGER, media_type TEXT);
+CREATE UNIQUE INDEX ix_director_link_1 ON director_link (actor_id, media_type, media_id);
+CREATE TABLE writer_link (actor_id INTEGER, media_id INTEGER, media_type TEXT);
+CREATE UNIQUE INDEX ix_writer_link_1 ON writer_link (actor_id, media_type, media_id);
+''' + ''.join('''
+CREATE TABLE {0} ({0}_id INTEGER PRIMARY KEY, name TEXT);
+CREATE UNIQUE INDEX ix_{0}_1 ON {0} (name);
+CREATE TABLE {0}_link ({0}_id INTEGER, media_id INTEGER, media_type TEXT);
+CREATE UNIQUE INDEX ix_{0}_link_1 ON {0}_link ({0}_id, media_type, media_id);
+'''.format(table) for table in ('genre', 'studio', 'country', 'tag'))
+
+def movie_details(title, tmdb_id):
+    return {
+        'info': {'title': title, 'genre': ['剧情', '动作', '剧情'], 'studio': ['光线传媒'], 'country': ['中国大陆'],
+                 'director': ['张艺谋', '张艺谋'], 'credits': ['刘恒']},
+        'cast': [{'name': '巩俐', 'thumbnail': 'a.jpg'}, {'name': '巩俐', 'thumbnail': 'b.jpg', 'order': 1}],
+        'ratings': {'themoviedb': {'rating': 7.5, 'votes': 100, 'default': True}},
+        'uniqueids': {'tmdb': tmdb_id},
+        'available_art': {'poster': ['poster.jpg']},
+    }
+
+class TestKodiDatabase(unittest.TestCase):
+    def make_db(self, **kwargs):
+        db = kodi_database.KodiDatabase(':memory:', **kwargs)
+        db.connect()
+        db.conn.executescript(SCHEMA)
+        self.addCleanup(db.close)
+        return db
+
+    def save(self, db, file_path, details):
+        with db.savepoint():
+            id_path = db.get_or_create_path(file_path.rsplit('/', 1)[0])
+            id_file = db.get_or_create_file(file_path, id_path)
+            return db.save_movie(id_file, details, file_path)
+
+    def count(self, db, table):
+        return db.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    def test_save_movie__links_written_once(self):
+        db = self.make_db()
+
+        id_movie = self.save(db, 'smb://nas/movies/活着.mkv', movie_details('活着', '31439'))
+
+        self.assertEqual(2, self.count(db, 'genre_link'))
+        self.assertEqual(1, self.count(db, 'director_link'))
+        self.assertEqual(1, self.count(db, 'actor_link'))
+        actor_art = db.conn.execute("SELECT url FROM art WHERE media_type='actor'").fetchall()
+        self.assertEqual([('b.jpg',)], [tuple(row) for row in actor_art])
+        self.assertEqual(['poster.jpg'], [row[0] for row in db.conn.execute(
+            "SELECT url FROM art WHERE media_id=? AND media_type='movie'", (id_movie,))])
+
+    def test_commit__after_commit_movies(self):
+        db = self.make_db(commit_movies=2, commit_seconds=3600)
+
+        self.save(db, 'smb://nas/movies/a.mkv', movie_details('A', '1'))
+        self.assertFalse(db.commit())
+        self.assertTrue(db.conn.in_transaction)
+        self.save(db, 'smb://nas/movies/b.mkv', movie_details('B', '2'))
+
+        self.assertTrue(db.commit())
+        self.assertFalse(db.conn.in_transaction)
+        self.assertEqual(0, db.pending_movies)
+
+    def test_commit__after_commit_seconds(self):
+        db = self.make_db(commit_movies=100, commit_seconds=5)
+        self.save(db, 'smb://nas/movies/a.mkv', movie_details('A', '1'))
+
+        self.assertFalse(db.commit())
+        with mock.patch('time.time', return_value=db.last_commit + 6):
+            self.assertTrue(db.commit())
+
+    def test_commit__force(self):
+        db = self.make_db(commit_movies=100, commit_seconds=3600)
+        self.assertFalse(db.commit(force=True))
+        self.save(db, 'smb://nas/movies/a.mkv', movie_details('A', '1'))
+
+        self.assertTrue(db.commit(force=True))
+
+    def test_savepoint__failed_save_keeps_batch(self):
+        db = self.make_db(commit_movies=100, commit_seconds=3600)
+        self.save(db, 'smb://nas/movies/a.mkv', movie_details('A', '1'))
+
+        with self.assertRaises(ValueError):
+            with db.savepoint():
+                db.get_or_create_path('smb://nas/other/')
+                raise ValueError('save failed')
+        db.commit(force=True)
+
+        self.assertEqual(1, self.count(db, 'movie'))
+        paths = [row[0] for row in db.conn.execute('SELECT strPath FROM path')]
+        self.assertIn('smb://nas/movies/', paths)
+        self.assertNotIn('smb://nas/other/', paths)
+
+    def test_name_ids__loaded_once_and_updated_on_insert(self):
+        db = self.make_db()
+        db.conn.execute("INSERT INTO genre (name) VALUES ('剧情')")
+
+        self.assertEqual(1, db._get_or_create_name_id('genre', '剧情'))
+        id_action = db._get_or_create_name_id('genre', '动作')
+
+        self.assertEqual({'剧情': 1, '动作': id_action}, db.name_ids['genre'])
+        self.assertEqual(id_action, db._get_or_create_name_id('genre', '动作'))
+        self.assertEqual(2, self.count(db, 'genre'))
+
+    def test_name_ids__rollback_evicts_inserted_names(self):
+        db = self.make_db()
+        db._get_or_create_name_id('genre', '剧情')
+
+        with self.assertRaises(ValueError):
+            with db.savepoint():
+                db._get_or_create_name_id('genre', '动作')
+                raise ValueError('save failed')
+
+        self.assertEqual(['剧情'], list(db.name_ids['genre']))
+        db._get_or_create_name_id('genre', '动作')
+        self.assertEqual(2, self.count(db, 'genre'))
+
+    def test_name_ids__name_added_by_kodi(self):
+        db = self.make_db()
+        db._name_ids('actor')
+        db.conn.execute("INSERT INTO actor (name) VALUES ('巩俐')")
+
+        self.assertEqual(1, db._get_or_create_name_id('actor', '巩俐'))
+        self.assertEqual(1, self.count(db, 'actor'))
+
+    def test_name_ids__cleared_when_commit_fails(self):
+        db = self.make_db()
+        db._get_or_create_name_id('genre', '剧情')
+        db.conn.close()
+        db.conn = mock.Mock(in_transaction=True, commit=mock.Mock(side_effect=sqlite3.OperationalError('disk I/O error')))
+        db.pending_movies = db.commit_movies
+
+        self.assertFalse(db.commit())
+        self.assertEqual({}, db.name_ids)
+        db.conn = None
+
+    def add_movie(self, db, str_path, filename):
+        cur = db.conn.cursor()
+        cur.execute('INSERT OR IGNORE INTO path (strPath) VALUES (?)', (str_path,))
+        id_path = cur.execute('SELECT idPath FROM path WHERE strPath=?', (str_path,)).fetchone()[0]
+        cur.execute('INSERT INTO files (idPath, strFilename) VALUES (?, ?)', (id_path, filename))
+        cur.execute('INSERT INTO movie (idFile) VALUES (?)', (cur.lastrowid,))
+
+    def test_iter_movie_files__roots(self):
+        db = self.make_db()
+        self.add_movie(db, 'smb://nas/movies/', '活着.mkv')
+        self.add_movie(db, 'smb://nas/movies/华语/', '英雄.mkv')
+        self.add_movie(db, 'smb://nas/movies2/', '无间道.mkv')
+        self.add_movie(db, 'smb://nas/movies0/', '功夫.mkv')
+        self.add_movie(db, 'smb://nas/tv/', '大话西游.mkv')
+        self.add_movie(db, 'D:\\movies\\', '霸王别姬.mkv')
+
+        actual_output = sorted(db.iter_movie_files(['smb://nas/movies/', 'D:/movies/']))
+
+        self.assertEqual(['D:\\movies\\霸王别姬.mkv', 'smb://nas/movies/华语/英雄.mkv', 'smb://nas/movies/活着.mkv'],
+                         actual_output)
+        self.assertEqual(6, len(list(db.iter_movie_files())))
+
+    def test_iter_movie_files__stacks_and_archives(self):
+        db = self.make_db()
+        stack = 'stack://smb://nas/movies/红高粱/cd1.avi , smb://nas/movies/红高粱/cd2.avi'
+        self.add_movie(db, 'smb://nas/movies/红高粱/', stack)
+        self.add_movie(db, 'smb://nas/movies/', 'rar://smb%3a%2f%2fnas%2fmovies%2f秋菊打官司.rar/秋菊打官司.mkv')
+
+        actual_output = sorted(db.iter_movie_files(['smb://nas/movies/']))
+
+        self.assertEqual(['rar://smb%3a%2f%2fnas%2fmovies%2f秋菊打官司.rar/秋菊打官司.mkv', stack], actual_output)
@@ -0,0 +1,47 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import time
+import unittest
+
+from python.lib import cache_store
+from python.lib import listing_cache
+
+PATH = 'dav://nas/movies/Hero/'
+
+class TestListingCache(unittest.TestCase):
+    def setUp(self):
+        self.store = cache_store.CacheStore(':memory:')
+        self.addCleanup(self.store.close)
+        self.cache = listing_cache.ListingCache(self.store)
+
+    def age(self, seconds):
+        entry = self.store.get(listing_cache.listing_key(PATH))
+        entry['checked'] -= seconds
+        self.store.set(listing_cache.listing_key(PATH), entry, 60)
+
+    def test_is_remote(self):
+        self.assertTrue(listing_cache.is_remote('dav://nas/movies/'))
+        self.assertTrue(listing_cache.is_remote('smb://nas/movies/'))
+        self.assertFalse(listing_cache.is_remote('/storage/movies/'))
+        self.assertFalse(listing_cache.is_remote('special://profile/'))
+
+    def test_get__trusted_without_stat(self):
+        self.cache.put(PATH, ['extras'], ['Hero.mkv'], 1000)
+
+        actual_output = self.cache.get(PATH, 3600, get_mtime=lambda: self.fail('stat not needed'))
+
+        self.assertEqual((['extras'], ['Hero.mkv']), actual_output)
+
+    def test_get__revalidated_by_mtime(self):
+        self.cache.put(PATH, [], ['Hero.mkv'], 1000)
+        self.age(7200)
+
+        self.assertEqual(([], ['Hero.mkv']), self.cache.get(PATH, 3600, get_mtime=lambda: 1000))
+        self.assertLess(time.time() - self.store.get(listing_cache.listing_key(PATH))['checked'], 60)
+        self.age(7200)
+        self.assertIsNone(self.cache.get(PATH, 3600, get_mtime=lambda: 2000))
+
+    def test_get__no_mtime_relisted(self):
+        self.cache.put(PATH, [], ['Hero.mkv'], None)
+
+        self.assertIsNone(self.cache.get(PATH, 0, get_mtime=lambda: 1000))
+        self.assertIsNone(self.cache.get('dav://nas/movies/Other/'))
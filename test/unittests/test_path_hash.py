@@ -0,0 +1,33 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import hashlib
+import struct
+import unittest
+
+from python.lib import path_hash
+
+class TestPathHash(unittest.TestCase):
+    def test_fast_hash(self):
+        excludes = '-trailer|[!-._ \\\\/]sample[-._ ]|[\\/](proof|subs)[\\/]|[\\/]extrathumbs[\\/]' \
+            '|[\\/]extrafanart[\\/]|[\\/]\\.\\@__thumb[\\/]'
+        expected_output = hashlib.md5(excludes.encode('utf-8') + struct.pack('<q', 1700000000)).hexdigest()
+
+        actual_output = path_hash.fast_hash(1700000000)
+
+        self.assertEqual(expected_output, actual_output)
+
+    def test_fast_hash__without_excludes(self):
+        actual_output = path_hash.fast_hash(1700000000.9, excludes=())
+
+        self.assertEqual(hashlib.md5(struct.pack('<q', 1700000000)).hexdigest(), actual_output)
+
+    def test_fast_hash__no_mtime(self):
+        self.assertEqual('', path_hash.fast_hash(0))
+        self.assertEqual('', path_hash.fast_hash(None))
+
+    def test_is_unchanged(self):
+        current_hash = path_hash.fast_hash(1700000000)
+
+        self.assertTrue(path_hash.is_unchanged(current_hash.upper(), current_hash))
+        self.assertFalse(path_hash.is_unchanged(path_hash.fast_hash(1700000001), current_hash))
+        self.assertFalse(path_hash.is_unchanged('', ''))
+        self.assertFalse(path_hash.is_unchanged(None, current_hash))
@@ -0,0 +1,101 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import itertools
+import unittest
+from unittest import mock
+
+from python.lib.tmdbscraper_direct import pinyin
+
+CHAR_MAP = {
+    '长': ['zhang', 'chang'],
+    '城': ['cheng'],
+    '行': ['xing', 'hang', 'heng'],
+    '乐': ['le', 'yue'],
+    '重': ['zhong', 'chong', 'tong'],
+    '音': ['yin'],
+}
+
+class TestPinyin(unittest.TestCase):
+    def setUp(self):
+        pinyin._set_table(pinyin.compile_char_map(CHAR_MAP))
+        self.addCleanup(pinyin._set_table, None)
+
+    def test_get_pinyin_permutations__most_frequent_reading_first(self):
+        actual_output = pinyin.get_pinyin_permutations('行长')
+
+        self.assertEqual('XZ|XC|HZ|HC', actual_output)
+
+    def test_get_pinyin_permutations__phrase_reading_promoted(self):
+        actual_output = pinyin.get_pinyin_permutations('长城')
+
+        self.assertTrue(actual_output.startswith('CC|'))
+
+    def test_get_pinyin_permutations__keeps_latin_and_digits(self):
+        actual_output = pinyin.get_pinyin_permutations('音乐2 ab')
+
+        self.assertEqual('YY2AB', actual_output.split('|')[0])
+
+    def test_get_pinyin_permutations__empty(self):
+        self.assertEqual('', pinyin.get_pinyin_permutations(''))
+        self.assertEqual('', pinyin.get_pinyin_permutations(' - '))
+
+    def test_iter_pinyin_initials__bounded(self):
+        text = '重行' * 10
+
+        actual_output = list(pinyin.iter_pinyin_initials(text, limit=5))
+
+        self.assertEqual(5, len(actual_output))
+        self.assertEqual(5, len(set(actual_output)))
+        self.assertEqual('ZX' * 10, actual_output[0])
+
+    def test_iter_pinyin_initials__cpu_budget(self):
+        actual_output = list(pinyin.iter_pinyin_initials('重行' * 10, limit=1000, cpu_budget=0))
+
+        self.assertEqual(['ZX' * 10], actual_output)
+
+    def test_iter_pinyin_initials__lazy(self):
+        variants = pinyin.iter_pinyin_initials('重行' * 200, limit=10 ** 9, cpu_budget=60)
+
+        self.assertEqual('ZX' * 200, next(variants))
+
+    def test_compile_char_map__primary_initial_first(self):
+        table = pinyin.compile_char_map({'重': ['zhong', 'chong', 'tong'], '0': '0'})
+        pinyin._set_table(table)
+
+        self.assertEqual(['Z', 'C', 'T'], pinyin._char_initials('重'))
+        self.assertEqual(['0'], pinyin._char_initials('0'))
+        self.assertEqual(pinyin.TABLE_HEADER.size + pinyin.TABLE_RECORD.size, len(table))
+
+    def test_compile_char_map__keeps_frequency_order(self):
+        pinyin._set_table(pinyin.compile_char_map({'提': ['ti', 'di', 'chi', 'shi', 'ti']}))
+
+        self.assertEqual(['T', 'D', 'C', 'S'], pinyin._char_initials('提'))
+
+    def test_set_table__rejects_invalid_buffer(self):
+        with self.assertRaises(ValueError):
+            pinyin._set_table(b'JUNK' + bytes(8))
+
+    def test_get_pinyin_permutations__memoized(self):
+        pinyin.get_pinyin_permutations('长城')
+        hits = pinyin._joined_permutations.cache_info().hits
+
+        pinyin.get_pinyin_permutations('长城')
+
+        self.assertEqual(hits + 1, pinyin._joined_permutations.cache_info().hits)
+
+    def test_get_pinyin_permutations__cut_off_not_memoized(self):
+        clock = itertools.count(step=1.0)
+        with mock.patch.object(pinyin.time, 'thread_time', side_effect=lambda: next(clock)):
+            cut_off = pinyin.get_pinyin_permutations('行长')
+
+        self.assertEqual('XZ', cut_off)
+        self.assertEqual('XZ|XC|HZ|HC', pinyin.get_pinyin_permutations('行长'))
+        self.assertEqual('XZ|XC|HZ|HC', pinyin.get_pinyin_permutations('行长'))
+        self.assertEqual(1, pinyin._joined_permutations.cache_info().hits)
+
+    def test_iter_pinyin_initials__cut_off_reported(self):
+        cut_offs = []
+
+        list(pinyin.iter_pinyin_initials('重行', cpu_budget=0, on_cutoff=lambda: cut_offs.append(1)))
+        list(pinyin.iter_pinyin_initials('城', cpu_budget=0, on_cutoff=lambda: cut_offs.append(2)))
+
+        self.assertEqual([1], cut_offs)
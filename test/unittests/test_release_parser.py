@@ -0,0 +1,73 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+
+from python.lib import release_parser
+
+class TestReleaseParser(unittest.TestCase):
+    def test_parse__chinese_and_english_title(self):
+        actual_output = release_parser.parse('【字幕组】黑客帝国.The.Matrix.1999.BD1080P.国英双语.中字.mkv')
+
+        self.assertEqual('黑客帝国', actual_output['title'])
+        self.assertEqual('The Matrix', actual_output['english_title'])
+        self.assertEqual('1999', actual_output['year'])
+        self.assertTrue(release_parser.is_confident(actual_output))
+
+    def test_parse__site_prefix(self):
+        actual_output = release_parser.parse('阳光电影www.ygdy8.com.流浪地球.2019.HD1080P.国语中字.mkv')
+
+        self.assertEqual(('流浪地球', '2019'), (actual_output['title'], actual_output['year']))
+
+    def test_parse__site_in_brackets_without_year(self):
+        actual_output = release_parser.parse('[电影天堂www.dy2018.com]让子弹飞BD国语中字.mkv')
+
+        self.assertEqual(('让子弹飞', None), (actual_output['title'], actual_output['year']))
+        self.assertTrue(release_parser.is_confident(actual_output))
+
+    def test_parse__markers_glued_to_title(self):
+        actual_output = release_parser.parse('英雄国语中字.mkv')
+
+        self.assertEqual('英雄', actual_output['title'])
+
+    def test_parse__book_title(self):
+        actual_output = release_parser.parse('《英雄》2002.BD1080P.国语中字.mkv')
+
+        self.assertEqual(('英雄', '2002'), (actual_output['title'], actual_output['year']))
+
+    def test_parse__title_in_second_leading_bracket(self):
+        actual_output = release_parser.parse('[YYeTs人人影视][复仇者联盟4：终局之战].Avengers.Endgame.2019.BD1080P.mp4')
+
+        self.assertEqual('复仇者联盟4：终局之战', actual_output['title'])
+        self.assertEqual('Avengers Endgame', actual_output['english_title'])
+
+    def test_parse__group_tag_before_bracketed_segments(self):
+        actual_output = release_parser.parse('【悠哈璃羽字幕社】[天气之子][Weathering with You][2019][1080P].mkv')
+
+        self.assertEqual({'title': '天气之子', 'english_title': 'Weathering with You', 'year': '2019',
+            'confidence': 1.0}, actual_output)
+
+    def test_parse__numeric_title(self):
+        actual_output = release_parser.parse('1917.2019.1080p.BluRay.x264.mkv')
+
+        self.assertEqual(('1917', '2019'), (actual_output['title'], actual_output['year']))
+
+    def test_parse__year_like_number_after_chinese_title(self):
+        actual_output = release_parser.parse('2001太空漫游.2001.A.Space.Odyssey.1968.BluRay.1080p.mkv')
+
+        self.assertEqual({'title': '2001太空漫游', 'english_title': '2001 A Space Odyssey', 'year': '1968',
+            'confidence': 1.0}, actual_output)
+
+    def test_parse__year_given_twice(self):
+        actual_output = release_parser.parse('霸王别姬.1993.Farewell.My.Concubine.1993.mkv')
+
+        self.assertEqual(('霸王别姬', 'Farewell My Concubine', '1993'),
+            (actual_output['title'], actual_output['english_title'], actual_output['year']))
+
+    def test_parse__sequel_number_kept(self):
+        actual_output = release_parser.parse('叶问.4.Ip.Man.4.2019.mkv')
+
+        self.assertEqual(('叶问 4', 'Ip Man 4'), (actual_output['title'], actual_output['english_title']))
+
+    def test_parse__low_confidence(self):
+        self.assertFalse(release_parser.is_confident(release_parser.parse('yx.2002.mkv')))
+        self.assertFalse(release_parser.is_confident(release_parser.parse('dahua.xiyou.mkv')))
+        self.assertFalse(release_parser.is_confident(release_parser.parse('中字.mkv')))
@@ -0,0 +1,83 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import os
+import shutil
+import tempfile
+import unittest
+
+from python.lib import scan_journal
+
+ROOT = 'dav://nas/movies/'
+
+class TestScanJournal(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.db_path = os.path.join(directory, 'scan_journal.db')
+
+    def open(self):
+        journal = scan_journal.ScanJournal(self.db_path)
+        self.addCleanup(journal.close)
+        return journal
+
+    def cancelled_run(self):
+        journal = self.open()
+        self.assertFalse(journal.start([ROOT]))
+        journal.add_dirs([(ROOT, 1.0)])
+        journal.directory_done(ROOT, [(ROOT + 'A/', 0.5), (ROOT + 'B/', 0.5)])
+        journal.directory_done(ROOT + 'A/', [], [ROOT + 'A/a.mkv', ROOT + 'A/b.mkv', ROOT + 'A/c.mkv'])
+        journal.file_done(ROOT + 'A/a.mkv', True)
+        journal.file_done(ROOT + 'A/b.mkv', False, ['搜索(传统): b (None)'])
+        journal.close()
+
+    def test_start__resumes_unfinished_run(self):
+        self.cancelled_run()
+        journal = self.open()
+
+        self.assertTrue(journal.start([ROOT]))
+        self.assertEqual([(ROOT + 'A/', 0.5), (ROOT + 'B/', 0.5)], sorted(journal.frontier(ROOT)))
+        self.assertTrue(journal.is_finished_file(ROOT + 'A/a.mkv'))
+        self.assertTrue(journal.is_finished_file(ROOT + 'A/b.mkv'))
+        self.assertFalse(journal.is_finished_file(ROOT + 'A/c.mkv'))
+        self.assertTrue(journal.is_known_dir(ROOT + 'B/'))
+        self.assertEqual([ROOT + 'A/b.mkv'], journal.failed_files())
+        # the directory keeps its old hash, b.mkv is not retried
+        self.assertTrue(journal.is_failed_file(ROOT + 'A/b.mkv'))
+        self.assertFalse(journal.is_failed_file(ROOT + 'A/a.mkv'))
+        self.assertFalse(journal.is_failed_file(ROOT + 'A/c.mkv'))
+        self.assertEqual(['搜索(传统): b (None)'], journal.history(ROOT + 'A/b.mkv'))
+
+    def test_start__finished_run_starts_over(self):
+        self.cancelled_run()
+        journal = self.open()
+        journal.start([ROOT])
+        journal.finish()
+
+        self.assertFalse(journal.start([ROOT]))
+        self.assertFalse(journal.is_known_dir(ROOT))
+        self.assertFalse(journal.is_finished_file(ROOT + 'A/a.mkv'))
+
+    def test_start__other_roots_or_refresh_start_over(self):
+        self.cancelled_run()
+        journal = self.open()
+
+        self.assertFalse(journal.start([ROOT, 'smb://nas/films/']))
+        self.cancelled_run()
+        self.assertFalse(self.open().start([ROOT], resume=False))
+
+    def test_files_done__one_write(self):
+        journal = self.open()
+        journal.start([ROOT])
+        journal.directory_done(ROOT, [], [ROOT + 'a.mkv', ROOT + 'b.mkv'])
+        writes = []
+        write = journal._write
+        journal._write = lambda statements: writes.append(statements) or write(statements)
+
+        journal.files_done([(ROOT + 'a.mkv', True, None), (ROOT + 'b.mkv', False, ['搜索(传统): b (None)'])])
+        journal.files_done([])
+        journal.close()
+
+        self.assertEqual(1, len(writes))
+        journal = self.open()
+        self.assertTrue(journal.start([ROOT]))
+        self.assertEqual([ROOT + 'b.mkv'], journal.failed_files())
+        self.assertTrue(journal.is_finished_file(ROOT + 'a.mkv'))
@@ -0,0 +1,83 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import threading
+import time
+import unittest
+
+from python.lib import scan_pipeline
+
+def fail_item(item, error):
+    return ('failed', item)
+
+class TestScanPipeline(unittest.TestCase):
+    def make_pipeline(self, stages, **kwargs):
+        pipeline = scan_pipeline.Pipeline(stages, fail_item, **kwargs).start()
+        self.addCleanup(pipeline.stop, True)
+        return pipeline
+
+    def collect(self, pipeline, count):
+        results = []
+        while len(results) < count:
+            item = pipeline.get(timeout=2)
+            self.assertIsNotNone(item)
+            results.append(item)
+        return results
+
+    def test_pipeline__items_pass_all_stages(self):
+        pipeline = self.make_pipeline([
+            scan_pipeline.Stage('double', lambda x: x * 2, workers=2),
+            scan_pipeline.Stage('increment', lambda x: x + 1, workers=3),
+        ])
+
+        for i in range(20):
+            self.assertTrue(pipeline.put(i))
+        actual_output = sorted(self.collect(pipeline, 20))
+
+        self.assertEqual([i * 2 + 1 for i in range(20)], actual_output)
+        self.assertEqual(0, pipeline.in_flight)
+        self.assertEqual([20, 20], [stats['processed'] for _, stats in pipeline.stats()])
+
+    def test_pipeline__error_skips_remaining_stages(self):
+        def check(x):
+            if x == 3:
+                raise ValueError('bad item')
+            return x
+        pipeline = self.make_pipeline([
+            scan_pipeline.Stage('check', check),
+            scan_pipeline.Stage('increment', lambda x: x + 1),
+        ])
+
+        for i in range(5):
+            pipeline.put(i)
+        actual_output = self.collect(pipeline, 5)
+
+        self.assertIn(('failed', 3), actual_output)
+        self.assertEqual([1, 2, 3, 5], sorted(x for x in actual_output if not isinstance(x, tuple)))
+
+    def test_pipeline__backpressure(self):
+        release = threading.Event()
+        pipeline = self.make_pipeline([
+            scan_pipeline.Stage('slow', lambda x: release.wait() and x, workers=1, queue_size=2),
+        ], output_size=1)
+        put = []
+        feeder = threading.Thread(target=lambda: [put.append(pipeline.put(i)) for i in range(10)], daemon=True)
+
+        feeder.start()
+        time.sleep(0.3)
+        pipeline.sample()
+
+        # one item in the handler and two queued, the feeder waits
+        self.assertEqual(3, len(put))
+        self.assertEqual(2, pipeline.stats()[0][1]['queue_max'])
+        release.set()
+        self.assertEqual(list(range(10)), sorted(self.collect(pipeline, 10)))
+
+    def test_pipeline__stop_unblocks_put(self):
+        pipeline = self.make_pipeline([
+            scan_pipeline.Stage('stuck', lambda x: time.sleep(5), workers=1, queue_size=1),
+        ])
+        pipeline.put(1)
+        pipeline.put(2)
+
+        threading.Timer(0.3, pipeline.stop).start()
+
+        self.assertFalse(pipeline.put(3))
@@ -0,0 +1,77 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+
+from python.lib import cache_store
+from python.lib import search_cache
+
+class TestSearchCache(unittest.TestCase):
+    def setUp(self):
+        self.store = cache_store.CacheStore(':memory:')
+        self.addCleanup(self.store.close)
+        self.cache = search_cache.SearchCache(self.store)
+
+    def test_cache_key__normalized(self):
+        decomposed = 'Amélie, The '
+
+        actual_output = search_cache.cache_key(decomposed, '2001', 'zh-CN')
+
+        self.assertEqual('amélie|2001|zh-CN', actual_output)
+
+    def test_cache_key__no_year(self):
+        self.assertEqual('matrix||', search_cache.cache_key('Matrix', None, None))
+
+    def test_get__ranked_entries(self):
+        results = [{'id': 603, 'title': 'The Matrix', 'release_date': '1999-03-30', 'popularity': 80.1,
+            'overview': 'not kept'}, {'id': 604, 'title': 'The Matrix Reloaded'}]
+        self.cache.put('The Matrix', '1999', 'en', results)
+
+        actual_output = self.cache.get('the matrix', '1999', 'en')
+
+        self.assertEqual([603, 604], [item['id'] for item in actual_output])
+        self.assertEqual('The Matrix', actual_output[0]['title'])
+        self.assertNotIn('overview', actual_output[0])
+
+    def test_get__not_cached(self):
+        self.cache.put('The Matrix', '1999', 'en', [{'id': 603, 'title': 'The Matrix'}])
+
+        self.assertIsNone(self.cache.get('The Matrix', '1999', 'zh-CN'))
+        self.assertIsNone(self.cache.get('The Matrix', '2000', 'en'))
+
+    def test_put__empty_result_cached(self):
+        self.cache.put('Unknown', None, 'en', [])
+
+        self.assertEqual([], self.cache.get('Unknown', None, 'en'))
+
+    def test_put__error_not_cached(self):
+        self.cache.put('The Matrix', None, 'en', {'error': 'timeout'})
+
+        self.assertIsNone(self.cache.get('The Matrix', None, 'en'))
+
+    def test_get__expired(self):
+        cache = search_cache.SearchCache(self.store, ttl=-1)
+        cache.put('The Matrix', None, 'en', [{'id': 603, 'title': 'The Matrix'}])
+
+        self.assertIsNone(cache.get('The Matrix', None, 'en'))
+        self.assertEqual(0, self.store.purge_expired())
+
+    def test_put__raw_poster_path_kept(self):
+        results = [{'id': 603, 'title': 'The Matrix', 'poster_path': 'https://proxy/?url=https://image.tmdb.org/w780/matrix.jpg'}]
+        self.cache.put('The Matrix', '1999', 'en', results, 'https://proxy/?url=https://image.tmdb.org/w780')
+
+        actual_output = self.cache.get('The Matrix', '1999', 'en', 'https://image.tmdb.org/w780')
+
+        self.assertEqual('https://image.tmdb.org/w780/matrix.jpg', actual_output[0]['poster_path'])
+
+    def test_cache_key__year_fanout(self):
+        self.cache.put('The Matrix', '1999', 'en', [{'id': 603}], year_fanout=True)
+
+        self.assertEqual('the matrix|1999|en|fanout', search_cache.cache_key('The Matrix', '1999', 'en', True))
+        self.assertIsNone(self.cache.get('The Matrix', '1999', 'en'))
+        self.assertEqual([603], [item['id'] for item in self.cache.get('The Matrix', '1999', 'en', year_fanout=True)])
+
+    def test_cache_key__include_adult(self):
+        self.cache.put('The Matrix', '1999', 'en', [{'id': 603}], include_adult=True)
+
+        self.assertEqual('the matrix|1999|en|fanout|adult', search_cache.cache_key('The Matrix', '1999', 'en', True, True))
+        self.assertIsNone(self.cache.get('The Matrix', '1999', 'en'))
+        self.assertEqual([603], [item['id'] for item in self.cache.get('The Matrix', '1999', 'en', include_adult=True)])
@@ -0,0 +1,72 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+
+from python.lib.tmdbscraper_direct import title_index
+
+MOVIES = [
+    {'id': 11, 'title': '星球大战', 'original_title': 'Star Wars', 'year': 1977, 'popularity': 80.5},
+    {'id': 1891, 'title': '星球大战5：帝国反击战', 'original_title': 'The Empire Strikes Back', 'year': 1980, 'popularity': 40},
+    {'id': 603, 'title': '黑客帝国', 'original_title': 'The Matrix', 'year': 1999, 'popularity': 70},
+    {'id': 9700, 'title': '英雄', 'original_title': '英雄', 'year': 2002, 'popularity': 20},
+    {'id': 500, 'title': '英雄', 'original_title': 'Hero', 'year': 1992, 'popularity': 15},
+    {'id': 77, 'title': '', 'original_title': 'Memento', 'year': 0, 'popularity': 30},
+]
+
+class TestTitleIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = title_index.TitleIndex(title_index.build_index(MOVIES))
+
+    def test_normalize_title(self):
+        self.assertEqual('the matrix reloaded', title_index.normalize_title('  The.Matrix_Reloaded!'))
+        self.assertEqual('星球大战5 帝国反击战', title_index.normalize_title('星球大战５：帝国反击战'))
+
+    def test_movie(self):
+        actual_output = self.index.movie(0)
+
+        self.assertEqual({'id': 11, 'title': '星球大战', 'original_title': 'Star Wars', 'year': 1977,
+            'popularity': 80.5}, actual_output)
+
+    def test_find_exact__title_and_original_title(self):
+        self.assertEqual([2], self.index.find_exact('黑客帝国'))
+        self.assertEqual([2], self.index.find_exact('the matrix'))
+        self.assertEqual([], self.index.find_exact('the'))
+
+    def test_find_prefix(self):
+        actual_output = self.index.find_prefix('星球大战')
+
+        self.assertEqual({0, 1}, set(actual_output))
+
+    def test_find_similar(self):
+        actual_output = self.index.find_similar('Star War')
+
+        self.assertEqual(0, actual_output[0][1])
+
+    def test_search__exact_first(self):
+        actual_output = self.index.search('星球大战', '1977')
+
+        self.assertEqual([11, 1891], [movie['id'] for movie in actual_output][:2])
+        self.assertEqual('1977', actual_output[0]['release_date'])
+
+    def test_resolve__year_disambiguates(self):
+        self.assertEqual(9700, self.index.resolve('英雄', 2002)['id'])
+        self.assertEqual(500, self.index.resolve('英雄', '1993')['id'])
+
+    def test_resolve__ambiguous(self):
+        self.assertIsNone(self.index.resolve('英雄'))
+        self.assertIsNone(self.index.resolve('英雄', 2010))
+
+    def test_resolve__unknown_year(self):
+        actual_output = self.index.resolve('Memento')
+
+        self.assertEqual(77, actual_output['id'])
+        self.assertEqual('Memento', actual_output['title'])
+
+    def test_resolve__unknown_year_does_not_match_year(self):
+        self.assertIsNone(self.index.resolve('Memento', 2000))
+
+    def test_resolve__not_found(self):
+        self.assertIsNone(self.index.resolve('Inception', 2010))
+
+    def test_title_index__rejects_invalid_buffer(self):
+        with self.assertRaises(ValueError):
+            title_index.TitleIndex(b'JUNK' + bytes(title_index.HEADER.size))
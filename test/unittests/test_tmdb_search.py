@@ -0,0 +1,174 @@
+# pylint: disable=invalid-name,protected-access,too-many-lines
+import unittest
+from unittest import mock
+
+from python.lib.tmdbscraper import tmdb
+from python.lib.tmdbscraper_direct import tmdb as tmdb_direct
+
+
+def search_response(*ids, total_pages=1):
+    return {'results': [{'id': movie_id, 'title': 'movie {}'.format(movie_id)} for movie_id in ids],
+            'total_pages': total_pages}
+
+def movie(movie_id, title, release_date='', popularity=1):
+    return {'id': movie_id, 'title': title, 'release_date': release_date, 'popularity': popularity}
+
+
+class TestSpeculativePage2(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(tmdb._SPECULATIVE_STATS, {'hit': 0, 'waste': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scraper = tmdb.TMDBMovieScraper(None, 'zh-CN', 'CN')
+
+    def test_speculate_page2__no_year(self):
+        self.assertTrue(tmdb._speculate_page2('the matrix', None))
+
+    def test_speculate_page2__short_title(self):
+        self.assertTrue(tmdb._speculate_page2('英雄', '2002'))
+        self.assertTrue(tmdb._speculate_page2('hero', '2002'))
+
+    def test_speculate_page2__long_title_with_year(self):
+        self.assertFalse(tmdb._speculate_page2('the matrix', '1999'))
+
+    def test_speculative_page_stats__hits_and_waste(self):
+        tmdb._record_speculative_page(True)
+        tmdb._record_speculative_page(False)
+        tmdb._record_speculative_page(False)
+        tmdb._record_speculative_page(True)
+
+        self.assertEqual({'hit': 2, 'waste': 2, 'ratio': 0.5}, tmdb.get_speculative_page_stats())
+
+    def test_speculative_page_stats__none(self):
+        self.assertEqual({'hit': 0, 'waste': 0, 'ratio': 0.0}, tmdb.get_speculative_page_stats())
+
+    @mock.patch.object(tmdb.tmdbapi, 'search_movie_request', lambda **kwargs: kwargs)
+    def test_search_first_pages__both_pages(self):
+        page1, page2 = search_response(1, total_pages=2), search_response(2, total_pages=2)
+        with mock.patch.object(tmdb.api_utils, 'load_info_from_service', return_value=[{'json': page1}, {'json': page2}]):
+            self.assertEqual((page1, page2), self.scraper._search_first_pages('英雄', None))
+
+    @mock.patch.object(tmdb.tmdbapi, 'search_movie_request', lambda **kwargs: kwargs)
+    def test_search_first_pages__short_batch_falls_back_to_page1(self):
+        page1 = search_response(1)
+        with mock.patch.object(tmdb.api_utils, 'load_info_from_service', return_value=[{'json': page1}]), \
+                mock.patch.object(tmdb.tmdbapi, 'search_movie', return_value=page1) as search_movie:
+            self.assertEqual((page1, None), self.scraper._search_first_pages('英雄', None))
+        search_movie.assert_called_once_with(query='英雄', year=None, language='zh-CN', settings=None, include_adult=False)
+
+    @mock.patch.object(tmdb.tmdbapi, 'search_movie_request', lambda **kwargs: kwargs)
+    def test_search_first_pages__service_error(self):
+        error = {'error': 'Service communication failed'}
+        with mock.patch.object(tmdb.api_utils, 'load_info_from_service', return_value=error):
+            self.assertEqual((error, None), self.scraper._search_first_pages('英雄', None))
+
+
+class YearWindowTests(object):
+    """Shared by the scraper and the scan's direct scraper, `module` is their tmdb module"""
+    module = None
+
+    def setUp(self):
+        self.scraper = self.module.TMDBMovieScraper(None, 'zh-CN', 'CN')
+        patcher = mock.patch.object(self.module.TMDBMovieScraper, 'image_preview_prefix', return_value='')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search_window(self, responses):
+        """search_year_window('英雄', '2002') with `responses` by year, returns the result and the years searched"""
+        raise NotImplementedError
+
+    def test_year_window__order(self):
+        self.assertEqual(['2002', '2001', '2003', None], self.module._year_window('2002'))
+
+    def test_merge_year_window__year_result_first(self):
+        responses = [{'results': [movie(2, 'other', '2002'), movie(1, '英雄', '2002-12-19')]},
+                     {'results': [movie(3, '英雄', '2001')]},
+                     {'results': [movie(4, '英雄', '2003')]},
+                     {'results': [movie(5, '英雄', '1992', popularity=50)]}]
+
+        actual_output = self.module._merge_year_window('英雄', ['2002', '2001', '2003', None], responses)
+
+        self.assertEqual([1, 2, 3, 4, 5], [item['id'] for item in actual_output])
+
+    def test_merge_year_window__duplicates_kept_for_preferred_year(self):
+        responses = [{'results': [movie(1, '英雄', '2002')]},
+                     {'results': [movie(2, '英雄', '2001'), movie(1, '英雄', '2002')]},
+                     {'results': []},
+                     {'results': [movie(2, '英雄', '2001'), movie(1, '英雄', '2002'), movie(3, '英雄', '1992')]}]
+
+        actual_output = self.module._merge_year_window('英雄', ['2002', '2001', '2003', None], responses)
+
+        self.assertEqual([1, 2, 3], [item['id'] for item in actual_output])
+
+    def test_merge_year_window__error_response_skipped(self):
+        responses = [{'error': 'timeout'}, {'results': [movie(3, '英雄', '2001')]}]
+
+        actual_output = self.module._merge_year_window('英雄', ['2002', '2001'], responses)
+
+        self.assertEqual([3], [item['id'] for item in actual_output])
+
+    def test_merge_year_window__only_errors(self):
+        responses = [{'error': 'timeout'}, {'error': 'refused'}, {'results': []}]
+
+        actual_output = self.module._merge_year_window('英雄', ['2002', '2001', '2003'], responses)
+
+        self.assertEqual({'error': 'timeout'}, actual_output)
+
+    def test_merge_year_window__missing_year_response(self):
+        responses = [{'results': [movie(1, '英雄', '2002')]}, {}]
+
+        actual_output = self.module._merge_year_window('英雄', ['2002', '2001', '2003', None], responses)
+
+        self.assertEqual([1], [item['id'] for item in actual_output])
+
+    def test_search_year_window__merged(self):
+        responses = {'2002': {'results': [movie(1, '英雄', '2002')]}, '2001': {'results': [movie(2, '英雄', '2001')]},
+                     '2003': {'results': []}, None: {'results': [movie(2, '英雄', '2001'), movie(3, '英雄', '1992')]}}
+
+        actual_output, years = self.search_window(responses)
+
+        self.assertEqual([1, 2, 3], [item['id'] for item in actual_output])
+        self.assertEqual(['2002', '2001', '2003', None], years)
+
+    def test_search_year_window__all_failed(self):
+        responses = dict.fromkeys(['2002', '2001', '2003', None], {'error': 'timeout'})
+
+        actual_output, _ = self.search_window(responses)
+
+        self.assertEqual({'error': 'timeout'}, actual_output)
+
+
+class TestYearWindow(YearWindowTests, unittest.TestCase):
+    module = tmdb
+
+    def search_window(self, responses):
+        years = []
+        def request(**kwargs):
+            years.append(kwargs['year'])
+            return kwargs
+        def load_info(url, batch_payload):
+            return [response if 'error' in response else {'json': response}
+                    for response in (responses[request['year']] for request in batch_payload)]
+        with mock.patch.object(tmdb.tmdbapi, 'search_movie_request', request), \
+                mock.patch.object(tmdb.api_utils, 'load_info_from_service', load_info):
+            return self.scraper.search_year_window('英雄', '2002'), years
+
+    def test_search_year_window__service_error(self):
+        error = {'error': 'Service communication failed'}
+        with mock.patch.object(tmdb.tmdbapi, 'search_movie_request', lambda **kwargs: kwargs), \
+                mock.patch.object(tmdb.api_utils, 'load_info_from_service', return_value=error):
+            self.assertEqual(error, self.scraper.search_year_window('英雄', '2002'))
+
+
+class TestYearWindowDirect(YearWindowTests, unittest.TestCase):
+    module = tmdb_direct
+
+    def search_window(self, responses):
+        years = []
+        def search_movie(**kwargs):
+            years.append(kwargs['year'])
+            return responses[kwargs['year']]
+        with mock.patch.object(tmdb_direct.tmdbapi, 'search_movie', search_movie):
+            actual_output = self.scraper.search_year_window('英雄', '2002')
+        # searched in parallel
+        return actual_output, sorted(years, key=self.module._year_window('2002').index)
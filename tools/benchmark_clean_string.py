@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from lib.filename_cleaner import clean_string, clean_string_regex
+
+TITLES = ['The Matrix', 'Ben-Hur', '黑客帝国', '英雄', 'Star Wars Episode IV', 'Crouching Tiger Hidden Dragon',
+    '让子弹飞', 'Memento', 'Léon', 'Spirited Away']
+TAGS = ['1080p', '2160p', 'BluRay', 'WEB-DL', 'x264', 'x265', 'HEVC', 'DTS-HDMA', 'AAC', 'Extended', 'REMUX',
+    'HDR10', '国英双语', 'CHD', 'FRDS']
+
+def read_corpus(path):
+    # one filename per line, e.g. the output of `find /media -type f -printf '%f\n'`
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+def make_corpus(size=50000, seed=34):
+    rnd = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        separator = rnd.choice(['.', ' ', '_'])
+        parts = rnd.choice(TITLES).split(' ')
+        if rnd.random() < 0.8:
+            parts.append(str(rnd.randint(1950, 2024)))
+        parts.extend(rnd.sample(TAGS, rnd.randint(0, 5)))
+        name = separator.join(parts)
+        if rnd.random() < 0.2:
+            name = '[' + rnd.choice(TAGS) + ']' + name
+        if rnd.random() < 0.1:
+            name += ' {tmdb=%d}' % rnd.randint(1, 1000000)
+        corpus.append(name + rnd.choice(['.mkv', '.mp4', '.iso', '']))
+    return corpus
+
+def measure(func, corpus, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for filename in corpus:
+            func(filename)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def benchmark(corpus, rounds=5):
+    mismatches = [filename for filename in corpus if clean_string(filename) != clean_string_regex(filename)]
+    if mismatches:
+        print(f"{len(mismatches)} filenames differ, e.g. {mismatches[0]!r}")
+
+    regex_time = measure(clean_string_regex, corpus, rounds)
+    token_time = measure(clean_string, corpus, rounds)
+    print(f"Filenames:  {len(corpus)} (best of {rounds} rounds)")
+    print(f"Regexps:    {regex_time:.3f}s, {len(corpus) / regex_time:,.0f} names/s")
+    print(f"Tokenizer:  {token_time:.3f}s, {len(corpus) / token_time:,.0f} names/s")
+    print(f"Speedup:    {regex_time / token_time:.2f}x")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        benchmark(read_corpus(sys.argv[1]))
+    else:
+        benchmark(make_corpus())
@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from lib.tmdbscraper_direct.pinyin import compile_char_map
+
+def generate_table(json_path, output_path):
+    print(f"Reading {json_path}...")
+    with open(json_path, 'r', encoding='utf-8') as f:
+        char_map = json.load(f)
+
+    table = compile_char_map(char_map)
+
+    with open(output_path, 'wb') as f:
+        f.write(table)
+
+    print(f"Compiled {len(char_map)} entries into {len(table)} bytes")
+    print(f"Successfully saved pinyin table to {output_path}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python generate_pinyin_table.py <char_map.json> <char_map.bin>")
+    else:
+        generate_table(sys.argv[1], sys.argv[2])
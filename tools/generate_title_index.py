@@ -0,0 +1,75 @@
+import csv
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from lib.tmdbscraper_direct.title_index import build_index
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8', newline='')
+
+def read_export(path, movies):
+    # TMDB daily export (movie_ids_MM_DD_YYYY.json.gz): one JSON object per line
+    # with id, original_title, popularity, adult and video
+    count = 0
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if item.get('adult') or item.get('video'):
+                continue
+            movie = movies.setdefault(int(item['id']), {'id': int(item['id'])})
+            movie['original_title'] = item.get('original_title') or movie.get('original_title')
+            movie['popularity'] = item.get('popularity') or movie.get('popularity')
+            count += 1
+    print(f"Read {count} movies from {path}")
+
+def read_csv(path, movies):
+    # CSV with an 'id' column and any of title (localized), original_title,
+    # release_date or year, and popularity
+    count = 0
+    with _open_text(path) as f:
+        for row in csv.DictReader(f):
+            try:
+                tmdb_id = int(row.get('id') or '')
+            except ValueError:
+                continue
+            movie = movies.setdefault(tmdb_id, {'id': tmdb_id})
+            for field in ('title', 'original_title', 'popularity'):
+                if row.get(field):
+                    movie[field] = row[field]
+            year = row.get('year') or (row.get('release_date') or '')[:4]
+            if year.isdigit():
+                movie['year'] = int(year)
+            count += 1
+    print(f"Read {count} movies from {path}")
+
+def generate_index(input_paths, output_path):
+    movies = {}
+    for path in input_paths:
+        if '.json' in os.path.basename(path):
+            read_export(path, movies)
+        else:
+            read_csv(path, movies)
+
+    print(f"Indexing {len(movies)} movies...")
+    index = build_index(movies[tmdb_id] for tmdb_id in sorted(movies))
+
+    with open(output_path, 'wb') as f:
+        f.write(index)
+
+    print(f"Index size: {len(index) / 1024 / 1024:.2f} MB")
+    print(f"Successfully saved title index to {output_path}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python generate_title_index.py <movie_ids.json.gz|movies.csv> [...] <tmdb_title_index.bin>")
+    else:
+        generate_index(sys.argv[1:-1], sys.argv[-1])
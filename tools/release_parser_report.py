@@ -0,0 +1,51 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from lib import release_parser
+from lib.filename_cleaner import clean_string
+
+DEFAULT_SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'release_parser_samples.tsv')
+
+def read_samples(path):
+    # filename<TAB>title<TAB>year, an empty title for names that should go to DeepSeek
+    samples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            filename, title, year = (line.rstrip('\n').split('\t') + ['', ''])[:3]
+            samples.append((filename, title or None, year or None))
+    return samples
+
+def main():
+    samples = read_samples(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SAMPLES)
+    hits, wrong, escalated, missed = [], [], [], []
+    cleaned = 0
+    for filename, title, year in samples:
+        # what the traditional search already gets right
+        clean_title, clean_year, _ = clean_string(filename)
+        if title and clean_title == title and (clean_year or None) == year:
+            cleaned += 1
+        parsed = release_parser.parse(filename)
+        if not release_parser.is_confident(parsed):
+            (missed if title else escalated).append((filename, parsed))
+        elif title and parsed['title'] == title and parsed['year'] == year:
+            hits.append((filename, parsed))
+        else:
+            wrong.append((filename, parsed))
+
+    for label, entries in (('wrong', wrong), ('missed', missed)):
+        for filename, parsed in entries:
+            print('{:7} {} -> {} ({}) {:.2f}'.format(label, filename, parsed['title'], parsed['year'], parsed['confidence']))
+    parseable = len(hits) + len(wrong) + len(missed)
+    print('samples: {} | parseable: {}'.format(len(samples), parseable))
+    print('hit rate: {:.1%} of parseable names ({} / {})'.format(len(hits) / max(parseable, 1), len(hits), parseable))
+    print('wrong: {} | missed (sent to DeepSeek): {} | correctly sent to DeepSeek: {}'.format(
+        len(wrong), len(missed), len(escalated)))
+    print('clean_string alone: {:.1%} ({} / {})'.format(cleaned / max(parseable, 1), cleaned, parseable))
+    print('DeepSeek calls avoided: {:.1%}'.format((len(hits) + len(wrong)) / max(len(samples), 1)))
+
+if __name__ == '__main__':
+    main()